@@ -5,6 +5,9 @@ urlpatterns = [
     # Dashboard Stats
     path('dashboard-stats/', views.get_dashboard_stats, name='admin_dashboard_stats'),
     
+    # Translation Pipeline Metrics
+    path('translation-metrics/', views.get_translation_metrics, name='admin_translation_metrics'),
+    
     # User Growth Chart
     path('user-growth/', views.get_user_growth, name='admin_user_growth'),
     
@@ -76,6 +76,73 @@ def get_dashboard_stats(request):
     )
 
 
+# ==================== TRANSLATION PIPELINE METRICS ====================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_translation_metrics(request):
+    """
+    Get runtime metrics of the translation pipeline for this worker process
+    GET /api/administration/translation-metrics/
+    
+    Returns:
+    - Glossary index size and version
+    - Translation result cache counters (hits, misses, evictions)
+    - Persistent translation store counters and row count
+    - Translation memory size
+    - Single-flight counters (upstream calls saved by coalescing)
+    - LLM circuit breaker state, failure rate and latency percentiles
+    - Micro-batching fill rate and added queueing delay
+    - LLM work queue depth, wait time and shed count per subscription tier
+    - Rate limiter counters (requests allowed, rate limited, over daily quota)
+    - Prompt sizes (average tokens, prompts trimmed to the token budget)
+    
+    Only staff/admin users can access
+    """
+    if not request.user.is_staff:
+        return error_response(
+            message="Permission denied. Only admin users can access this endpoint.",
+            code=403
+        )
+    
+    from core.glossary_index import get_glossary_index
+    from core.models import TranslationCacheEntry
+    from core.translation_cache import get_translation_cache, get_translation_store
+    from core.translation_memory import get_translation_memory
+    from core.single_flight import get_single_flight
+    from core.circuit_breaker import get_circuit_breaker
+    from core.micro_batcher import get_micro_batcher
+    from core.llm_queue import get_async_llm_queue, get_llm_queue
+    from core.rate_limits import get_rate_limiter
+    from core.prompt_builder import get_prompt_builder
+    
+    glossary = get_glossary_index()
+    store = get_translation_store()
+    store_stats = {"enabled": False}
+    if store is not None:
+        store_stats = {"enabled": True, "entries": TranslationCacheEntry.objects.count(), **store.stats()}
+    
+    return success_response(
+        message="Translation metrics retrieved successfully",
+        data={
+            "glossary": {
+                "entries": len(glossary),
+                "version": glossary.version
+            },
+            "cache": get_translation_cache().stats(),
+            "store": store_stats,
+            "translation_memory": get_translation_memory().stats(),
+            "single_flight": get_single_flight().stats(),
+            "llm_circuit": get_circuit_breaker().stats(),
+            "micro_batch": get_micro_batcher().stats(),
+            "llm_queue": get_llm_queue().stats(),
+            "async_llm_queue": get_async_llm_queue().stats(),
+            "rate_limits": get_rate_limiter().stats(),
+            "prompts": get_prompt_builder().stats()
+        }
+    )
+
+
 # ==================== USER GROWTH ====================
 
 @api_view(['GET'])
@@ -219,7 +286,7 @@ def get_all_user_submissions(request, page=1):
     GET /api/administration/submissions/?search=headache
     
     Query Parameters:
-    - search: Search in source_text (case-insensitive)
+    - search: Full-text search in source_text, known_translation and notes (best matches first)
     - status: Filter by status (pending, updated)
     
     Default: 20 items per page
@@ -234,28 +301,23 @@ def get_all_user_submissions(request, page=1):
     
     from core.models import UserSubmission
     from core.serializers import UserSubmissionSerializer
-    from django.db.models import Q
+    from core.full_text_search import search
     
     limit = 20  # Items per page
     offset = (page - 1) * limit
     
-    # Start with all submissions
-    submissions = UserSubmission.objects.all()
-    
-    # Apply search filter on source_text
-    search_query = request.GET.get('search', '').strip()
-    if search_query:
-        submissions = submissions.filter(
-            Q(source_text__icontains=search_query)
-        )
+    # Start with all submissions, newest first
+    submissions = UserSubmission.objects.order_by('-created_date')
     
     # Apply status filter
     status = request.GET.get('status')
     if status and status in ['pending', 'updated']:
         submissions = submissions.filter(status=status)
     
-    # Order by created_date
-    submissions = submissions.order_by('-created_date')
+    # Apply search filter (ranked by relevance)
+    search_query = request.GET.get('search', '').strip()
+    if search_query:
+        submissions = search(submissions, search_query)
     
     total_count = submissions.count()
     paginated_submissions = submissions[offset:offset+limit]
@@ -291,7 +353,7 @@ def get_all_ai_feedback(request, page=1):
     GET /api/administration/ai-feedback/?search=pain
     
     Query Parameters:
-    - search: Search in original_text (case-insensitive)
+    - search: Full-text search in source_text, known_translation and notes (best matches first)
     - status: Filter by status (pending, updated)
     
     Default: 20 items per page
@@ -306,28 +368,23 @@ def get_all_ai_feedback(request, page=1):
     
     from core.models import UserTranslationHistory
     from core.serializers import UserTranslationHistorySerializer
-    from django.db.models import Q
+    from core.full_text_search import search
     
     limit = 20  # Items per page
     offset = (page - 1) * limit
     
-    # Start with all feedback items
-    feedback_items = UserTranslationHistory.objects.all()
-    
-    # Apply search filter on source_text
-    search_query = request.GET.get('search', '').strip()
-    if search_query:
-        feedback_items = feedback_items.filter(
-            Q(source_text__icontains=search_query)
-        )
+    # Start with all feedback items, newest first
+    feedback_items = UserTranslationHistory.objects.order_by('-created_date')
     
     # Apply status filter
     status = request.GET.get('status')
-    if status and status in ['pending', 'updated']:
+    if status and status in ['pending', 'updated', 'automatic']:
         feedback_items = feedback_items.filter(status=status)
     
-    # Order by created_date
-    feedback_items = feedback_items.order_by('-created_date')
+    # Apply search filter (ranked by relevance)
+    search_query = request.GET.get('search', '').strip()
+    if search_query:
+        feedback_items = search(feedback_items, search_query)
     
     total_count = feedback_items.count()
     paginated_items = feedback_items[offset:offset+limit]
@@ -1036,6 +1093,7 @@ def get_all_translations(request, page=1):
     GET /api/administration/translations/
     GET /api/administration/translations/page/2/
     GET /api/administration/translations/?search=hair
+    search: Full-text search in English and Marshallese text (best matches first)
     Default: 10 items per page
     
     Only staff/admin users can access
@@ -1048,6 +1106,7 @@ def get_all_translations(request, page=1):
     
     from core.models import Translation
     from core.serializers import TranslationSerializer
+    from core.full_text_search import search
     from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
     
     # Get query parameters
@@ -1056,9 +1115,9 @@ def get_all_translations(request, page=1):
     # Start with all translations
     translations = Translation.objects.all()
     
-    # Apply search filter (only English text)
+    # Apply search filter (ranked by relevance)
     if search_query:
-        translations = translations.filter(english_text__icontains=search_query)
+        translations = search(translations, search_query)
     
     # Pagination
     paginator = Paginator(translations, 10)
@@ -77,7 +77,8 @@ class OTPAdmin(admin.ModelAdmin):
 
 @admin.register(SubscriptionPlan)
 class SubscriptionPlanAdmin(admin.ModelAdmin):
-    list_display = ('id', 'plan_type', 'billing_cycle', 'price', 'is_active', 'created_at')
+    list_display = ('id', 'plan_type', 'billing_cycle', 'price', 'translations_per_minute',
+                    'translations_per_day', 'is_active', 'created_at')
     list_filter = ('plan_type', 'billing_cycle', 'is_active')
     search_fields = ('plan_type',)
     ordering = ('plan_type', 'billing_cycle')
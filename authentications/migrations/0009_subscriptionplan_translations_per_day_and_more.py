@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 05:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentications', '0008_userprofile_onesignal_player_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscriptionplan',
+            name='translations_per_day',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='subscriptionplan',
+            name='translations_per_minute',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -112,6 +112,10 @@ class SubscriptionPlan(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Translate endpoint limits (empty = TRANSLATION_RATE_LIMITS default for the plan type, 0 = unlimited)
+    translations_per_minute = models.PositiveIntegerField(null=True, blank=True)
+    translations_per_day = models.PositiveIntegerField(null=True, blank=True)
+    
     class Meta:
         unique_together = ('plan_type', 'billing_cycle')
     
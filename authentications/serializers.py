@@ -177,7 +177,8 @@ class LoginSerializer(serializers.Serializer):
 class SubscriptionPlanSerializer(serializers.ModelSerializer):
     class Meta:
         model = SubscriptionPlan
-        fields = ['id', 'plan_type', 'billing_cycle', 'price', 'is_active', 'created_at']
+        fields = ['id', 'plan_type', 'billing_cycle', 'price', 'is_active',
+                  'translations_per_minute', 'translations_per_day', 'created_at']
         read_only_fields = ['id', 'created_at']
 
 
@@ -1,13 +1,33 @@
 from django.contrib import admin
+from django.db.models import Q
+from .full_text_search import search_filter
 from .models import Translation, UserTranslationHistory, UserSubmission, Category
+from .normalization import canonical_key
 
 # Register your models here.
 
+class FullTextSearchMixin:
+    """Search the model's text columns through core.full_text_search (FTS5) instead of LIKE.
+    
+    related_search_fields are still matched with icontains.
+    """
+    related_search_fields = ()
+    
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        condition = search_filter(queryset.model, search_term, queryset.db)
+        for field in self.related_search_fields:
+            condition |= Q(**{f'{field}__icontains': search_term})
+        return queryset.filter(condition), False
+
+
 @admin.register(Translation)
-class TranslationAdmin(admin.ModelAdmin):
+class TranslationAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'english_text_short', 'marshallese_text_short', 'category_name', 'usage_count', 'is_favorite', 'created_date')
     list_filter = ('category', 'is_favorite', 'created_date')
-    search_fields = ('^english_text',)
+    search_fields = ('english_text', 'marshallese_text')
     readonly_fields = ('created_date', 'updated_date', 'usage_count')
     ordering = ('-created_date',)
     
@@ -38,10 +58,11 @@ class TranslationAdmin(admin.ModelAdmin):
 
 
 @admin.register(UserTranslationHistory)
-class UserTranslationHistoryAdmin(admin.ModelAdmin):
+class UserTranslationHistoryAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'user_email', 'source_short', 'translation_short', 'category_name', 'status', 'created_date')
     list_filter = ('status', 'category', 'created_date', 'user')
-    search_fields = ('source_text', 'known_translation', 'user__email')
+    search_fields = ('source_text', 'known_translation', 'notes', 'user__email')
+    related_search_fields = ('user__email',)
     readonly_fields = ('created_date', 'updated_date', 'user')
     ordering = ('-created_date',)
     
@@ -75,17 +96,19 @@ class UserTranslationHistoryAdmin(admin.ModelAdmin):
             # Save the UserTranslationHistory first
             super().save_model(request, obj, form, change)
             
-            # Create or update Translation in main database
+            # Create or update Translation in main database (matched on the indexed
+            # english_search column, so "Head" updates the existing "head" entry)
             if obj.known_translation:
-                Translation.objects.update_or_create(
-                    english_text=obj.source_text,
-                    defaults={
-                        'marshallese_text': obj.known_translation,
-                        'category': obj.category,
-                        'context': obj.notes or '',
-                        'created_by': request.user,
-                    }
-                )
+                translation = Translation.objects.filter(
+                    english_search=canonical_key(obj.source_text)
+                ).order_by('-created_date', '-id').first()
+                if translation is None:
+                    translation = Translation(english_text=obj.source_text)
+                translation.marshallese_text = obj.known_translation
+                translation.category = obj.category
+                translation.context = obj.notes or ''
+                translation.created_by = request.user
+                translation.save()
             
             # Notify user about the update
             notify_user(
@@ -122,10 +145,11 @@ class UserTranslationHistoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(UserSubmission)
-class UserSubmissionAdmin(admin.ModelAdmin):
+class UserSubmissionAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'user_email', 'source_text_short', 'known_translation_short', 'category_name', 'status', 'created_date')
     list_filter = ('status', 'category', 'created_date', 'user')
-    search_fields = ('source_text', 'known_translation', 'user__email', 'notes')
+    search_fields = ('source_text', 'known_translation', 'notes', 'user__email')
+    related_search_fields = ('user__email',)
     readonly_fields = ('created_date', 'updated_date')
     ordering = ('-created_date',)
     
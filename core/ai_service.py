@@ -3,76 +3,64 @@ AI-powered Translation Service using Gemini API
 Converts FastAPI implementation to Django-compatible service
 """
 import os
+import copy
 import json
 import re
-from typing import Dict, List, Tuple
+import time
+from typing import Dict, Iterator, List, Tuple
 from difflib import SequenceMatcher
 from django.conf import settings
-import google.generativeai as genai
-from .models import Translation
+from .glossary_index import get_glossary_index, get_glossary_version
+from .translation_cache import TranslationStore, get_translation_cache, get_translation_store
+from .single_flight import get_single_flight
+from .micro_batcher import get_micro_batcher
+from .translation_memory import lookup_translation_memory
+from .normalization import canonical_key, canonical_tokens, normalize_text, tokenize
+from .language_detector import get_language_detector
+from .llm_providers import LLMTimeoutError, create_llm_provider
+from .circuit_breaker import CircuitOpenError, get_circuit_breaker
+from .llm_queue import LoadShedError, get_llm_queue
+from .subscription_tiers import TIERS
+from .prompt_builder import BATCH_INSTRUCTIONS, TRANSLATION_INSTRUCTIONS, get_prompt_builder
 
 
-# Configure Gemini API - Load from Django settings
-def get_gemini_model():
-    """Lazy load Gemini model with API key from Django settings"""
-    GEMINI_API_KEY = settings.GEMINI_API_KEY
-    if GEMINI_API_KEY:
-        genai.configure(api_key=GEMINI_API_KEY)
-        # Using gemini-flash-latest: Alias to latest flash model
-        return genai.GenerativeModel('gemini-flash-latest')
-    return None
+# LLM backend selected by settings.LLM_PROVIDER (None when Gemini has no API key)
+llm = create_llm_provider()
 
-model = get_gemini_model()
+# Minimum SequenceMatcher ratio for a fuzzy glossary match
+FUZZY_MATCH_THRESHOLD = 0.65
 
 
 def detect_language(text: str) -> str:
     """Detect if input text is English or Marshallese.
     
+    Uses the detector compiled from the current glossary (see
+    core.language_detector); its detect() also returns a confidence.
+    
     Args:
         text: Input text to detect language
         
     Returns:
         'english' or 'marshallese'
     """
-    # Marshallese-specific characters:
-    # - Macron vowels: ā, ō, ū
-    # - Dotted consonants: ṃ, ṇ, ḷ, ņ, ļ
-    # - Dot below vowels: ọ, ạ, ẹ, ị, ụ (alternative orthography)
-    marshallese_chars = set('ṃṇḷōāūņļọạẹịụ')
-    
-    text_lower = text.lower()
-    
-    # Check for Marshallese-specific characters
-    if any(char in text_lower for char in marshallese_chars):
-        return 'marshallese'
-    
-    # Common Marshallese words (various spellings)
-    marshallese_words = {
-        'iakwe', 'yokwe', 'iọkwe', 'iokkwe',  # Hello/Love
-        'kommol', 'kommōl', 'kom̧m̧ōl',  # Thank you
-        'jinoin', 'jinoin',  # Wait
-        'emoj', 'emōj',  # Done/Finished
-        'ejja', 'ejjab', 'ejjelok',  # Not/None
-        'ewor', 'ewōr',  # There is
-        'eok', 'ij', 'kwe', 'kwoj', 'kwōj',  # Pronouns/Particles
-        'rainin', 'ilju', 'inne',  # Time words (today, tomorrow, yesterday)
-        'bōk', 'bok', 'mōṇā', 'mona',  # Common nouns
-        'kajjitōk', 'bar', 'wōt', 'ak',  # Common words
-        'ri-',  # Prefix for people
-    }
-    words = set(text_lower.split())
-    
-    if words & marshallese_words:
-        return 'marshallese'
-    
-    # Check for partial matches of Marshallese patterns
-    for word in words:
-        # Words starting with common Marshallese prefixes
-        if word.startswith(('ri-', 'ij', 'kwō', 'em')):
-            return 'marshallese'
-    
-    # Default to English
-    return 'english'
+    return get_language_detector().detect(text)[0]
+
+
+# Common English words to ignore
+ENGLISH_STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from',
+    'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'that',
+    'the', 'to', 'was', 'will', 'with', 'i', 'me', 'my', 'you', 'your',
+    'this', 'these', 'those', 'can', 'do', 'does', 'did', 'where', 'what',
+    'when', 'who', 'which', 'why', 'how'
+}
+
+# Common Marshallese stop words
+MARSHALLESE_STOP_WORDS = {
+    'im', 'eo', 'ro', 'ji'
+}
+
+STOP_WORDS = ENGLISH_STOP_WORDS | MARSHALLESE_STOP_WORDS
 
 
 def extract_keywords(text: str) -> List[str]:
@@ -85,32 +73,39 @@ def extract_keywords(text: str) -> List[str]:
     Returns:
         List of keywords
     """
-    # Common English words to ignore
-    english_stop_words = {
-        'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from',
-        'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'that',
-        'the', 'to', 'was', 'will', 'with', 'i', 'me', 'my', 'you', 'your',
-        'this', 'these', 'those', 'can', 'do', 'does', 'did', 'where', 'what',
-        'when', 'who', 'which', 'why', 'how'
-    }
-    
-    # Common Marshallese stop words
-    marshallese_stop_words = {
-        'im', 'eo', 'ro', 'ji'
-    }
-    
-    all_stop_words = english_stop_words | marshallese_stop_words
-    
     # Split into words and filter
     words = text.lower().split()
     keywords = [
         w.strip('.,!?;:—-') 
         for w in words 
-        if w.lower().strip('.,!?;:—-') not in all_stop_words and len(w.strip('.,!?;:—-')) > 0
+        if w.lower().strip('.,!?;:—-') not in STOP_WORDS and len(w.strip('.,!?;:—-')) > 0
     ]
     return keywords
 
 
+def segment_keywords(query_text: str, glossary) -> List[Tuple[str, Dict]]:
+    """Split input into glossary phrases and leftover keywords, in input order.
+    
+    The glossary's phrase automaton picks the longest known phrase at each
+    position (so "Where does it hurt?" stays one unit); only the gaps between
+    phrases are broken into single keywords.
+    
+    Args:
+        query_text: Input text
+        glossary: GlossaryIndex to segment against
+    
+    Returns:
+        List of (keyword, glossary entry or None)
+    """
+    segments = []
+    for segment in glossary.segment(query_text):
+        if segment["entry"] is not None and normalize_text(segment["text"]) not in STOP_WORDS:
+            segments.append((segment["text"], segment["entry"]))
+        else:
+            segments.extend((keyword, None) for keyword in extract_keywords(segment["text"]))
+    return segments
+
+
 def fuzzy_match(query: str, target: str, threshold: float = 0.8) -> Tuple[bool, float]:
     """Calculate fuzzy match similarity between two strings.
     
@@ -122,43 +117,42 @@ def fuzzy_match(query: str, target: str, threshold: float = 0.8) -> Tuple[bool,
     Returns:
         Tuple of (is_match, similarity_score)
     """
-    query_lower = query.lower().strip()
-    target_lower = target.lower().strip()
-    
-    # Calculate similarity ratio
-    similarity = SequenceMatcher(None, query_lower, target_lower).ratio()
+    # Compare canonical spellings so diacritics and spelling variants don't count as typos
+    similarity = SequenceMatcher(None, canonical_key(query), canonical_key(target)).ratio()
     
     return (similarity >= threshold, similarity)
 
 
-def search_by_fuzzy(keyword: str, limit: int = 3) -> List[Dict]:
+def search_by_fuzzy(keyword: str, limit: int = 3, glossary=None) -> List[Dict]:
     """Search database using fuzzy matching for typos and partial matches (bidirectional).
     Works for both English and Marshallese keywords.
     
+    Candidates come from the glossary index's character n-gram index, so only
+    a handful of entries are scored with SequenceMatcher instead of the whole table.
+    
     Args:
         keyword: Keyword to search with fuzzy matching
         limit: Number of results to return
+        glossary: Glossary index to use (defaults to the current one)
     
     Returns:
         List of fuzzy matched results
     """
-    # Get all entries (for fuzzy matching)
-    all_entries = Translation.objects.all().order_by('-usage_count').values(
-        'english_text', 'marshallese_text', 'category', 'usage_count'
-    )
+    glossary = glossary or get_glossary_index()
+    candidates = glossary.fuzzy_candidates(keyword, threshold=FUZZY_MATCH_THRESHOLD)
     
     fuzzy_results = []
     
     # Fuzzy match against both English and Marshallese
-    for entry in all_entries:
+    for entry in candidates:
         english_text = entry['english_text']
         marshallese_text = entry['marshallese_text']
         
         # Check similarity with English text
-        is_match_eng, similarity_eng = fuzzy_match(keyword, english_text, threshold=0.65)
+        is_match_eng, similarity_eng = fuzzy_match(keyword, english_text, threshold=FUZZY_MATCH_THRESHOLD)
         
         # Check similarity with Marshallese text
-        is_match_mar, similarity_mar = fuzzy_match(keyword, marshallese_text, threshold=0.65)
+        is_match_mar, similarity_mar = fuzzy_match(keyword, marshallese_text, threshold=FUZZY_MATCH_THRESHOLD)
         
         # Use highest similarity
         best_similarity = max(similarity_eng, similarity_mar)
@@ -175,63 +169,85 @@ def search_by_fuzzy(keyword: str, limit: int = 3) -> List[Dict]:
                 "match_type": "fuzzy"
             })
     
-    # Sort by similarity and return top results
-    fuzzy_results.sort(key=lambda x: x["similarity"], reverse=True)
+    # Sort by similarity (most used entry wins ties) and return top results
+    fuzzy_results.sort(key=lambda x: (x["similarity"], x["usage_count"]), reverse=True)
     return fuzzy_results[:limit]
 
 
-def search_translation_db(query_text: str) -> Dict:
+def search_translation_db(query_text: str, glossary=None) -> Dict:
     """Search translation database with simple workflow.
     
     Workflow:
-    1. Extract keywords from input
+    1. Segment input into longest glossary phrases, extract keywords from the rest
     2. Try exact match on each keyword
-    3. Try fuzzy match on remaining keywords (for typos)
-    4. Return complete findings to LLM
+    3. Look up glossary phrases containing remaining keywords (word index)
+    4. Try fuzzy match on remaining keywords (for typos)
+    5. Return complete findings to LLM
     
     Args:
         query_text: The text to search for in the translation database
+        glossary: Glossary index to use (defaults to the current one)
     
     Returns:
-        A dictionary with exact_matches, fuzzy_matches, and keywords info
+        A dictionary with exact_matches, phrase_matches, fuzzy_matches, and keywords info
     """
     try:
-        # Step 1: Extract keywords from input
-        keywords = extract_keywords(query_text)
-        if not keywords:
-            keywords = [query_text]
+        # Step 1: Segment input into longest glossary phrases + leftover keywords
+        glossary = glossary or get_glossary_index()
+        segments = segment_keywords(query_text, glossary)
+        if not segments:
+            segments = [(query_text, None)]
+        keywords = [keyword for keyword, _ in segments]
         
         print(f"[DEBUG] Keywords: {keywords}")
         
-        # Step 2: Try exact match on each keyword
+        # Step 2: Try exact match on each keyword (in-memory glossary index)
         exact_matches = []
-        keywords_for_fuzzy = []
-        
-        for keyword in keywords:
-            # Search in both English and Marshallese (case-insensitive)
-            result = Translation.objects.filter(
-                english_text__iexact=keyword
-            ).first() or Translation.objects.filter(
-                marshallese_text__iexact=keyword
-            ).first()
-            
+        keywords_for_phrase = []
+
+        for keyword, entry in segments:
+            # Phrases found by segmentation are already exact matches,
+            # otherwise search both English and Marshallese (case-insensitive)
+            result = entry or glossary.lookup_exact(keyword)
+
             if result:
-                print(f"[DEBUG] Exact match for '{keyword}': {result.english_text} ↔ {result.marshallese_text}")
+                print(f"[DEBUG] Exact match for '{keyword}': {result['english_text']} ↔ {result['marshallese_text']}")
                 exact_matches.append({
                     "keyword": keyword,
-                    "english": result.english_text,
-                    "marshallese": result.marshallese_text,
-                    "category": result.category,
+                    "english": result['english_text'],
+                    "marshallese": result['marshallese_text'],
+                    "category": result['category'],
                     "match_type": "exact"
                 })
             else:
-                print(f"[DEBUG] No exact match for '{keyword}', adding to fuzzy search")
+                print(f"[DEBUG] No exact match for '{keyword}', adding to phrase search")
+                keywords_for_phrase.append(keyword)
+        
+        # Step 3: Find glossary phrases that contain the keyword as a word
+        phrase_matches = []
+        keywords_for_fuzzy = []
+        for keyword in keywords_for_phrase:
+            phrase_results = glossary.lookup_phrases(keyword, limit=1)
+            if phrase_results:
+                best_phrase = phrase_results[0]
+                entry = best_phrase["entry"]
+                print(f"[DEBUG] Phrase match for '{keyword}': {entry['english_text']} ↔ {entry['marshallese_text']} (span: {best_phrase['span']})")
+                phrase_matches.append({
+                    "keyword": keyword,
+                    "english": entry['english_text'],
+                    "marshallese": entry['marshallese_text'],
+                    "category": entry['category'],
+                    "span": best_phrase["span"],
+                    "match_type": "phrase"
+                })
+            else:
+                print(f"[DEBUG] No phrase match for '{keyword}', adding to fuzzy search")
                 keywords_for_fuzzy.append(keyword)
         
-        # Step 3: Try fuzzy match for keywords without exact match (typos/similar)
+        # Step 4: Try fuzzy match for keywords without exact match (typos/similar)
         fuzzy_matches = []
         for keyword in keywords_for_fuzzy:
-            fuzzy_results = search_by_fuzzy(keyword, limit=1)  # Get best match only
+            fuzzy_results = search_by_fuzzy(keyword, limit=1, glossary=glossary)  # Get best match only
             if fuzzy_results:
                 best_match = fuzzy_results[0]
                 print(f"[DEBUG] Fuzzy match for '{keyword}': {best_match['english']} ↔ {best_match['marshallese']} (similarity: {best_match['similarity']})")
@@ -251,11 +267,13 @@ def search_translation_db(query_text: str) -> Dict:
             "original_query": query_text,
             "keywords": keywords,
             "exact_matches": exact_matches,
+            "phrase_matches": phrase_matches,
             "fuzzy_matches": fuzzy_matches,
             "total_keywords": len(keywords),
             "exact_count": len(exact_matches),
+            "phrase_count": len(phrase_matches),
             "fuzzy_count": len(fuzzy_matches),
-            "not_found_count": len(keywords) - len(exact_matches) - len(fuzzy_matches)
+            "not_found_count": len(keywords) - len(exact_matches) - len(phrase_matches) - len(fuzzy_matches)
         }
         
     except Exception as e:
@@ -263,165 +281,112 @@ def search_translation_db(query_text: str) -> Dict:
         return {"error": str(e)}
 
 
-def translate_with_ai(user_text: str) -> Dict:
-    """
-    Translate text using AI with database lookup.
-    
-    Workflow:
-    1. Auto-detect input language (English or Marshallese)
-    2. Extract keywords
-    3. Search database (exact + fuzzy)
-    4. Send findings to Gemini LLM
-    5. Parse and return translation with metadata
+def detect_category(matches: List[Dict]) -> Tuple:
+    """Pick the category of the first glossary match, falling back to General.
     
     Args:
-        user_text: Text to translate
-        
+        matches: Exact/phrase/fuzzy matches in priority order
+    
     Returns:
-        Dictionary with translation, context, source, confidence, details, admin_review_needed, notes
+        Tuple of (category_id or None, category_name)
     """
-    # Step 0: Auto-detect language
-    detected_lang = detect_language(user_text)
-    target_lang = 'marshallese' if detected_lang == 'english' else 'english'
-    print(f"[DEBUG] Detected language: {detected_lang} -> Target: {target_lang}")
-    
-    if not model:
-        return {
-            "translation": user_text,
-            "context": "Error",
-            "source": "error",
-            "confidence": "low",
-            "detected_language": detected_lang,
-            "target_language": target_lang,
-            "details": {},
-            "admin_review_needed": True,
-            "notes": "Gemini API key not configured"
-        }
-    
-    # Step 1: Extract keywords
-    keywords = extract_keywords(user_text)
-    if not keywords:
-        keywords = [user_text]
-    
-    # Step 2: Search database (exact + fuzzy)
-    search_results = search_translation_db(user_text)
+    from .models import Category
+    detected_category_id = None
+    detected_category_name = 'General'
     
-    if "error" in search_results:
-        return {
-            "translation": user_text,
-            "context": "Error",
-            "source": "error",
-            "confidence": "low",
-            "detected_language": detected_lang,
-            "target_language": target_lang,
-            "details": {},
-            "admin_review_needed": True,
-            "notes": f"Database error: {search_results['error']}"
-        }
+    if matches:
+        # Get the category from first match (it's a ForeignKey ID)
+        first_category = matches[0].get('category')
+        if first_category:
+            try:
+                # If it's a Category object, get the ID
+                if hasattr(first_category, 'id'):
+                    detected_category_id = first_category.id
+                    detected_category_name = first_category.name
+                else:
+                    # It's just an ID
+                    cat_obj = Category.objects.get(id=first_category)
+                    detected_category_id = cat_obj.id
+                    detected_category_name = cat_obj.name
+            except:
+                pass
     
-    # Step 3: Send findings to LLM with clear instructions
-    exact_matches = search_results.get("exact_matches", [])
-    fuzzy_matches = search_results.get("fuzzy_matches", [])
-    not_found_count = search_results.get("not_found_count", 0)
+    # Default to General if not found
+    if not detected_category_id:
+        general_cat = Category.objects.filter(name='General').first()
+        if general_cat:
+            detected_category_id = general_cat.id
+            detected_category_name = 'General'
     
-    # Build context for LLM
-    context = f"""LANGUAGE DETECTION:
-- Input Language: {detected_lang.upper()}
-- Target Language: {target_lang.upper()}
+    return detected_category_id, detected_category_name
 
-Input Text: "{user_text}"
-Keywords extracted: {keywords}
 
-DATABASE SEARCH RESULTS:
+def all_matches(search_results: Dict) -> List[Dict]:
+    """Exact, phrase and fuzzy matches in priority order"""
+    return (
+        search_results.get("exact_matches", [])
+        + search_results.get("phrase_matches", [])
+        + search_results.get("fuzzy_matches", [])
+    )
 
-EXACT MATCHES ({len(exact_matches)}):
-"""
+
+def error_result(user_text: str, detected_lang: str, target_lang: str, notes: str, matches: List[Dict] = None,
+                 category: Tuple = None) -> Dict:
+    """Result returned when translation fails (input is echoed back for admin review).
     
-    for match in exact_matches:
-        context += f"- '{match['keyword']}' → English: '{match['english']}' | Marshallese: '{match['marshallese']}'\n"
-    
-    context += f"\nFUZZY MATCHES ({len(fuzzy_matches)}) [for typos/similar words]:\n"
-    for match in fuzzy_matches:
-        context += f"- '{match['keyword']}' → English: '{match['english']}' | Marshallese: '{match['marshallese']}' (similarity: {match['similarity']})\n"
-    
-    if not_found_count > 0:
-        context += f"\nKEYWORDS NOT FOUND: {not_found_count} (generate these using your knowledge)\n"
-    
-    context += f"""
-INSTRUCTIONS:
-1. Input is in {detected_lang.upper()}, translate to {target_lang.upper()}
-2. Use exact matches as-is (highest priority)
-3. Use fuzzy matches for typos (medium priority) 
-4. Generate missing translations (lowest priority)
-5. Combine all into one natural sentence in {target_lang.upper()}
-
-Return in this EXACT JSON format:
-{{
-  "translation": "the final clean translation in {target_lang}",
-  "context": "brief description of what this translation is about (topic/category)",
-  "word_breakdown": {{
-    "word1": {{"translation": "...", "source": "exact|fuzzy|generated", "confidence": "high|medium|low"}},
-    "word2": {{"translation": "...", "source": "exact|fuzzy|generated", "confidence": "high|medium|low"}}
-  }}
-}}"""
-
-    # Step 4: Send to LLM
-    try:
-        response = model.generate_content(context)
-        llm_text = response.text if response.text else "{}"
-    except Exception as e:
+    Args:
+        user_text: Text that was being translated
+        detected_lang: Detected input language
+        target_lang: Target language
+        notes: Error description
+        matches: Glossary matches to take the category from (None to omit category)
+        category: Already detected (category_id, category_name), skips the lookup
+    """
+    result = {
+        "translation": user_text,
+        "context": "Error",
+        "source": "error",
+        "confidence": "low",
+        "detected_language": detected_lang,
+        "target_language": target_lang,
+        "details": {},
+        "admin_review_needed": True,
+        "notes": notes
+    }
+    if category is not None:
+        result["category"], result["category_name"] = category
+    elif matches is not None:
         # Even on error, detect category from database matches
-        from .models import Category
-        detected_category_id = None
-        detected_category_name = 'General'
-        
-        all_matches = exact_matches + fuzzy_matches
-        if all_matches:
-            first_category = all_matches[0].get('category')
-            if first_category:
-                try:
-                    if hasattr(first_category, 'id'):
-                        detected_category_id = first_category.id
-                        detected_category_name = first_category.name
-                    else:
-                        cat_obj = Category.objects.get(id=first_category)
-                        detected_category_id = cat_obj.id
-                        detected_category_name = cat_obj.name
-                except:
-                    pass
-        
-        if not detected_category_id:
-            general_cat = Category.objects.filter(name='General').first()
-            if general_cat:
-                detected_category_id = general_cat.id
-        
-        return {
-            "translation": user_text,
-            "context": "Error",
-            "source": "error",
-            "confidence": "low",
-            "detected_language": detected_lang,
-            "target_language": target_lang,
-            "category": detected_category_id,
-            "category_name": detected_category_name,
-            "details": {},
-            "admin_review_needed": True,
-            "notes": f"Gemini API error: {str(e)}"
-        }
+        result["category"], result["category_name"] = detect_category(matches)
+    return result
+
+
+def build_translation_context(user_text: str, detected_lang: str, target_lang: str, search_results: Dict) -> str:
+    """Build the Gemini prompt from the database findings (send with TRANSLATION_INSTRUCTIONS)"""
+    return get_prompt_builder().translation_prompt(user_text, detected_lang, target_lang, search_results)
+
+
+def strip_code_fences(llm_text: str) -> str:
+    """Remove markdown code blocks (```json ... ```) around an LLM response"""
+    cleaned_text = llm_text.strip()
+    if cleaned_text.startswith("```json"):
+        cleaned_text = re.sub(r'^```json\s*', '', cleaned_text)
+        cleaned_text = re.sub(r'\s*```$', '', cleaned_text)
+    elif cleaned_text.startswith("```"):
+        cleaned_text = re.sub(r'^```\s*', '', cleaned_text)
+        cleaned_text = re.sub(r'\s*```$', '', cleaned_text)
+    return cleaned_text
+
+
+def parse_llm_response(llm_text: str, user_text: str) -> Tuple[str, str, Dict]:
+    """Extract translation, context description and word breakdown from LLM output.
     
-    # Step 5: Parse LLM response and extract clean translation
+    Returns:
+        Tuple of (translation, context_desc, word_breakdown)
+    """
     try:
-        # Clean up the response - remove markdown code blocks if present
-        cleaned_text = llm_text.strip()
-        if cleaned_text.startswith("```json"):
-            cleaned_text = re.sub(r'^```json\s*', '', cleaned_text)
-            cleaned_text = re.sub(r'\s*```$', '', cleaned_text)
-        elif cleaned_text.startswith("```"):
-            cleaned_text = re.sub(r'^```\s*', '', cleaned_text)
-            cleaned_text = re.sub(r'\s*```$', '', cleaned_text)
-        
         # Try to parse JSON response from LLM
-        llm_response = json.loads(cleaned_text)
+        llm_response = json.loads(strip_code_fences(llm_text))
         translation = llm_response.get("translation", user_text)
         context_desc = llm_response.get("context", "Translation")
         word_breakdown = llm_response.get("word_breakdown", {})
@@ -440,19 +405,243 @@ Return in this EXACT JSON format:
             translation = user_text
             context_desc = "Translation"
             word_breakdown = {}
+    return translation, context_desc, word_breakdown
+
+
+def glossary_side(match: Dict) -> str:
+    """Language of the glossary side the keyword matched ('english' or 'marshallese')"""
+    keyword = canonical_key(match["keyword"])
+    if keyword == canonical_key(match["english"]):
+        return 'english'
+    if keyword == canonical_key(match["marshallese"]):
+        return 'marshallese'
+    return ''
+
+
+def use_glossary_only(user_text: str, search_results: Dict) -> bool:
+    """Decide whether the glossary alone can answer, per GLOSSARY_FAST_PATH.
+    
+    Policies:
+    - 'always': the exact matches cover every word of the input, stop words
+      included (they never become keywords, so "Where is my arm?" still goes
+      to the LLM)
+    - 'single_phrase': the whole input is one exact glossary entry
+    - 'never': always ask the LLM
+    """
+    policy = getattr(settings, 'GLOSSARY_FAST_PATH', 'single_phrase')
+    keywords = search_results.get("keywords", [])
+    exact_matches = search_results.get("exact_matches", [])
+    
+    if policy == 'never' or not keywords or len(exact_matches) != len(keywords):
+        return False
+    if policy == 'always':
+        covered = [token for match in exact_matches for token in canonical_tokens(tokenize(match["keyword"]))]
+        return covered == canonical_tokens(tokenize(user_text))
+    if policy == 'single_phrase':
+        return len(keywords) == 1 and canonical_key(keywords[0]) == canonical_key(user_text)
+    return False
+
+
+def assemble_glossary_translation(search_results: Dict, target_lang: str, category_name: str = None) -> Tuple[str, str, Dict]:
+    """Build a translation straight from exact glossary matches (no LLM call).
+    
+    Each keyword is replaced by the opposite side of the glossary entry it
+    matched, in input order.
+    
+    Returns:
+        Tuple of (translation, context_desc, word_breakdown)
+    """
+    parts = []
+    word_breakdown = {}
+    for match in search_results.get("exact_matches", []):
+        side = glossary_side(match)
+        if side == 'english':
+            translated = match["marshallese"]
+        elif side == 'marshallese':
+            translated = match["english"]
+        else:
+            translated = match[target_lang]
+        parts.append(translated)
+        word_breakdown[match["keyword"]] = {"translation": translated, "source": "exact", "confidence": "high"}
+    
+    if category_name is None:
+        _, category_name = detect_category(search_results.get("exact_matches", []))
+    return ' '.join(parts), f"{category_name} (glossary)", word_breakdown
+
+
+def assemble_fallback_translation(search_results: Dict, target_lang: str) -> Tuple[str, Dict]:
+    """Best word-by-word translation the glossary can give without the LLM.
+    
+    Each keyword takes its exact match, else the aligned span of its phrase
+    match, else its fuzzy match; keywords without any match are kept as-is.
     
-    # Step 6: Determine source, confidence, and admin flag
+    Returns:
+        Tuple of (translation, word_breakdown)
+    """
+    found = {}
+    for match in search_results.get("fuzzy_matches", []):
+        if match.get(target_lang):
+            found[match["keyword"]] = (match[target_lang], "fuzzy", "low")
+    for match in search_results.get("phrase_matches", []):
+        # No span when the word could not be aligned inside the phrase
+        if match.get("span"):
+            found[match["keyword"]] = (match["span"], "phrase", "medium")
+    for match in search_results.get("exact_matches", []):
+        side = glossary_side(match)
+        if side == 'english':
+            translated = match["marshallese"]
+        elif side == 'marshallese':
+            translated = match["english"]
+        else:
+            translated = match[target_lang]
+        found[match["keyword"]] = (translated, "exact", "high")
+    
+    parts = []
+    word_breakdown = {}
+    for keyword in search_results.get("keywords", []):
+        translated, source, confidence = found.get(keyword, (keyword, "untranslated", "low"))
+        parts.append(translated)
+        word_breakdown[keyword] = {"translation": translated, "source": source, "confidence": confidence}
+    return ' '.join(parts), word_breakdown
+
+
+def glossary_fallback_result(user_text: str, detected_lang: str, target_lang: str, search_results: Dict,
+                             reason: str, category: Tuple = None) -> Dict:
+    """Result served when the LLM is unavailable (circuit open, error or deadline).
+    
+    Uses the glossary matches alone and is always flagged for admin review.
+    Never cached, so the LLM answer replaces it once the provider recovers.
+    """
+    translation, word_breakdown = assemble_fallback_translation(search_results, target_lang)
+    result = build_translation_result(
+        user_text, detected_lang, target_lang, search_results,
+        translation or user_text, "Glossary only (AI unavailable)", word_breakdown, category=category
+    )
+    result.update({
+        "source": "glossary_fallback",
+        "confidence": "low",
+        "admin_review_needed": True,
+        "notes": f"Translation quality: low. AI unavailable ({reason}), assembled from the glossary. Admin review: Required"
+    })
+    return result
+
+
+def llm_deadline() -> float:
+    """Seconds one request may wait for the LLM (TRANSLATION_LLM_DEADLINE_SECONDS)"""
+    return getattr(settings, 'TRANSLATION_LLM_DEADLINE_SECONDS', 20)
+
+
+def remaining_deadline(requested: float) -> float:
+    """What is left of the LLM deadline after queueing since requested (time.monotonic())
+    
+    Raises:
+        LLMTimeoutError: the queue wait used up the whole deadline
+    """
+    remaining = llm_deadline() - (time.monotonic() - requested)
+    if remaining <= 0:
+        raise LLMTimeoutError("deadline passed while queued")
+    return remaining
+
+
+def call_llm(context: str, tier: str = None, system: str = TRANSLATION_INSTRUCTIONS) -> str:
+    """Call the LLM through the priority queue and circuit breaker, within the request deadline.
+    
+    Args:
+        context: Prompt
+        tier: Caller's subscription tier (see core.subscription_tiers), picks the queue class
+        system: Static instruction text, sent as the provider's system instruction
+    
+    Raises:
+        CircuitOpenError: circuit is open, the LLM was not called
+        LoadShedError: queue is overloaded, the LLM was not called
+        Exception: provider error (LLMTimeoutError past the deadline)
+    """
+    breaker = get_circuit_breaker()
+    if breaker.rejects():
+        raise CircuitOpenError("circuit open")
+    requested = time.monotonic()
+    with get_llm_queue().slot(tier, timeout=llm_deadline()):
+        # The time spent queued counts against the deadline
+        deadline = remaining_deadline(requested)
+        if not breaker.allow():
+            raise CircuitOpenError("circuit open")
+        started = time.monotonic()
+        try:
+            llm_text = llm.generate(context, timeout=deadline, system=system)
+        except Exception:
+            breaker.record_failure(time.monotonic() - started)
+            raise
+        except BaseException:
+            breaker.release_probe()
+            raise
+        breaker.record_success(time.monotonic() - started)
+    return llm_text or "{}"
+
+
+def stream_llm(context: str, tier: str = None, system: str = TRANSLATION_INSTRUCTIONS) -> Iterator[str]:
+    """Streaming variant of call_llm (the whole stream counts as one call and holds one slot)"""
+    breaker = get_circuit_breaker()
+    if breaker.rejects():
+        raise CircuitOpenError("circuit open")
+    requested = time.monotonic()
+    with get_llm_queue().slot(tier, timeout=llm_deadline()):
+        deadline = remaining_deadline(requested)
+        if not breaker.allow():
+            raise CircuitOpenError("circuit open")
+        started = time.monotonic()
+        try:
+            for text in llm.generate_stream(context, timeout=deadline, system=system):
+                yield text
+        except Exception:
+            breaker.record_failure(time.monotonic() - started)
+            raise
+        except BaseException:
+            # GeneratorExit: the SSE client went away mid-stream, no verdict on the LLM
+            breaker.release_probe()
+            raise
+        breaker.record_success(time.monotonic() - started)
+
+
+def llm_failure_reason(error: Exception) -> str:
+    """Short reason shown in the notes of a glossary fallback result"""
+    if isinstance(error, CircuitOpenError):
+        return "circuit open"
+    if isinstance(error, LoadShedError):
+        return "high load"
+    return f"Gemini API error: {str(error)}"
+
+
+def highest_tier(tiers) -> str:
+    """Highest-priority tier among several callers (None when none is known)"""
+    known = [tier for tier in tiers if tier in TIERS]
+    return min(known, key=TIERS.index) if known else None
+
+
+def build_translation_result(user_text: str, detected_lang: str, target_lang: str, search_results: Dict,
+                             translation: str, context_desc: str, word_breakdown: Dict,
+                             category: Tuple = None) -> Dict:
+    """Attach source, confidence, admin flag, category and details to a translation.
+    
+    category: Already detected (category_id, category_name), skips the lookup
+    """
+    keywords = search_results.get("keywords", [user_text])
+    exact_matches = search_results.get("exact_matches", [])
+    phrase_matches = search_results.get("phrase_matches", [])
+    fuzzy_matches = search_results.get("fuzzy_matches", [])
+    not_found_count = search_results.get("not_found_count", 0)
+    
+    # Determine source, confidence, and admin flag
     if len(exact_matches) == len(keywords):
         # All keywords found with exact match - no admin review needed
         source = "exact_match"
         confidence = "high"
         admin_review = False
-    elif len(fuzzy_matches) > 0 and not_found_count == 0:
+    elif len(fuzzy_matches) > 0 and not_found_count == 0 and not phrase_matches:
         # Only fuzzy matches (no exact, no missing) - NEEDS admin review
         source = "fuzzy_match"
         confidence = "medium"
         admin_review = True
-    elif len(exact_matches) > 0 or len(fuzzy_matches) > 0:
+    elif len(exact_matches) > 0 or len(phrase_matches) > 0 or len(fuzzy_matches) > 0:
         # Mix of matches - needs review if any words not found
         source = "combined"
         confidence = "medium"
@@ -463,40 +652,14 @@ Return in this EXACT JSON format:
         confidence = "medium"
         admin_review = True
     
-    # Step 7: Auto-detect category from matches
-    from .models import Category
-    detected_category_id = None
-    detected_category_name = 'General'
-    
-    all_matches = exact_matches + fuzzy_matches
-    if all_matches:
-        # Get the category from first match (it's a ForeignKey ID)
-        first_category = all_matches[0].get('category')
-        if first_category:
-            try:
-                # If it's a Category object, get the ID
-                if hasattr(first_category, 'id'):
-                    detected_category_id = first_category.id
-                    detected_category_name = first_category.name
-                else:
-                    # It's just an ID
-                    cat_obj = Category.objects.get(id=first_category)
-                    detected_category_id = cat_obj.id
-                    detected_category_name = cat_obj.name
-            except:
-                pass
-    
-    # Default to General if not found
-    if not detected_category_id:
-        general_cat = Category.objects.filter(name='General').first()
-        if general_cat:
-            detected_category_id = general_cat.id
-            detected_category_name = 'General'
+    # Auto-detect category from matches
+    detected_category_id, detected_category_name = category or detect_category(all_matches(search_results))
     
     # Build detailed breakdown
     details = {
         "total_keywords": len(keywords),
         "exact_matches": len(exact_matches),
+        "phrase_matches": len(phrase_matches),
         "fuzzy_matches": len(fuzzy_matches),
         "generated_words": not_found_count,
         "breakdown": word_breakdown,
@@ -504,12 +667,24 @@ Return in this EXACT JSON format:
             {"keyword": m["keyword"], "translation": f"{m['english']} ↔ {m['marshallese']}"} 
             for m in exact_matches
         ],
+        "phrase_match_list": [
+            {"keyword": m["keyword"], "translation": f"{m['english']} ↔ {m['marshallese']}", "span": m["span"]}
+            for m in phrase_matches
+        ],
         "fuzzy_match_list": [
             {"keyword": m["keyword"], "translation": f"{m['english']} ↔ {m['marshallese']}", "similarity": m["similarity"]} 
             for m in fuzzy_matches
         ]
     }
     
+    memory_match = search_results.get("memory_match")
+    if memory_match:
+        details["memory_match"] = {
+            "history_id": memory_match["entry"]["id"],
+            "source_text": memory_match["entry"]["source_text"],
+            "similarity": memory_match["similarity"]
+        }
+    
     return {
         "translation": translation,
         "context": context_desc,
@@ -523,3 +698,702 @@ Return in this EXACT JSON format:
         "admin_review_needed": admin_review,
         "notes": f"Translation quality: {confidence}. Admin review: {'Required' if admin_review else 'Not needed'}"
     }
+
+
+def translate_with_ai(user_text: str, tier: str = None) -> Dict:
+    """
+    Translate text using AI with database lookup, served from the
+    in-process result cache or the shared TranslationCacheEntry store
+    when the same text was translated before against the current glossary version.
+    Concurrent requests for the same text are coalesced into one upstream call.
+    
+    Args:
+        user_text: Text to translate
+        tier: Caller's subscription tier, sets its LLM queue priority
+        
+    Returns:
+        Dictionary with translation, context, source, confidence, details, admin_review_needed, notes
+    """
+    known, memory_match = lookup_known_translation(user_text)
+    if known is not None:
+        return known
+    
+    # Concurrent requests for the same text share one upstream call
+    flight = get_single_flight()
+    glossary_version = get_glossary_version()
+    direction = translation_direction(user_text)
+    store = get_translation_store()
+    
+    def compute():
+        result = translate_uncached(user_text, memory_match, tier)
+        # Other workers waiting on the lock read it straight after we release it
+        cache_translation(user_text, result, sync=flight.cross_worker)
+        return result
+    
+    def recheck():
+        if store is None:
+            return None
+        stored = store.get(user_text, direction, glossary_version)
+        if stored is not None:
+            get_translation_cache().set(user_text, stored, glossary_version)
+        return stored
+    
+    return flight.do(single_flight_key(user_text, direction, glossary_version, tier), compute, recheck=recheck)
+
+
+def single_flight_key(user_text: str, direction: str, glossary_version: str, tier: str = None) -> str:
+    """Coalescing key of a translation.
+    
+    The tier sets queue priority and load shedding, so a premium caller must
+    never receive a free-tier caller's shed glossary_fallback.
+    """
+    return f"{tier or ''}:{TranslationStore.make_key(user_text, direction, glossary_version)}"
+
+
+def lookup_known_translation(user_text: str) -> Tuple:
+    """Answer from the translation memory or the result caches, without any search.
+    
+    Order: admin-reviewed sentence (see reusable_memory_match), in-process cache, shared store.
+    
+    Returns:
+        Tuple of (result or None, memory_match or None); the memory match is
+        still useful as a prompt hint when it is below the reuse threshold
+    """
+    # Admin-reviewed sentences win over anything cached
+    memory_match = lookup_translation_memory(user_text)
+    if reusable_memory_match(user_text, memory_match):
+        print(f"[DEBUG] Translation memory hit for '{user_text[:50]}' (similarity: {memory_match['similarity']})")
+        return build_memory_result(user_text, memory_match), memory_match
+    
+    cache = get_translation_cache()
+    glossary_version = get_glossary_version()
+    
+    cached = cache.get(user_text, glossary_version)
+    if cached is not None:
+        print(f"[DEBUG] Translation cache hit for '{user_text[:50]}'")
+        return cached, memory_match
+    
+    # Shared store: survives deploys and is visible to every worker
+    store = get_translation_store()
+    if store is not None:
+        stored = store.get(user_text, translation_direction(user_text), glossary_version)
+        if stored is not None:
+            print(f"[DEBUG] Translation store hit for '{user_text[:50]}'")
+            cache.set(user_text, stored, glossary_version)
+            return stored, memory_match
+    
+    return None, memory_match
+
+
+def cache_translation(user_text: str, result: Dict, sync: bool = False):
+    """Save a fresh result in the in-process cache and the shared store"""
+    glossary_version = get_glossary_version()
+    get_translation_cache().set(user_text, result, glossary_version)
+    store = get_translation_store()
+    if store is not None:
+        store.put(user_text, translation_direction(user_text), glossary_version, result, sync=sync)
+
+
+def content_tokens(text: str) -> list:
+    """Canonical words of text minus stop words, in order (numbers included)"""
+    return [token for token in canonical_tokens(tokenize(text)) if token not in STOP_WORDS]
+
+
+def reusable_memory_match(user_text: str, memory_match: Dict) -> bool:
+    """Whether a translation memory match may be served instead of translating.
+    
+    Exact matches (same canonical key) always qualify. A near match must reach
+    TRANSLATION_MEMORY_REUSE_THRESHOLD and have exactly the same content words
+    and numbers, so "Take ten tablets" is never answered with "Take two tablets".
+    
+    Args:
+        user_text: Raw input text
+        memory_match: Result of TranslationMemory.lookup, or None
+        
+    Returns:
+        True if build_memory_result may answer the request
+    """
+    if not memory_match:
+        return False
+    if memory_match.get("exact"):
+        return True
+    if memory_match["similarity"] < getattr(settings, 'TRANSLATION_MEMORY_REUSE_THRESHOLD', 0.95):
+        return False
+    return content_tokens(user_text) == content_tokens(memory_match["entry"]["source_text"])
+
+
+def build_memory_result(user_text: str, memory_match: Dict, category: Tuple = None) -> Dict:
+    """Result served straight from an admin-reviewed sentence (no search, no LLM).
+    
+    Only an exact match is served as reviewed; a near match keeps medium
+    confidence and is queued for admin review, since the reviewed sentence
+    is not the one that was asked.
+    """
+    entry = memory_match["entry"]
+    exact = bool(memory_match.get("exact"))
+    detected_lang = detect_language(user_text)
+    target_lang = 'marshallese' if detected_lang == 'english' else 'english'
+    category_id, category_name = category or detect_category([entry])
+    
+    return {
+        "translation": entry["known_translation"],
+        "context": entry.get("notes") or f"{category_name} (translation memory)",
+        "source": "translation_memory",
+        "confidence": "high" if exact else "medium",
+        "detected_language": detected_lang,
+        "target_language": target_lang,
+        "category": category_id,
+        "category_name": category_name,
+        "details": {
+            "memory_match": {
+                "history_id": entry["id"],
+                "source_text": entry["source_text"],
+                "similarity": memory_match["similarity"]
+            }
+        },
+        "admin_review_needed": not exact,
+        "notes": (
+            "Translation quality: high. Reused an admin-reviewed translation" if exact
+            else "Translation quality: medium. Reused the admin-reviewed translation of a similar sentence"
+        )
+    }
+
+
+def translation_direction(user_text: str) -> str:
+    """Direction label used in persistent cache keys, e.g. 'english_to_marshallese'"""
+    detected_lang = detect_language(user_text)
+    target_lang = 'marshallese' if detected_lang == 'english' else 'english'
+    return f"{detected_lang}_to_{target_lang}"
+
+
+def prepare_translation(user_text: str, memory_match: Dict = None) -> Dict:
+    """
+    Everything that happens before the LLM call: language detection,
+    glossary search and the glossary-only fast path.
+    
+    Args:
+        user_text: Text to translate
+        memory_match: Similar admin-reviewed sentence to pass to the LLM as a hint
+        
+    Returns:
+        Dictionary with detected_lang, target_lang, search_results and
+        result (the final result when no LLM call is needed, else None)
+    """
+    # Step 0: Auto-detect language
+    detected_lang, confidence = get_language_detector().detect(user_text)
+    target_lang = 'marshallese' if detected_lang == 'english' else 'english'
+    print(f"[DEBUG] Detected language: {detected_lang} ({confidence}) -> Target: {target_lang}")
+    prepared = {
+        "detected_lang": detected_lang,
+        "target_lang": target_lang,
+        "search_results": {},
+        "result": None
+    }
+    
+    # Step 1-2: Segment into phrases/keywords and search database (exact + phrase + fuzzy)
+    search_results = search_translation_db(user_text)
+    
+    if "error" in search_results:
+        prepared["result"] = error_result(user_text, detected_lang, target_lang, f"Database error: {search_results['error']}")
+        return prepared
+    
+    if memory_match:
+        search_results["memory_match"] = memory_match
+    prepared["search_results"] = search_results
+    
+    # Step 3: Glossary-only fast path - no network call when every segment is an exact match
+    if use_glossary_only(user_text, search_results):
+        print(f"[DEBUG] Glossary fast path: all {search_results['total_keywords']} segment(s) matched exactly")
+        translation, context_desc, word_breakdown = assemble_glossary_translation(search_results, target_lang)
+        prepared["result"] = build_translation_result(
+            user_text, detected_lang, target_lang, search_results,
+            translation, context_desc, word_breakdown
+        )
+    elif not llm:
+        prepared["result"] = error_result(user_text, detected_lang, target_lang, "Gemini API key not configured")
+    
+    return prepared
+
+
+def translate_uncached(user_text: str, memory_match: Dict = None, tier: str = None) -> Dict:
+    """
+    Translate text using AI with database lookup (no result caching).
+    
+    Workflow:
+    0. Long input is split into sentence chunks translated in parallel (translate_chunked)
+    1. Auto-detect input language (English or Marshallese)
+    2. Segment input into glossary phrases and keywords
+    3. Search database (exact + phrase + fuzzy)
+    4. Answer from the glossary alone when allowed (GLOSSARY_FAST_PATH)
+    5. Otherwise send findings to Gemini LLM (glossary-only fallback when it is unavailable)
+    6. Parse and return translation with metadata
+    
+    Args:
+        user_text: Text to translate
+        memory_match: Similar admin-reviewed sentence to pass to the LLM as a hint
+        tier: Caller's subscription tier, sets its LLM queue priority
+        
+    Returns:
+        Dictionary with translation, context, source, confidence, details, admin_review_needed, notes
+    """
+    chunks = split_into_chunks(user_text)
+    if len(chunks) > 1:
+        return translate_chunked(user_text, chunks, tier)
+    
+    prepared = prepare_translation(user_text, memory_match)
+    if prepared["result"] is not None:
+        return prepared["result"]
+    
+    # Step 4: Send findings to LLM, sharing the call with other in-flight requests when micro-batching is on
+    if getattr(settings, 'TRANSLATION_MICRO_BATCH_ENABLED', False):
+        return get_micro_batcher().submit({"text": user_text, "tier": tier, **prepared})
+    return translate_prepared(user_text, prepared, tier)
+
+
+# Sentence boundaries: after . ! ? ; followed by whitespace, or line breaks
+SENTENCE_BREAK = re.compile(r'(?<=[.!?;])\s+|\s*\n+\s*')
+
+CONFIDENCE_RANK = {"low": 0, "medium": 1, "high": 2}
+
+
+def split_into_chunks(user_text: str, max_chars: int = None) -> List[str]:
+    """Split text into sentences and pack whole sentences into chunks of up to max_chars.
+    
+    A single sentence longer than max_chars stays one chunk. Text no longer
+    than max_chars (or max_chars 0) is returned as one chunk.
+    
+    Args:
+        user_text: Text to split
+        max_chars: Chunk size (defaults to TRANSLATION_CHUNK_MAX_CHARS)
+    """
+    if max_chars is None:
+        max_chars = getattr(settings, 'TRANSLATION_CHUNK_MAX_CHARS', 300)
+    if not max_chars or len(user_text) <= max_chars:
+        return [user_text]
+    
+    chunks = []
+    current = ''
+    for sentence in SENTENCE_BREAK.split(user_text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks or [user_text]
+
+
+def translate_chunked(user_text: str, chunks: List[str], tier: str = None) -> Dict:
+    """
+    Translate a long text chunk by chunk and reassemble the result in order.
+    
+    Every chunk goes through translate_with_ai on its own (translation memory,
+    caches, glossary fast path), so only the chunks that still need the LLM
+    call it. Those calls run concurrently, at most TRANSLATION_CHUNK_PARALLELISM at a time.
+    
+    Args:
+        user_text: Full input text
+        chunks: Output of split_into_chunks
+        tier: Caller's subscription tier, sets its LLM queue priority
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    parallelism = max(1, min(getattr(settings, 'TRANSLATION_CHUNK_PARALLELISM', 4), len(chunks)))
+    print(f"[DEBUG] Long input: {len(chunks)} chunk(s), up to {parallelism} in parallel")
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='translation-chunk') as pool:
+        results = list(pool.map(lambda chunk: translate_chunk_in_thread(chunk, tier), chunks))
+    return combine_chunk_results(user_text, chunks, results)
+
+
+def translate_chunk_in_thread(chunk: str, tier: str = None) -> Dict:
+    """Thread pool entry point: the thread closes its own DB connection"""
+    from django.db import connection
+    
+    try:
+        return translate_with_ai(chunk, tier)
+    finally:
+        connection.close()
+
+
+def combine_chunk_results(user_text: str, chunks: List[str], results: List[Dict]) -> Dict:
+    """Reassemble per-chunk results into one result (same shape as translate_with_ai)"""
+    from collections import Counter
+    
+    detected_lang = detect_language(user_text)
+    target_lang = 'marshallese' if detected_lang == 'english' else 'english'
+    
+    sources = [result.get("source") for result in results]
+    if "error" in sources:
+        source = "error"  # Not cached, the next request retries
+    elif "glossary_fallback" in sources:
+        source = "glossary_fallback"
+    elif len(set(sources)) == 1:
+        source = sources[0]
+    else:
+        source = "combined"
+    confidence = min((result.get("confidence", "low") for result in results), key=lambda c: CONFIDENCE_RANK.get(c, 0))
+    admin_review = any(result.get("admin_review_needed", True) for result in results)
+    
+    # Category shared by most chunks (first one wins a tie)
+    categories = Counter(
+        (result.get("category"), result.get("category_name"))
+        for result in results if result.get("category_name")
+    )
+    category_id, category_name = categories.most_common(1)[0][0] if categories else (None, 'General')
+    
+    details = {
+        "total_keywords": 0,
+        "exact_matches": 0,
+        "phrase_matches": 0,
+        "fuzzy_matches": 0,
+        "generated_words": 0,
+        "breakdown": {},
+        "exact_match_list": [],
+        "phrase_match_list": [],
+        "fuzzy_match_list": [],
+        "chunks": []
+    }
+    for chunk, result in zip(chunks, results):
+        chunk_details = result.get("details", {})
+        for key in ("total_keywords", "exact_matches", "phrase_matches", "fuzzy_matches", "generated_words"):
+            details[key] += chunk_details.get(key, 0)
+        for keyword, word in chunk_details.get("breakdown", {}).items():
+            details["breakdown"].setdefault(keyword, word)
+        for key in ("exact_match_list", "phrase_match_list", "fuzzy_match_list"):
+            details[key].extend(chunk_details.get(key, []))
+        details["chunks"].append({
+            "text": chunk,
+            "translation": result.get("translation", ""),
+            "source": result.get("source"),
+            "confidence": result.get("confidence"),
+            "admin_review_needed": result.get("admin_review_needed", True)
+        })
+    
+    return {
+        "translation": ' '.join(result.get("translation", "") for result in results),
+        "context": f"{category_name} ({len(chunks)} parts)",
+        "source": source,
+        "confidence": confidence,
+        "detected_language": detected_lang,
+        "target_language": target_lang,
+        "category": category_id,
+        "category_name": category_name,
+        "details": details,
+        "admin_review_needed": admin_review,
+        "notes": f"Translated in {len(chunks)} parts. Translation quality: {confidence}. "
+                 f"Admin review: {'Required' if admin_review else 'Not needed'}"
+    }
+
+
+def translate_prepared(user_text: str, prepared: Dict, tier: str = None) -> Dict:
+    """LLM step of translate_uncached for a text already run through prepare_translation"""
+    detected_lang = prepared["detected_lang"]
+    target_lang = prepared["target_lang"]
+    search_results = prepared["search_results"]
+    
+    context = build_translation_context(user_text, detected_lang, target_lang, search_results)
+    try:
+        llm_text = call_llm(context, tier)
+    except Exception as e:
+        print(f"[DEBUG] LLM unavailable, serving glossary fallback: {e}")
+        return glossary_fallback_result(
+            user_text, detected_lang, target_lang, search_results, llm_failure_reason(e)
+        )
+    
+    # Step 5: Parse LLM response and extract clean translation
+    translation, context_desc, word_breakdown = parse_llm_response(llm_text, user_text)
+    
+    # Step 6: Determine source, confidence, admin flag and category
+    return build_translation_result(
+        user_text, detected_lang, target_lang, search_results,
+        translation, context_desc, word_breakdown
+    )
+
+
+def translate_batch(texts: List[str], tier: str = None) -> List[Dict]:
+    """
+    Translate many texts with at most one LLM call.
+    
+    Each text is first answered from the translation memory, the caches or
+    the glossary fast path. Only the texts left over are sent to Gemini
+    together in one structured prompt, and the answers are mapped back by item id.
+    Duplicate texts in the batch are translated once.
+    
+    Args:
+        texts: Texts to translate
+        tier: Caller's subscription tier, sets its LLM queue priority
+        
+    Returns:
+        List of translation result dicts, in the same order as texts
+    """
+    results = [None] * len(texts)
+    pending = {}
+    
+    for position, text in enumerate(texts):
+        key = canonical_key(text)
+        if key in pending:
+            pending[key]["positions"].append(position)
+            continue
+        
+        known, memory_match = lookup_known_translation(text)
+        if known is not None:
+            results[position] = known
+            continue
+        
+        prepared = prepare_translation(text, memory_match)
+        if prepared["result"] is not None:
+            cache_translation(text, prepared["result"])
+            results[position] = prepared["result"]
+            continue
+        
+        pending[key] = {"text": text, "positions": [position], "tier": tier, **prepared}
+    
+    if pending:
+        items = list(pending.values())
+        print(f"[DEBUG] Batch: {len(texts)} text(s), {len(items)} sent to the LLM in one call")
+        for item, result in zip(items, translate_pending_batch(items)):
+            cache_translation(item["text"], result)
+            for position in item["positions"]:
+                results[position] = copy.deepcopy(result)
+    
+    return results
+
+
+def translate_pending_batch(items: List[Dict], retry_missing: bool = True) -> List[Dict]:
+    """Send prepared items to Gemini in one prompt and build a result for each.
+    
+    Items the model leaves out of its answer are sent again as one batch
+    (retry_missing), and any still missing after that are translated alone
+    in parallel. The call is queued with the highest tier among the items.
+    """
+    context = build_batch_context(items)
+    tier = highest_tier(item.get("tier") for item in items)
+    try:
+        answers = parse_batch_response(call_llm(context, tier, system=BATCH_INSTRUCTIONS))
+    except Exception as e:
+        print(f"[DEBUG] LLM unavailable, serving glossary fallback for the batch: {e}")
+        return [
+            glossary_fallback_result(
+                item["text"], item["detected_lang"], item["target_lang"], item["search_results"],
+                llm_failure_reason(e)
+            )
+            for item in items
+        ]
+    
+    results = [None] * len(items)
+    missing = []
+    for item_id, item in enumerate(items, start=1):
+        answer = answers.get(item_id)
+        if not answer or not answer.get("translation"):
+            missing.append(item_id - 1)
+            continue
+        results[item_id - 1] = build_translation_result(
+            item["text"], item["detected_lang"], item["target_lang"], item["search_results"],
+            answer["translation"], answer.get("context", "Translation"), answer.get("word_breakdown", {})
+        )
+    
+    if missing:
+        print(f"[DEBUG] Batch answer missing {len(missing)} of {len(items)} item(s), retrying them")
+        retried = retry_missing_items([items[index] for index in missing], rebatch=retry_missing)
+        for index, result in zip(missing, retried):
+            results[index] = result
+    return results
+
+
+def retry_missing_items(items: List[Dict], rebatch: bool = True) -> List[Dict]:
+    """Items a batch answer left out: one more batch call, or single calls
+    running at most TRANSLATION_CHUNK_PARALLELISM at a time"""
+    from concurrent.futures import ThreadPoolExecutor
+    
+    if rebatch and len(items) > 1:
+        return translate_pending_batch(items, retry_missing=False)
+    if len(items) == 1:
+        return [translate_prepared(items[0]["text"], items[0], items[0].get("tier"))]
+    
+    parallelism = max(1, min(getattr(settings, 'TRANSLATION_CHUNK_PARALLELISM', 4), len(items)))
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='translation-retry') as pool:
+        return list(pool.map(translate_prepared_in_thread, items))
+
+
+def translate_prepared_in_thread(item: Dict) -> Dict:
+    """Thread pool entry point: the thread closes its own DB connection"""
+    from django.db import connection
+    
+    try:
+        return translate_prepared(item["text"], item, item.get("tier"))
+    finally:
+        connection.close()
+
+
+def build_batch_context(items: List[Dict]) -> str:
+    """Build one Gemini prompt covering several texts, each with its own database findings (send with BATCH_INSTRUCTIONS)"""
+    return get_prompt_builder().batch_prompt(items)
+
+
+def parse_batch_response(llm_text: str) -> Dict[int, Dict]:
+    """Map item id -> {"translation", "context", "word_breakdown"} from a batch answer"""
+    try:
+        llm_response = json.loads(strip_code_fences(llm_text))
+    except ValueError:
+        return {}
+    
+    items = llm_response.get("items", []) if isinstance(llm_response, dict) else llm_response
+    answers = {}
+    for answer in items if isinstance(items, list) else []:
+        try:
+            answers[int(answer.get("id"))] = answer
+        except (AttributeError, TypeError, ValueError):
+            continue
+    return answers
+
+
+def translate_with_ai_stream(user_text: str, tier: str = None) -> Iterator[Tuple[str, Dict]]:
+    """
+    Streaming variant of translate_with_ai.
+    
+    Yields (event, data) tuples:
+    - "draft": glossary-resolved draft, sent as soon as the database lookup is done
+    - "translation": {"delta": text} pieces of the LLM translation as they are generated
+    - "final": the complete result dict (same shape as translate_with_ai)
+    
+    Results from the translation memory or the caches skip straight to "final".
+    
+    Args:
+        user_text: Text to translate
+        tier: Caller's subscription tier, sets its LLM queue priority
+    """
+    known, memory_match = lookup_known_translation(user_text)
+    if known is not None:
+        yield "final", known
+        return
+    
+    prepared = prepare_translation(user_text, memory_match)
+    detected_lang = prepared["detected_lang"]
+    target_lang = prepared["target_lang"]
+    search_results = prepared["search_results"]
+    
+    if search_results:
+        yield "draft", build_draft(search_results, detected_lang, target_lang)
+    
+    if prepared["result"] is not None:
+        cache_translation(user_text, prepared["result"])
+        yield "final", prepared["result"]
+        return
+    
+    context = build_translation_context(user_text, detected_lang, target_lang, search_results)
+    extractor = TranslationFieldExtractor()
+    llm_text = ""
+    try:
+        for text in stream_llm(context, tier):
+            llm_text += text
+            delta = extractor.feed(text)
+            if delta:
+                yield "translation", {"delta": delta}
+    except Exception as e:
+        print(f"[DEBUG] LLM unavailable, serving glossary fallback: {e}")
+        yield "final", glossary_fallback_result(
+            user_text, detected_lang, target_lang, search_results, llm_failure_reason(e)
+        )
+        return
+    
+    translation, context_desc, word_breakdown = parse_llm_response(llm_text or "{}", user_text)
+    result = build_translation_result(
+        user_text, detected_lang, target_lang, search_results,
+        translation, context_desc, word_breakdown
+    )
+    cache_translation(user_text, result)
+    yield "final", result
+
+
+def build_draft(search_results: Dict, detected_lang: str, target_lang: str) -> Dict:
+    """Word-by-word draft from the glossary matches (no LLM), in input order.
+    
+    Keywords with an exact, phrase (aligned span) or fuzzy match are replaced
+    by their glossary translation; the rest are left as typed.
+    """
+    translations = {}
+    for match in search_results.get("fuzzy_matches", []):
+        translations.setdefault(match["keyword"], (match[target_lang], "fuzzy"))
+    for match in search_results.get("phrase_matches", []):
+        if match.get("span"):
+            translations[match["keyword"]] = (match["span"], "phrase")
+    for match in search_results.get("exact_matches", []):
+        side = glossary_side(match)
+        if side == 'english':
+            translated = match["marshallese"]
+        elif side == 'marshallese':
+            translated = match["english"]
+        else:
+            translated = match[target_lang]
+        translations[match["keyword"]] = (translated, "exact")
+    
+    words = []
+    for keyword in search_results.get("keywords", []):
+        translated, source = translations.get(keyword, (keyword, "not_found"))
+        words.append({"keyword": keyword, "translation": translated, "source": source})
+    
+    return {
+        "draft": ' '.join(word["translation"] for word in words),
+        "detected_language": detected_lang,
+        "target_language": target_lang,
+        "words": words,
+        "exact_matches": search_results.get("exact_count", 0),
+        "fuzzy_matches": search_results.get("fuzzy_count", 0)
+    }
+
+
+class TranslationFieldExtractor:
+    """Pull the value of the "translation" field out of a JSON response while it streams.
+    
+    feed() takes raw chunks and returns the newly decoded part of the
+    translation string (empty until the field starts, and after it ends).
+    """
+    
+    FIELD_START = re.compile(r'"translation"\s*:\s*"')
+    
+    def __init__(self):
+        self.buffer = ""
+        self.start = None
+        self.emitted = 0
+        self.done = False
+    
+    def feed(self, chunk: str) -> str:
+        if self.done:
+            return ""
+        self.buffer += chunk
+        if self.start is None:
+            match = self.FIELD_START.search(self.buffer)
+            if not match:
+                return ""
+            self.start = match.end()
+        
+        # Scan to the closing quote, stopping before an incomplete escape sequence
+        raw = self.buffer[self.start:]
+        position = 0
+        while position < len(raw):
+            char = raw[position]
+            if char == '\\':
+                escape_length = 2
+                if raw[position + 1:position + 2] == 'u':
+                    # A high surrogate only decodes together with the low one after it
+                    escape_length = 12 if raw[position + 2:position + 4].lower() in ('d8', 'd9', 'da', 'db') else 6
+                if position + escape_length > len(raw):
+                    break
+                position += escape_length
+            elif char == '"':
+                self.done = True
+                break
+            else:
+                position += 1
+        
+        try:
+            decoded = json.loads(f'"{raw[:position]}"')
+        except ValueError:
+            return ""
+        delta = decoded[self.emitted:]
+        self.emitted = len(decoded)
+        return delta
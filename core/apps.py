@@ -1,5 +1,35 @@
+import threading
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        post_migrate.connect(repair_search_index, sender=self)
+        if getattr(settings, 'TRANSLATION_STORE_WARM_ON_STARTUP', False):
+            # Load stored translations in the background so startup is not delayed
+            threading.Thread(target=warm_on_startup, name='translation-cache-warmer', daemon=True).start()
+
+
+def repair_search_index(sender, using='default', verbosity=1, **kwargs):
+    """Migrations that rebuild a table drop its FTS5 sync triggers, put them back"""
+    from .full_text_search import repair_full_text_search
+
+    repaired = repair_full_text_search(using)
+    if repaired and verbosity:
+        print(f"  Rebuilt full-text search index: {', '.join(repaired)}")
+
+
+def warm_on_startup():
+    from django.db import connection
+    from .translation_cache import warm_translation_cache
+
+    try:
+        warm_translation_cache()
+    except Exception as e:
+        print(f"[DEBUG] Translation cache warm-up skipped: {e}")
+    finally:
+        connection.close()
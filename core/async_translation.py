@@ -0,0 +1,191 @@
+"""
+Async translate pipeline for the ASGI app
+Same steps as core.ai_service.translate_with_ai, but every database read goes
+through the async ORM and the Gemini call is awaited with a deadline, so one
+process can keep many translations in flight without a thread per request.
+The CPU-only pieces (segmentation, matching, prompt building, parsing) are
+shared with the sync path.
+"""
+import asyncio
+import time
+from typing import Dict, List, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from . import ai_service
+from .circuit_breaker import CircuitOpenError, get_circuit_breaker
+from .glossary_index import aget_glossary_index
+from .llm_providers import LLMTimeoutError
+from .llm_queue import get_async_llm_queue
+from .prompt_builder import TRANSLATION_INSTRUCTIONS
+from .single_flight import get_single_flight
+from .translation_cache import get_translation_cache, get_translation_store
+from .translation_memory import aget_translation_memory
+
+
+async def adetect_category(matches: List[Dict]) -> Tuple:
+    """Async variant of ai_service.detect_category"""
+    from .models import Category
+
+    if matches and matches[0].get('category'):
+        category = await Category.objects.filter(id=matches[0]['category']).values('id', 'name').afirst()
+        if category:
+            return category['id'], category['name']
+
+    general_cat = await Category.objects.filter(name='General').values('id').afirst()
+    return (general_cat['id'] if general_cat else None), 'General'
+
+
+async def atranslate_with_ai(user_text: str, tier: str = None) -> Dict:
+    """
+    Translate text without blocking the event loop.
+
+    Order: translation memory, in-process cache, shared store, then the
+    glossary search and (when needed) Gemini. Concurrent requests for the
+    same text are coalesced into one upstream call.
+
+    Args:
+        user_text: Text to translate
+        tier: Caller's subscription tier, sets its LLM queue priority
+
+    Returns:
+        Dictionary with translation, context, source, confidence, details, admin_review_needed, notes
+    """
+    glossary = await aget_glossary_index()
+    memory = await aget_translation_memory()
+
+    memory_match = memory.lookup(
+        user_text,
+        getattr(settings, 'TRANSLATION_MEMORY_HINT_THRESHOLD', 0.8),
+        getattr(settings, 'TRANSLATION_MEMORY_MAX_CANDIDATES', 200)
+    )
+    if ai_service.reusable_memory_match(user_text, memory_match):
+        category = await adetect_category([memory_match["entry"]])
+        return ai_service.build_memory_result(user_text, memory_match, category=category)
+
+    cache = get_translation_cache()
+    cached = cache.get(user_text, glossary.version)
+    if cached is not None:
+        return cached
+
+    store = get_translation_store()
+    direction = ai_service.translation_direction(user_text)
+    if store is not None:
+        stored = await store.aget(user_text, direction, glossary.version)
+        if stored is not None:
+            cache.set(user_text, stored, glossary.version)
+            return stored
+
+    async def compute():
+        result = await atranslate_uncached(user_text, glossary, memory_match, tier)
+        cache.set(user_text, result, glossary.version)
+        if store is not None:
+            if store.write_behind:
+                # Only queues the write, no database work on the event loop
+                store.put(user_text, direction, glossary.version, result)
+            else:
+                await sync_to_async(store.put)(user_text, direction, glossary.version, result)
+        return result
+
+    # Concurrent requests for the same text share one upstream call
+    flight_key = ai_service.single_flight_key(user_text, direction, glossary.version, tier)
+    return await get_single_flight().ado(flight_key, compute)
+
+
+async def atranslate_uncached(user_text: str, glossary, memory_match: Dict = None, tier: str = None) -> Dict:
+    """
+    Async variant of ai_service.translate_uncached.
+
+    Args:
+        user_text: Text to translate
+        glossary: Current GlossaryIndex (from aget_glossary_index)
+        memory_match: Similar admin-reviewed sentence to pass to the LLM as a hint
+        tier: Caller's subscription tier, sets its LLM queue priority
+    """
+    chunks = ai_service.split_into_chunks(user_text)
+    if len(chunks) > 1:
+        return await atranslate_chunked(user_text, chunks, tier)
+
+    detected_lang = ai_service.detect_language(user_text)
+    target_lang = 'marshallese' if detected_lang == 'english' else 'english'
+
+    search_results = ai_service.search_translation_db(user_text, glossary)
+    if "error" in search_results:
+        return ai_service.error_result(user_text, detected_lang, target_lang, f"Database error: {search_results['error']}")
+    if memory_match:
+        search_results["memory_match"] = memory_match
+
+    category = await adetect_category(ai_service.all_matches(search_results))
+
+    if ai_service.use_glossary_only(user_text, search_results):
+        _, category_name = await adetect_category(search_results.get("exact_matches", []))
+        translation, context_desc, word_breakdown = ai_service.assemble_glossary_translation(
+            search_results, target_lang, category_name=category_name
+        )
+        return ai_service.build_translation_result(
+            user_text, detected_lang, target_lang, search_results,
+            translation, context_desc, word_breakdown, category=category
+        )
+
+    llm = ai_service.llm
+    if not llm:
+        return ai_service.error_result(user_text, detected_lang, target_lang, "Gemini API key not configured")
+
+    context = ai_service.build_translation_context(user_text, detected_lang, target_lang, search_results)
+    try:
+        llm_text = await acall_llm(context, tier)
+    except Exception as e:
+        print(f"[DEBUG] LLM unavailable, serving glossary fallback: {e}")
+        return ai_service.glossary_fallback_result(
+            user_text, detected_lang, target_lang, search_results,
+            ai_service.llm_failure_reason(e), category=category
+        )
+
+    translation, context_desc, word_breakdown = ai_service.parse_llm_response(llm_text, user_text)
+    return ai_service.build_translation_result(
+        user_text, detected_lang, target_lang, search_results,
+        translation, context_desc, word_breakdown, category=category
+    )
+
+
+async def atranslate_chunked(user_text: str, chunks: List[str], tier: str = None) -> Dict:
+    """Async variant of ai_service.translate_chunked (same parallelism limit)"""
+    semaphore = asyncio.Semaphore(max(1, getattr(settings, 'TRANSLATION_CHUNK_PARALLELISM', 4)))
+
+    async def translate_chunk(chunk):
+        async with semaphore:
+            return await atranslate_with_ai(chunk, tier)
+
+    results = await asyncio.gather(*(translate_chunk(chunk) for chunk in chunks))
+    return ai_service.combine_chunk_results(user_text, chunks, list(results))
+
+
+async def acall_llm(context: str, tier: str = None) -> str:
+    """Async variant of ai_service.call_llm (same circuit breaker and deadline; waits for a slot of
+    the async tier queue without holding a thread)"""
+    breaker = get_circuit_breaker()
+    if breaker.rejects():
+        raise CircuitOpenError("circuit open")
+    requested = time.monotonic()
+    async with get_async_llm_queue().aslot(tier, timeout=ai_service.llm_deadline()):
+        # The time spent queued counts against the deadline
+        deadline = ai_service.remaining_deadline(requested)
+        if not breaker.allow():
+            raise CircuitOpenError("circuit open")
+        started = time.monotonic()
+        try:
+            llm_text = await asyncio.wait_for(
+                ai_service.llm.agenerate(context, timeout=deadline, system=TRANSLATION_INSTRUCTIONS),
+                timeout=deadline
+            )
+        except asyncio.TimeoutError:
+            breaker.record_failure(time.monotonic() - started)
+            raise LLMTimeoutError(f"no response within {deadline}s")
+        except Exception:
+            breaker.record_failure(time.monotonic() - started)
+            raise
+        except BaseException:
+            # CancelledError: the caller went away, no verdict on the LLM
+            breaker.release_probe()
+            raise
+        breaker.record_success(time.monotonic() - started)
+    return llm_text or "{}"
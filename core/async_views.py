@@ -0,0 +1,148 @@
+"""
+Native async views (served by the ASGI app in english_marshallese/asgi.py)
+DRF function views are sync only, so these are plain Django async views
+that authenticate the JWT themselves and answer with the same
+{"success", "message", "data"} envelope as core.views.
+"""
+import json
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .async_translation import atranslate_with_ai
+from .models import Category, UserTranslationHistory
+from .subscription_tiers import get_user_tier
+from .translation_jobs import enqueue_review_notification
+from .views import check_translation_quota, translation_history_fields, translation_response_data, with_quota_headers
+
+
+def async_success_response(message, data=None, code=200):
+    """Standard success response format (JsonResponse)"""
+    return JsonResponse({
+        "success": True,
+        "message": message,
+        "data": data
+    }, status=code, encoder=DjangoJSONEncoder)
+
+
+def async_error_response(message, errors=None, code=400):
+    """Standard error response format (JsonResponse)"""
+    return JsonResponse({
+        "success": False,
+        "message": message,
+        "errors": errors or {}
+    }, status=code)
+
+
+async def authenticate_jwt(request):
+    """
+    Authenticate the Bearer token like DRF's JWTAuthentication.
+
+    Returns:
+        User, or None when the header is missing or the token is invalid
+    """
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    if header is None:
+        return None
+    raw_token = authenticator.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        validated_token = authenticator.get_validated_token(raw_token)
+        return await sync_to_async(authenticator.get_user, thread_sensitive=False)(validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+async def aresolve_translation_category(result, category):
+    """Async variant of core.views.resolve_translation_category"""
+    ai_category_id = result.get('category')
+    if ai_category_id:
+        category_obj = await Category.objects.filter(id=ai_category_id).afirst()
+        if category_obj:
+            return category_obj
+
+    if category:
+        try:
+            category_obj = await Category.objects.filter(id=int(category)).afirst()
+        except (ValueError, TypeError):
+            category_obj = await Category.objects.filter(name__iexact=category).afirst()
+        return category_obj
+
+    category_obj, _ = await Category.objects.aget_or_create(name='General')
+    return category_obj
+
+
+@csrf_exempt
+async def ai_translate_async(request):
+    """
+    AI-powered translation, async end to end (serve with the ASGI app)
+    POST /api/core/translation/async/
+    {
+        "text": "I have a headache",
+        "category": "symptoms"  // optional: same as POST /api/core/translation/
+    }
+
+    Requires authentication (Bearer token)
+    Returns the same data as POST /api/core/translation/
+    """
+    if request.method != 'POST':
+        return async_error_response(message=f"Method \"{request.method}\" not allowed.", code=405)
+
+    user = await authenticate_jwt(request)
+    if user is None:
+        return async_error_response(
+            message="Authentication credentials were not provided or are invalid.",
+            code=401
+        )
+
+    try:
+        body = json.loads(request.body or b'{}')
+    except ValueError:
+        return async_error_response(message="Invalid JSON body", code=400)
+
+    text = str(body.get('text', '') or '').strip()
+    category = str(body.get('category', '') or '').strip()  # Can be ID or name
+
+    if not text:
+        return async_error_response(
+            message="Text is required",
+            errors={"text": ["This field is required"]},
+            code=400
+        )
+
+    # Rate limit and daily quota, before any search or LLM work. These helpers
+    # don't share a transaction with the rest of the request, so they run on
+    # the thread pool instead of queueing for the single thread-sensitive thread
+    quota = await sync_to_async(check_translation_quota, thread_sensitive=False)(user)
+    if quota and not quota.allowed:
+        return with_quota_headers(
+            async_error_response(message=quota.reason, errors={"quota": [quota.reason]}, code=429),
+            quota
+        )
+
+    tier = await sync_to_async(get_user_tier, thread_sensitive=False)(user)
+    result = await atranslate_with_ai(text, tier=tier)
+
+    category_obj = await aresolve_translation_category(result, category)
+    if category_obj is None:
+        return async_error_response(
+            message="Invalid category",
+            errors={"category": [f"Category '{category}' not found. Use GET /api/core/categories/ to see available categories."]},
+            code=400
+        )
+
+    history = await UserTranslationHistory.objects.acreate(**translation_history_fields(user, text, result, category_obj))
+
+    if result.get('admin_review_needed', True):
+        # OneSignal client is sync (HTTP request), keep it off the request path
+        enqueue_review_notification(user, text, history.id)
+
+    return with_quota_headers(async_success_response(
+        message="Translation completed successfully",
+        data=translation_response_data(result, category_obj, history.id)
+    ), quota)
@@ -0,0 +1,239 @@
+"""
+Prefix autocomplete over the glossary for the search suggestions endpoint
+Keeps the canonical English and Marshallese text of every Translation in
+two sorted arrays. A keystroke is two binary searches for the prefix range
+plus a top-k by usage_count, with no database query. Local edits are applied
+incrementally (see the signal handlers in core.models); edits made by other
+workers are picked up by comparing the glossary fingerprint at most once
+every GLOSSARY_INDEX_REFRESH_SECONDS.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional
+from django.conf import settings
+from .glossary_index import database_stamp
+from .normalization import canonical_key, prefix_upper_bound
+
+SIDES = ('english', 'marshallese')
+
+# Cached keystroke results kept between glossary changes
+MAX_CACHED_RESULTS = 10000
+
+
+def rank(entry: Dict) -> tuple:
+    return -(entry['usage_count'] or 0), canonical_key(entry['english']), entry['id']
+
+
+class AutocompleteIndex:
+    """Sorted (canonical text, id) arrays per language, updated in place"""
+
+    def __init__(self, entries: List[Dict], version: str):
+        self.version = version
+        self.entries = {}
+        # id -> sort key of its suggestions: most used first, then alphabetical
+        self.ranks = {}
+        self.keys = {side: [] for side in SIDES}
+        self._results = {}
+        self._lock = threading.Lock()
+        for entry in entries:
+            self._index(entry)
+        for side in SIDES:
+            self.keys[side].sort()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _index(self, entry: Dict):
+        self.entries[entry['id']] = entry
+        self.ranks[entry['id']] = rank(entry)
+        for side in SIDES:
+            key = canonical_key(entry[side])
+            if key:
+                self.keys[side].append((key, entry['id']))
+
+    def add(self, entry: Dict):
+        """Insert or replace one translation"""
+        with self._lock:
+            self._unindex(entry['id'])
+            self.entries[entry['id']] = entry
+            self.ranks[entry['id']] = rank(entry)
+            for side in SIDES:
+                key = canonical_key(entry[side])
+                if key:
+                    insort(self.keys[side], (key, entry['id']))
+            self._results = {}
+
+    def remove(self, translation_id: int):
+        with self._lock:
+            self._unindex(translation_id)
+            self._results = {}
+
+    def _unindex(self, translation_id: int):
+        entry = self.entries.pop(translation_id, None)
+        if entry is None:
+            return
+        del self.ranks[translation_id]
+        for side in SIDES:
+            keys = self.keys[side]
+            item = (canonical_key(entry[side]), translation_id)
+            position = bisect_left(keys, item)
+            if position < len(keys) and keys[position] == item:
+                del keys[position]
+
+    def set_usage(self, translation_id: int, usage_count: int):
+        """Re-rank after a usage counter bump (keys are unchanged)"""
+        with self._lock:
+            entry = self.entries.get(translation_id)
+            if entry is not None and entry['usage_count'] != usage_count:
+                entry = self.entries[translation_id] = {**entry, 'usage_count': usage_count}
+                self.ranks[translation_id] = rank(entry)
+                self._results = {}
+
+    def suggest(self, prefix: str, limit: int = 5, language: Optional[str] = None) -> List[Dict]:
+        """
+        Most used translations whose text starts with prefix.
+
+        Args:
+            prefix: What the user typed so far (any casing, spelling or diacritics)
+            limit: Number of suggestions
+            language: 'english' or 'marshallese' to search one side, None for both
+
+        Returns:
+            Entry dicts (id, english, marshallese, category, category_display,
+            usage_count), highest usage_count first
+        """
+        key = canonical_key(prefix)
+        if not key or limit <= 0:
+            return []
+        sides = (language,) if language in SIDES else SIDES
+        cache_key = (key, limit, sides)
+        results = self._results.get(cache_key)
+        if results is not None:
+            return results
+
+        upper = prefix_upper_bound(key)
+        with self._lock:
+            ids = set()
+            for side in sides:
+                keys = self.keys[side]
+                start = bisect_left(keys, (key,))
+                end = bisect_left(keys, (upper,), start)
+                ids.update(translation_id for _, translation_id in keys[start:end])
+            results = [
+                self.entries[translation_id]
+                for translation_id in heapq.nsmallest(limit, ids, key=self.ranks.__getitem__)
+            ]
+            if len(self._results) >= MAX_CACHED_RESULTS:
+                self._results = {}
+            self._results[cache_key] = results
+        return results
+
+
+_autocomplete = None
+_dirty = True
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def autocomplete_entry(translation) -> Dict:
+    """Index entry for a Translation instance"""
+    return {
+        'id': translation.id,
+        'english': translation.english_text,
+        'marshallese': translation.marshallese_text,
+        'category': translation.category_id,
+        'category_display': translation.category.name if translation.category_id else None,
+        'usage_count': translation.usage_count,
+    }
+
+
+def build_autocomplete_index(version: str = '') -> AutocompleteIndex:
+    from .models import Translation
+
+    rows = Translation.objects.order_by().values(
+        'id', 'english_text', 'marshallese_text', 'category', 'category__name', 'usage_count'
+    )
+    entries = [
+        {
+            'id': row['id'],
+            'english': row['english_text'],
+            'marshallese': row['marshallese_text'],
+            'category': row['category'],
+            'category_display': row['category__name'],
+            'usage_count': row['usage_count'],
+        }
+        for row in rows
+    ]
+    return AutocompleteIndex(entries, version or database_stamp())
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    """Return the autocomplete index, rebuilding it when another process changed the glossary"""
+    global _autocomplete, _dirty, _checked_at
+
+    interval = getattr(settings, 'GLOSSARY_INDEX_REFRESH_SECONDS', 30)
+    index = _autocomplete
+    if index is not None and not _dirty and time.monotonic() - _checked_at < interval:
+        return index
+
+    with _lock:
+        if _autocomplete is None or _dirty or time.monotonic() - _checked_at >= interval:
+            was_dirty = _dirty
+            _dirty = False
+            try:
+                stamp = database_stamp()
+                if _autocomplete is None or was_dirty or stamp != _autocomplete.version:
+                    _autocomplete = build_autocomplete_index(stamp)
+                    print(f"[DEBUG] Autocomplete index rebuilt: {len(_autocomplete)} translations (version {stamp})")
+            except Exception:
+                _dirty = _dirty or was_dirty
+                raise
+            _checked_at = time.monotonic()
+        return _autocomplete
+
+
+def suggest(prefix: str, limit: int = 5, language: Optional[str] = None) -> List[Dict]:
+    """Top suggestions for a prefix, at most AUTOCOMPLETE_MAX_RESULTS (see AutocompleteIndex.suggest)"""
+    limit = min(limit, getattr(settings, 'AUTOCOMPLETE_MAX_RESULTS', 20))
+    return get_autocomplete_index().suggest(prefix, limit, language)
+
+
+def autocomplete_saved(entry: Dict):
+    """Apply a committed insert or edit without rebuilding the index"""
+    global _checked_at
+
+    index = _autocomplete
+    if index is None or _dirty:
+        return
+    index.add(entry)
+    with _lock:
+        # Our own change is already applied, only a foreign change needs a rebuild
+        index.version = database_stamp()
+        _checked_at = time.monotonic()
+
+
+def autocomplete_deleted(translation_id: int):
+    global _checked_at
+
+    index = _autocomplete
+    if index is None or _dirty:
+        return
+    index.remove(translation_id)
+    with _lock:
+        index.version = database_stamp()
+        _checked_at = time.monotonic()
+
+
+def autocomplete_usage(translation_id: int, usage_count: int):
+    """Usage bumps don't change the glossary fingerprint, so no version update"""
+    index = _autocomplete
+    if index is not None:
+        index.set_usage(translation_id, usage_count)
+
+
+def invalidate_autocomplete_index():
+    """Mark the index stale so the next lookup rebuilds it"""
+    global _dirty
+    _dirty = True
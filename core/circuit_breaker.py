@@ -0,0 +1,170 @@
+"""
+Circuit breaker around the LLM call
+Tracks the outcome and latency of recent LLM calls. When too many of them
+fail or run slow, the circuit opens and callers skip the LLM entirely (the
+translate path answers from the glossary instead) until a cool-down passes.
+After that a few half-open probe calls decide whether to close it again.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict
+from django.conf import settings
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the circuit is open"""
+    pass
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker with latency percentiles.
+
+    A call counts as bad when it raised or took longer than slow_call_seconds.
+    The circuit opens once at least min_calls are in the window and the bad
+    call rate reaches failure_rate.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, min_calls: int = 10, window: int = 50,
+                 slow_call_seconds: float = 10, open_seconds: float = 30, half_open_probes: int = 1):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)  # True = bad call
+        self._latencies = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def allow(self) -> bool:
+        """Whether the caller may call the LLM now (False = serve the fallback)"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def rejects(self) -> bool:
+        """Cheap check before queueing for a call: True (counted as rejected) while open and cooling down"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return True
+            return False
+
+    def record_success(self, latency: float):
+        """Report a call that returned (it still counts as bad when slow)"""
+        self._record(latency, latency > self.slow_call_seconds)
+
+    def record_failure(self, latency: float):
+        """Report a call that raised or ran past its deadline"""
+        self._record(latency, True)
+
+    def release_probe(self):
+        """Report a call abandoned before it finished (client gone, task cancelled).
+
+        Says nothing about the LLM's health, it only hands back the half-open
+        probe slot so the next caller can probe instead.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def _record(self, latency: float, bad: bool):
+        with self._lock:
+            self.calls += 1
+            if bad:
+                self.failures += 1
+            self._latencies.append(latency)
+
+            if self.state == HALF_OPEN:
+                if bad:
+                    self._open()
+                else:
+                    # Probe succeeded, start over with a clean window
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append(bad)
+            if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate):
+                self._open()
+
+    def _open(self):
+        print(f"[DEBUG] LLM circuit opened for {self.open_seconds}s")
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.opened += 1
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self._outcomes.clear()
+            self._latencies.clear()
+
+    def stats(self) -> Dict:
+        """State, counters and latency percentiles over the recent window"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            outcomes = list(self._outcomes)
+            state = self.state
+            if state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                state = HALF_OPEN
+
+            def percentile(p):
+                if not latencies:
+                    return None
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+            return {
+                "state": state,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "times_opened": self.opened,
+                "window_failure_rate": round(sum(outcomes) / len(outcomes), 3) if outcomes else 0.0,
+                "latency_p50": percentile(0.50),
+                "latency_p95": percentile(0.95),
+                "latency_p99": percentile(0.99),
+            }
+
+
+_circuit_breaker = None
+_circuit_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Process-wide LLM circuit breaker, configured from settings on first use"""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        with _circuit_breaker_lock:
+            if _circuit_breaker is None:
+                _circuit_breaker = CircuitBreaker(
+                    failure_rate=getattr(settings, 'LLM_CIRCUIT_FAILURE_RATE', 0.5),
+                    min_calls=getattr(settings, 'LLM_CIRCUIT_MIN_CALLS', 10),
+                    window=getattr(settings, 'LLM_CIRCUIT_WINDOW', 50),
+                    slow_call_seconds=getattr(settings, 'LLM_CIRCUIT_SLOW_CALL_SECONDS', 10),
+                    open_seconds=getattr(settings, 'LLM_CIRCUIT_OPEN_SECONDS', 30),
+                    half_open_probes=getattr(settings, 'LLM_CIRCUIT_HALF_OPEN_PROBES', 1),
+                )
+    return _circuit_breaker
@@ -0,0 +1,223 @@
+"""
+Full-text search over translations, user submissions and AI feedback
+On SQLite with FTS5 every searchable model gets an external-content FTS5
+table (tokenized with diacritics removed) kept in sync by triggers, and
+searches run MATCH ranked by bm25. Other backends, or SQLite builds without
+FTS5, fall back to icontains on the same columns.
+
+Django rebuilds a SQLite table (dropping its triggers) when a migration
+alters it. Searches only use FTS5 while the sync triggers are in place, and
+a post_migrate handler (repair_full_text_search) recreates missing triggers
+and reindexes the affected tables after every migrate.
+"""
+import re
+from typing import Dict, List, Tuple
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from .normalization import fold_diacritics
+
+# model label -> (FTS5 table, indexed text columns)
+FTS_TABLES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'core.translation': ('core_translation_fts', ('english_text', 'marshallese_text')),
+    'core.usersubmission': ('core_usersubmission_fts', ('source_text', 'known_translation', 'notes')),
+    'core.usertranslationhistory': ('core_usertranslationhistory_fts', ('source_text', 'known_translation', 'notes')),
+}
+
+TRIGGER_SUFFIXES = ('ai', 'ad', 'au')
+
+_WORD = re.compile(r'\w+')
+_available = {}
+
+
+def fts5_supported(connection) -> bool:
+    """Whether the database can create FTS5 tables"""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if cursor.fetchone()[0]:
+            return True
+        # Some builds load FTS5 without the compile option being reported
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+            cursor.execute("DROP TABLE temp.fts5_probe")
+            return True
+        except Exception:
+            return False
+
+
+def install_full_text_search(schema_editor, labels=None) -> bool:
+    """
+    (Re)create the FTS5 tables and their sync triggers, then index existing rows.
+
+    Args:
+        schema_editor: Schema editor of the target database
+        labels: Model labels to install (default: all of FTS_TABLES)
+
+    Returns:
+        False when the database has no FTS5 (nothing is created)
+    """
+    connection = schema_editor.connection
+    if not fts5_supported(connection):
+        return False
+
+    for label in labels or FTS_TABLES:
+        fts, columns = FTS_TABLES[label]
+        table = label.replace('.', '_')
+        uninstall_full_text_search(schema_editor, [label])
+
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        old_values = ', '.join(f'old.{column}' for column in columns)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({column_list}, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+        )
+        schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    forget_availability(connection.alias)
+    return True
+
+
+def uninstall_full_text_search(schema_editor, labels=None):
+    """Drop the FTS5 tables and triggers (no-op where they don't exist)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for label in labels or FTS_TABLES:
+        fts, _ = FTS_TABLES[label]
+        for suffix in TRIGGER_SUFFIXES:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+    forget_availability(schema_editor.connection.alias)
+
+
+def forget_availability(using: str):
+    for key in [key for key in _available if key[0] == using]:
+        del _available[key]
+
+
+def _sync_objects(label: str) -> Tuple[str, ...]:
+    """Names of the content table, FTS5 table and triggers that make up a working index"""
+    fts, _ = FTS_TABLES[label]
+    return label.replace('.', '_'), fts, *(f'{fts}_{suffix}' for suffix in TRIGGER_SUFFIXES)
+
+
+def _existing_objects(connection, label: str) -> set:
+    names = _sync_objects(label)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})", list(names)
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def full_text_available(model, using: str = 'default') -> bool:
+    """Whether the model's FTS5 table and its sync triggers exist on the database (checked once per process)"""
+    key = (using, model._meta.label_lower)
+    if key not in _available:
+        connection = connections[using]
+        available = False
+        if connection.vendor == 'sqlite' and model._meta.label_lower in FTS_TABLES:
+            label = model._meta.label_lower
+            available = _existing_objects(connection, label) == set(_sync_objects(label))
+        _available[key] = available
+    return _available[key]
+
+
+def repair_full_text_search(using: str = 'default') -> List[str]:
+    """
+    Recreate the triggers (and reindex) of FTS5 tables whose triggers were dropped.
+
+    Args:
+        using: Database alias
+
+    Returns:
+        Model labels that were repaired
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return []
+
+    broken = []
+    for label in FTS_TABLES:
+        content_table, fts, *triggers = _sync_objects(label)
+        existing = _existing_objects(connection, label)
+        # Only indexes that were installed and whose content table is still there
+        if {content_table, fts} <= existing and not set(triggers) <= existing:
+            broken.append(label)
+    if broken:
+        with connection.schema_editor() as schema_editor:
+            install_full_text_search(schema_editor, broken)
+    forget_availability(using)
+    return broken
+
+
+def match_expression(query: str) -> str:
+    """FTS5 query matching rows that contain every word of query (as a word prefix)"""
+    words = _WORD.findall(fold_diacritics(query).lower())
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_filter(model, query: str, using: str = 'default') -> Q:
+    """
+    Filter for rows matching query, combinable with other Q objects.
+
+    Args:
+        model: One of the models in FTS_TABLES
+        query: Raw search text
+        using: Database alias
+
+    Returns:
+        Q on id (FTS5 MATCH) or an OR of icontains on the indexed columns
+    """
+    fts, columns = FTS_TABLES[model._meta.label_lower]
+    match = match_expression(query)
+    if match and full_text_available(model, using):
+        return Q(id__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", (match,)))
+
+    condition = Q()
+    for column in columns:
+        condition |= Q(**{f'{column}__icontains': query})
+    return condition
+
+
+def search(queryset, query: str):
+    """
+    Rows of queryset matching query, best match first (bm25) when FTS5 is available.
+
+    Other filters may be applied before or after. Without FTS5 the queryset's
+    own ordering is kept.
+
+    Args:
+        queryset: Queryset of a model in FTS_TABLES
+        query: Raw search text
+
+    Returns:
+        Filtered queryset (annotated with search_rank under FTS5)
+    """
+    model = queryset.model
+    queryset = queryset.filter(search_filter(model, query, queryset.db))
+    match = match_expression(query)
+    if not match or not full_text_available(model, queryset.db):
+        return queryset
+
+    fts, _ = FTS_TABLES[model._meta.label_lower]
+    rank = RawSQL(
+        f'SELECT bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND rowid = "{model._meta.db_table}"."id"',
+        (match,)
+    )
+    return queryset.annotate(search_rank=rank).order_by('search_rank', '-id')
@@ -0,0 +1,552 @@
+"""
+In-memory glossary index for the translation pipeline
+Keeps a process-local snapshot of the Translation table so keyword lookups
+are answered from memory instead of issuing queries per keyword
+"""
+import asyncio
+import threading
+import time
+import weakref
+from collections import Counter, defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from .language_detector import LanguageDetector
+from .normalization import EDGE_PUNCTUATION, canonical_key, canonical_tokens, normalize_text, tokenize
+
+# Minimum Dice association between a source word and a target word before
+# the target word is reported as that source word's translation span
+SPAN_MIN_ASSOCIATION = 0.5
+
+
+class NgramIndex:
+    """Character n-gram inverted index used to generate fuzzy match candidates.
+
+    Instead of comparing a keyword against every glossary string, only the
+    strings that share character n-grams with it (and whose length could
+    still reach the similarity threshold) are returned for scoring.
+    """
+
+    def __init__(self, n: int = 2):
+        self.n = n
+        self.keys = []
+        self.gram_counts = []
+        self.postings = defaultdict(list)
+
+    def grams(self, key: str) -> set:
+        """Distinct padded n-grams of a normalized key"""
+        padded = f" {key} "
+        if len(padded) <= self.n:
+            return {padded}
+        return {padded[i:i + self.n] for i in range(len(padded) - self.n + 1)}
+
+    def add(self, key: str) -> int:
+        """Index a normalized key and return its document id"""
+        doc_id = len(self.keys)
+        grams = self.grams(key)
+        self.keys.append(key)
+        self.gram_counts.append(len(grams))
+        for gram in grams:
+            self.postings[gram].append(doc_id)
+        return doc_id
+
+    def candidates(self, query: str, threshold: float, max_candidates: int) -> List[int]:
+        """Return ids of documents that could plausibly reach the threshold.
+
+        A SequenceMatcher ratio of ``threshold`` needs the shorter string to
+        be at least ``threshold / (2 - threshold)`` of the longer one, so
+        documents outside that length window are dropped before ranking the
+        rest by shared n-grams (Dice coefficient). Walking that ranking,
+        documents whose shared characters bound the ratio below the threshold
+        (difflib's quick_ratio, never lower than ratio) are skipped without
+        counting against max_candidates, so the cap only cuts rows that could
+        still match.
+
+        Args:
+            query: Normalized query key
+            threshold: Similarity threshold the caller will apply
+            max_candidates: Maximum number of documents to return
+
+        Returns:
+            Document ids, most promising first
+        """
+        query_grams = self.grams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+
+        query_len = len(query)
+        min_len = query_len * threshold / (2 - threshold)
+        max_len = query_len * (2 - threshold) / threshold
+        query_gram_count = len(query_grams)
+
+        scored = []
+        for doc_id, count in shared.items():
+            if min_len <= len(self.keys[doc_id]) <= max_len:
+                dice = 2 * count / (query_gram_count + self.gram_counts[doc_id])
+                scored.append((dice, doc_id))
+
+        scored.sort(reverse=True)
+        query_chars = Counter(query)
+        candidates = []
+        for _, doc_id in scored:
+            key = self.keys[doc_id]
+            common = sum((query_chars & Counter(key)).values())
+            if 2 * common / (query_len + len(key)) < threshold:
+                continue
+            candidates.append(doc_id)
+            if len(candidates) >= max_candidates:
+                break
+        return candidates
+
+
+class PhraseAutomaton:
+    """Word-level Aho-Corasick automaton over normalized glossary phrases.
+
+    Finds every glossary phrase occurring in a token sequence in one linear
+    pass, which lets the input be segmented into the longest known phrases.
+    Transitions live in a single dict keyed by (state, token) to keep the
+    per-state overhead low on large glossaries.
+    """
+
+    def __init__(self):
+        self.transitions = {}
+        self.depth = [0]
+        self.fail = [0]
+        self.terminal = [None]
+        self.dict_link = [0]
+        self._built = False
+
+    def add(self, tokens: List[str], entry: Dict):
+        """Add a phrase; the first entry added for a phrase wins"""
+        state = 0
+        for token in tokens:
+            next_state = self.transitions.get((state, token))
+            if next_state is None:
+                next_state = len(self.depth)
+                self.transitions[(state, token)] = next_state
+                self.depth.append(self.depth[state] + 1)
+                self.fail.append(0)
+                self.terminal.append(None)
+                self.dict_link.append(0)
+            state = next_state
+        if state and self.terminal[state] is None:
+            self.terminal[state] = entry
+
+    def build(self):
+        """Compute failure and dictionary suffix links (breadth first)"""
+        children = defaultdict(list)
+        for (state, token), next_state in self.transitions.items():
+            children[state].append((token, next_state))
+
+        queue = deque(next_state for _, next_state in children[0])
+        while queue:
+            state = queue.popleft()
+            for token, next_state in children[state]:
+                fallback = self.fail[state]
+                while fallback and (fallback, token) not in self.transitions:
+                    fallback = self.fail[fallback]
+                target = self.transitions.get((fallback, token), 0)
+                self.fail[next_state] = target if target != next_state else 0
+                failed = self.fail[next_state]
+                self.dict_link[next_state] = failed if self.terminal[failed] is not None else self.dict_link[failed]
+                queue.append(next_state)
+        self._built = True
+
+    def longest_matches(self, tokens: List[str]) -> List[Optional[Tuple[int, Dict]]]:
+        """For every start position, the longest glossary phrase beginning there.
+
+        Returns:
+            List aligned with tokens: (phrase length, entry) or None
+        """
+        if not self._built:
+            self.build()
+
+        longest = [None] * len(tokens)
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and (state, token) not in self.transitions:
+                state = self.fail[state]
+            state = self.transitions.get((state, token), 0)
+
+            # Walk every phrase ending here via the dictionary suffix links
+            match_state = state if self.terminal[state] is not None else self.dict_link[state]
+            while match_state:
+                length = self.depth[match_state]
+                start = position - length + 1
+                if longest[start] is None or longest[start][0] < length:
+                    longest[start] = (length, self.terminal[match_state])
+                match_state = self.dict_link[match_state]
+        return longest
+
+
+class GlossaryIndex:
+    """Read-only snapshot of the glossary keyed by normalized text.
+
+    A new instance is built whenever the glossary changes, so readers never
+    need a lock: they grab the current instance and keep using it.
+    """
+
+    def __init__(self, entries: List[Dict], version: str):
+        self.entries = entries
+        self.version = version
+        self.english = {}
+        self.marshallese = {}
+        # Same, keyed by canonical_key: catches other spellings of an entry
+        self.english_variants = {}
+        self.marshallese_variants = {}
+        self.fuzzy = NgramIndex()
+        self._fuzzy_entries = []
+        self.words = {'english': defaultdict(list), 'marshallese': defaultdict(list)}
+        # Canonical tokens for matching, original tokens for the spans shown to users
+        self._tokens = []
+        self._display_tokens = []
+        self._spans = {}
+        self.phrases = PhraseAutomaton()
+
+        # Entries arrive newest first, setdefault keeps the same row that
+        # Translation.objects.filter(...).first() used to return
+        for position, entry in enumerate(entries):
+            english_key = normalize_text(entry['english_text'])
+            marshallese_key = normalize_text(entry['marshallese_text'])
+            english_variant = canonical_key(entry['english_text'])
+            marshallese_variant = canonical_key(entry['marshallese_text'])
+            if english_key:
+                self.english.setdefault(english_key, entry)
+                self.english_variants.setdefault(english_variant, entry)
+            if marshallese_key:
+                self.marshallese.setdefault(marshallese_key, entry)
+                self.marshallese_variants.setdefault(marshallese_variant, entry)
+
+            # Both sides go into the fuzzy index, each doc points back to its entry
+            for key in (english_variant, marshallese_variant):
+                if key:
+                    self.fuzzy.add(key)
+                    self._fuzzy_entries.append(entry)
+
+            # Word-level inverted index: token -> entries containing it
+            display_tokens = {
+                'english': tokenize(entry['english_text']),
+                'marshallese': tokenize(entry['marshallese_text']),
+            }
+            tokens = {side: canonical_tokens(side_tokens) for side, side_tokens in display_tokens.items()}
+            self._display_tokens.append(display_tokens)
+            self._tokens.append(tokens)
+            for side, side_tokens in tokens.items():
+                for token in set(side_tokens):
+                    self.words[side][token].append(position)
+                if side_tokens:
+                    self.phrases.add(side_tokens, entry)
+
+        self.phrases.build()
+        self.language = LanguageDetector.train(
+            (entry['english_text'] for entry in entries),
+            (entry['marshallese_text'] for entry in entries),
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup_exact(self, keyword: str) -> Optional[Dict]:
+        """Find a glossary entry whose English or Marshallese text equals the keyword.
+
+        Args:
+            keyword: Keyword or phrase to look up (any casing/spacing)
+
+        Returns:
+            Glossary entry dict or None
+        """
+        key = normalize_text(keyword)
+        if not key:
+            return None
+        entry = self.english.get(key) or self.marshallese.get(key)
+        if entry is None:
+            variant = canonical_key(keyword)
+            entry = self.english_variants.get(variant) or self.marshallese_variants.get(variant)
+        return entry
+
+    def segment(self, text: str) -> List[Dict]:
+        """Split text into the longest glossary phrases plus the gaps between them.
+
+        Scans left to right and always takes the longest known phrase starting
+        at the current word; words not covered by any phrase are grouped into
+        gap segments.
+
+        Args:
+            text: Raw input text
+
+        Returns:
+            Ordered list of {"text": original words, "entry": glossary entry or None}
+        """
+        words = [word for word in text.split() if normalize_text(word)]
+        tokens = [canonical_key(word) for word in words]
+        longest = self.phrases.longest_matches(tokens)
+
+        segments = []
+        gap = []
+        position = 0
+        while position < len(tokens):
+            match = longest[position]
+            if match:
+                if gap:
+                    segments.append({"text": ' '.join(gap), "entry": None})
+                    gap = []
+                length, entry = match
+                phrase_text = ' '.join(words[position:position + length])
+                segments.append({"text": phrase_text.strip(EDGE_PUNCTUATION), "entry": entry})
+                position += length
+            else:
+                gap.append(words[position])
+                position += 1
+        if gap:
+            segments.append({"text": ' '.join(gap), "entry": None})
+        return segments
+
+    def lookup_phrases(self, keyword: str, limit: int = 3) -> List[Dict]:
+        """Find multi-word glossary entries that contain the keyword as a whole word.
+
+        English phrases are searched first, then Marshallese (same order as
+        exact matching). Shorter phrases come first since they are the most
+        specific context for a single word.
+
+        Args:
+            keyword: Single keyword with no exact match
+            limit: Number of phrases to return
+
+        Returns:
+            List of dicts with the glossary entry, the side the keyword was
+            found on, and the aligned target-language span (or None)
+        """
+        token = canonical_key(keyword)
+        if not token or ' ' in token:
+            return []
+
+        for side in ('english', 'marshallese'):
+            positions = [
+                position for position in self.words[side].get(token, ())
+                if len(self._tokens[position][side]) > 1
+            ]
+            if not positions:
+                continue
+
+            positions.sort(key=lambda position: (
+                len(self._tokens[position][side]),
+                -(self.entries[position]['usage_count'] or 0),
+            ))
+            span = self.aligned_span(token, side)
+            return [
+                {"entry": self.entries[position], "side": side, "span": span}
+                for position in positions[:limit]
+            ]
+        return []
+
+    def aligned_span(self, token: str, side: str) -> Optional[str]:
+        """Guess the target-language words that translate a source word.
+
+        Target words are scored by how consistently they co-occur with the
+        source word across glossary phrases (Dice coefficient). The best word,
+        plus neighbouring words that are just as consistent, form the span.
+
+        Args:
+            token: Canonical source word (canonical_key)
+            side: 'english' or 'marshallese' (language of the token)
+
+        Returns:
+            Target-language span, or None when the glossary can't tell
+        """
+        cache_key = (side, token)
+        if cache_key in self._spans:
+            return self._spans[cache_key]
+
+        target = 'marshallese' if side == 'english' else 'english'
+        positions = self.words[side].get(token, ())
+        span = None
+
+        # A single phrase can't separate the word from the rest of the sentence
+        if len(positions) >= 2:
+            co_occurrences = Counter()
+            for position in positions:
+                co_occurrences.update(set(self._tokens[position][target]))
+
+            association = {
+                word: 2 * count / (len(positions) + len(self.words[target][word]))
+                for word, count in co_occurrences.items()
+                if count >= 2
+            }
+            aligned = {word for word, score in association.items() if score >= SPAN_MIN_ASSOCIATION}
+
+            if aligned:
+                best = max(aligned, key=lambda word: association[word])
+                # Extend around the best word inside the shortest phrase that has it
+                shortest = min(
+                    (position for position in positions if best in self._tokens[position][target]),
+                    key=lambda position: len(self._tokens[position][target]),
+                )
+                phrase = self._tokens[shortest][target]
+                start = end = phrase.index(best)
+                while start > 0 and phrase[start - 1] in aligned:
+                    start -= 1
+                while end < len(phrase) - 1 and phrase[end + 1] in aligned:
+                    end += 1
+                span = ' '.join(self._display_tokens[shortest][target][start:end + 1])
+
+        self._spans[cache_key] = span
+        return span
+
+    def fuzzy_candidates(self, keyword: str, threshold: float, max_candidates: Optional[int] = None) -> Iterable[Dict]:
+        """Glossary entries worth scoring against a keyword.
+
+        Args:
+            keyword: Keyword with no exact match
+            threshold: Similarity threshold the caller will apply
+            max_candidates: Cap on candidate strings (defaults to FUZZY_MAX_CANDIDATES)
+
+        Returns:
+            Unique glossary entry dicts
+        """
+        key = canonical_key(keyword)
+        if not key:
+            return []
+        if max_candidates is None:
+            max_candidates = getattr(settings, 'FUZZY_MAX_CANDIDATES', 100)
+
+        seen = set()
+        candidates = []
+        for doc_id in self.fuzzy.candidates(key, threshold, max_candidates):
+            entry = self._fuzzy_entries[doc_id]
+            if entry['id'] not in seen:
+                seen.add(entry['id'])
+                candidates.append(entry)
+        return candidates
+
+
+_index = None
+_dirty = True
+_checked_at = 0.0
+_lock = threading.Lock()
+_async_locks = weakref.WeakKeyDictionary()
+
+
+STAMP_AGGREGATES = {
+    'count': Count('id'),
+    'last_id': Max('id'),
+    'latest': Max('updated_date'),
+}
+
+
+def _format_stamp(stats: Dict) -> str:
+    latest = stats['latest'].timestamp() if stats['latest'] else 0
+    return f"{stats['count']}-{stats['last_id'] or 0}-{latest:.6f}"
+
+
+def database_stamp() -> str:
+    """Cheap fingerprint of the Translation table used as the glossary version"""
+    from .models import Translation
+
+    return _format_stamp(Translation.objects.order_by().aggregate(**STAMP_AGGREGATES))
+
+
+def _glossary_rows():
+    from .models import Translation
+
+    return Translation.objects.order_by('-created_date', '-id').values(
+        'id', 'english_text', 'marshallese_text', 'category', 'usage_count'
+    )
+
+
+def build_glossary_index(version: str = '') -> GlossaryIndex:
+    """Load every Translation row and build a fresh index"""
+    return GlossaryIndex(list(_glossary_rows()), version or database_stamp())
+
+
+def get_glossary_index() -> GlossaryIndex:
+    """Return the current glossary index, rebuilding it when stale.
+
+    The index is rebuilt immediately after a local change (see the signal
+    handlers in core.models). Changes made by other worker processes are
+    picked up by comparing a table fingerprint at most once every
+    GLOSSARY_INDEX_REFRESH_SECONDS.
+    """
+    global _index, _dirty, _checked_at
+
+    interval = getattr(settings, 'GLOSSARY_INDEX_REFRESH_SECONDS', 30)
+    index = _index
+    if index is not None and not _dirty and time.monotonic() - _checked_at < interval:
+        return index
+
+    with _lock:
+        if _index is None or _dirty or time.monotonic() - _checked_at >= interval:
+            # Clear the flag before reading so a change landing mid-build
+            # marks the index stale again
+            was_dirty = _dirty
+            _dirty = False
+            try:
+                stamp = database_stamp()
+                if _index is None or was_dirty or stamp != _index.version:
+                    _index = build_glossary_index(stamp)
+                    print(f"[DEBUG] Glossary index rebuilt: {len(_index)} entries (version {stamp})")
+            except Exception:
+                _dirty = _dirty or was_dirty
+                raise
+            _checked_at = time.monotonic()
+        return _index
+
+
+async def aget_glossary_index() -> GlossaryIndex:
+    """Async variant of get_glossary_index for the ASGI translate path.
+
+    The freshness check and any rebuild (CPU-heavy) run in a worker thread
+    through get_glossary_index, sharing its lock with sync callers. Only one
+    coroutine per event loop waits on that thread; the others wait on an
+    asyncio lock and then reuse its result.
+    """
+    index = _index
+    if _fresh(index):
+        return index
+
+    async with _async_lock():
+        index = _index
+        if _fresh(index):
+            return index
+        return await sync_to_async(_get_glossary_index_in_thread, thread_sensitive=False)()
+
+
+def _fresh(index: Optional[GlossaryIndex]) -> bool:
+    interval = getattr(settings, 'GLOSSARY_INDEX_REFRESH_SECONDS', 30)
+    return index is not None and not _dirty and time.monotonic() - _checked_at < interval
+
+
+def _async_lock() -> asyncio.Lock:
+    """Rebuild lock of the running event loop (an asyncio.Lock can't be shared between loops)"""
+    loop = asyncio.get_running_loop()
+    lock = _async_locks.get(loop)
+    if lock is None:
+        lock = _async_locks[loop] = asyncio.Lock()
+    return lock
+
+
+def _get_glossary_index_in_thread() -> GlossaryIndex:
+    """Worker thread entry point: the thread closes its own DB connection"""
+    from django.db import connection
+
+    try:
+        return get_glossary_index()
+    finally:
+        connection.close()
+
+
+def peek_glossary_index() -> Optional[GlossaryIndex]:
+    """Current index without a freshness check (None until the first build)"""
+    return _index
+
+
+def invalidate_glossary_index():
+    """Mark the index stale so the next lookup rebuilds it"""
+    global _dirty
+    _dirty = True
+
+
+def get_glossary_version() -> str:
+    """Version stamp of the current glossary (changes whenever Translation rows change)"""
+    return get_glossary_index().version
@@ -0,0 +1,162 @@
+"""
+Language detection for translation input (English or Marshallese)
+Two stages: text containing a character that only Marshallese orthography
+uses (macron vowels, cedilla or dot-below consonants, ñ) is Marshallese
+outright; anything else is scored by a character n-gram naive Bayes model
+trained on the glossary's english_text and marshallese_text. The model is
+compiled into one table of per-n-gram log-likelihood ratios each time the
+glossary index is rebuilt, so a detection is about one dict lookup per word.
+"""
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+from .normalization import fold_diacritics
+
+ENGLISH = 'english'
+MARSHALLESE = 'marshallese'
+
+# Letters (and the combining marks that spell them) not used in English text
+MARSHALLESE_CHARS = 'ṃṇḷōāūņļñọạẹịụ\u0304\u0323\u0327'
+_MARSHALLESE_CHAR = re.compile(f"[{MARSHALLESE_CHARS}]", re.IGNORECASE)
+
+NGRAM_SIZES = (1, 2, 3)
+
+# Always part of the training data, so detection works before the glossary is loaded
+SEED_MARSHALLESE = [
+    'iakwe yokwe iokwe kommol tata jinoin emoj ejja ejjab ejjelok ewor',
+    'eok ij kwe kwoj rainin ilju inne bok mona kajjitok bar wot ak ri',
+]
+SEED_ENGLISH = [
+    'a an and are as at be by for from has he in is it its of on or that the to was will with',
+    'i me my you your this these those can do does did where what when who which why how',
+]
+
+
+# Words whose score is kept after the first lookup (training words are precomputed)
+MAX_CACHED_WORDS = 100000
+
+
+def char_ngrams(word: str) -> List[str]:
+    """Character n-grams (NGRAM_SIZES) of a lowercased word padded with spaces"""
+    padded = f" {word} "
+    return [padded[i:i + n] for n in NGRAM_SIZES for i in range(len(padded) - n + 1)]
+
+
+def text_ngrams(text: str) -> List[str]:
+    return [gram for word in text.lower().split() for gram in char_ngrams(word)]
+
+
+class LanguageDetector:
+    """Compiled two-class character n-gram model.
+
+    weights maps an n-gram to log P(n-gram | Marshallese) - log P(n-gram | English);
+    n-grams never seen in training carry no evidence and are skipped. A word's
+    score is the sum over its n-grams, kept in word_scores so a known word
+    costs a single lookup.
+    """
+
+    def __init__(self, weights: Dict[str, float], words: Iterable[str] = ()):
+        self.weights = weights
+        self.word_scores = {}
+        for word in words:
+            self.word_score(word)
+
+    def word_score(self, word: str) -> float:
+        score = self.word_scores.get(word)
+        if score is None:
+            weights = self.weights
+            score = sum(weights.get(gram, 0.0) for gram in char_ngrams(word))
+            if len(self.word_scores) < MAX_CACHED_WORDS:
+                self.word_scores[word] = score
+        return score
+
+    @classmethod
+    def train(cls, english: Iterable[str], marshallese: Iterable[str], smoothing: float = 0.5) -> 'LanguageDetector':
+        """
+        Count n-grams per language and compile the log-likelihood ratios.
+
+        Marshallese text is also counted with its diacritics folded, since
+        input that still has them never reaches the model.
+
+        Args:
+            english: English training texts
+            marshallese: Marshallese training texts
+            smoothing: Additive smoothing for n-grams seen in one language only
+        """
+        counts = {ENGLISH: Counter(), MARSHALLESE: Counter()}
+        words = set()
+        for text in [*SEED_ENGLISH, *english]:
+            if text:
+                counts[ENGLISH].update(text_ngrams(text))
+                words.update(text.lower().split())
+        for text in [*SEED_MARSHALLESE, *marshallese]:
+            if text:
+                folded = fold_diacritics(text)
+                for variant in {text, folded}:
+                    counts[MARSHALLESE].update(text_ngrams(variant))
+                words.update(folded.lower().split())
+
+        vocabulary = set(counts[ENGLISH]) | set(counts[MARSHALLESE])
+        # Each n-gram size is its own distribution
+        totals = {}
+        for n in NGRAM_SIZES:
+            size = sum(1 for gram in vocabulary if len(gram) == n)
+            for language, language_counts in counts.items():
+                seen = sum(count for gram, count in language_counts.items() if len(gram) == n)
+                totals[language, n] = seen + smoothing * size
+
+        weights = {}
+        for gram in vocabulary:
+            n = len(gram)
+            marshallese_p = (counts[MARSHALLESE][gram] + smoothing) / totals[MARSHALLESE, n]
+            english_p = (counts[ENGLISH][gram] + smoothing) / totals[ENGLISH, n]
+            weights[gram] = math.log(marshallese_p / english_p)
+        return cls(weights, words)
+
+    def detect(self, text: str) -> Tuple[str, float]:
+        """
+        Detect whether text is English or Marshallese.
+
+        Args:
+            text: Input text
+
+        Returns:
+            (language, confidence): 'english' or 'marshallese' and the
+            probability of that answer (0.5 = no evidence, defaults to English)
+        """
+        if not text:
+            return ENGLISH, 0.5
+        if _MARSHALLESE_CHAR.search(text):
+            return MARSHALLESE, 1.0
+
+        score = sum(self.word_score(word) for word in text.lower().split())
+        # The unigram, bigram and trigram views overlap, count their evidence once
+        score /= len(NGRAM_SIZES)
+        marshallese_p = 1 / (1 + math.exp(-max(-50.0, min(50.0, score))))
+        if marshallese_p > 0.5:
+            return MARSHALLESE, round(marshallese_p, 3)
+        return ENGLISH, round(1 - marshallese_p, 3)
+
+
+_seed_detector = None
+_seed_detector_lock = threading.Lock()
+
+
+def get_language_detector() -> LanguageDetector:
+    """Detector of the current glossary index, or one trained on the seed words until it is built.
+
+    Never touches the database, so it is safe to call from async code.
+    """
+    global _seed_detector
+    from .glossary_index import peek_glossary_index
+
+    index = peek_glossary_index()
+    if index is not None:
+        return index.language
+    if _seed_detector is None:
+        with _seed_detector_lock:
+            if _seed_detector is None:
+                _seed_detector = LanguageDetector.train([], [])
+    return _seed_detector
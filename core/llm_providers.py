@@ -0,0 +1,285 @@
+"""
+LLM providers for the translation pipeline
+The pipeline only talks to an LLMProvider (generate, agenerate,
+generate_stream, count_tokens); settings.LLM_PROVIDER picks the backend.
+Calls take an optional timeout (seconds) and raise LLMTimeoutError past it,
+and an optional system instruction (static text reused across requests):
+- 'gemini': Google Gemini (needs GEMINI_API_KEY)
+- 'fake': deterministic local stand-in for offline load tests and benchmarks
+"""
+import ast
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import Dict, Iterator, Optional
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+class LLMProviderError(Exception):
+    """Raised by a provider when the upstream call fails"""
+    pass
+
+
+class LLMTimeoutError(LLMProviderError):
+    """Raised when the upstream call does not finish within its timeout"""
+    pass
+
+
+class LLMProvider:
+    """Interface every LLM backend implements"""
+
+    name = 'base'
+
+    def generate(self, prompt: str, timeout: Optional[float] = None, system: Optional[str] = None) -> str:
+        """Return the complete response text for a prompt (system: instruction text sent with it)"""
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, timeout: Optional[float] = None, system: Optional[str] = None) -> str:
+        """Async generate (default: run the sync call in a thread)"""
+        return await sync_to_async(self.generate, thread_sensitive=False)(prompt, timeout, system)
+
+    def generate_stream(self, prompt: str, timeout: Optional[float] = None, system: Optional[str] = None) -> Iterator[str]:
+        """Yield the response text in pieces as it is generated"""
+        yield self.generate(prompt, timeout, system)
+
+    def count_tokens(self, prompt: str) -> int:
+        """Number of input tokens for a prompt (rough estimate by default)"""
+        return max(1, len(prompt) // 4)
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through google-generativeai"""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: str, model_name: str = 'gemini-flash-latest'):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.genai = genai
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self._models = {}
+        self._models_lock = threading.Lock()
+
+    def _model_for(self, system: Optional[str]):
+        """Model with the system instruction built in (one per distinct instruction text)"""
+        if not system:
+            return self.model
+        model = self._models.get(system)
+        if model is None:
+            with self._models_lock:
+                model = self._models.get(system)
+                if model is None:
+                    model = self._models[system] = self.genai.GenerativeModel(self.model_name, system_instruction=system)
+        return model
+
+    @staticmethod
+    def _request_options(timeout):
+        return {"timeout": timeout} if timeout else None
+
+    @staticmethod
+    def _is_timeout(error: Exception) -> bool:
+        return isinstance(error, TimeoutError) or type(error).__name__ in ('DeadlineExceeded', 'Timeout', 'ReadTimeout')
+
+    def generate(self, prompt: str, timeout: Optional[float] = None, system: Optional[str] = None) -> str:
+        try:
+            response = self._model_for(system).generate_content(prompt, request_options=self._request_options(timeout))
+        except Exception as e:
+            if self._is_timeout(e):
+                raise LLMTimeoutError(f"no response within {timeout}s") from e
+            raise
+        return response.text or ""
+
+    async def agenerate(self, prompt: str, timeout: Optional[float] = None, system: Optional[str] = None) -> str:
+        try:
+            response = await self._model_for(system).generate_content_async(prompt, request_options=self._request_options(timeout))
+        except Exception as e:
+            if self._is_timeout(e):
+                raise LLMTimeoutError(f"no response within {timeout}s") from e
+            raise
+        return response.text or ""
+
+    def generate_stream(self, prompt: str, timeout: Optional[float] = None, system: Optional[str] = None) -> Iterator[str]:
+        try:
+            for chunk in self._model_for(system).generate_content(prompt, stream=True, request_options=self._request_options(timeout)):
+                yield chunk.text or ""
+        except Exception as e:
+            if self._is_timeout(e):
+                raise LLMTimeoutError(f"no response within {timeout}s") from e
+            raise
+
+    def count_tokens(self, prompt: str) -> int:
+        return self.model.count_tokens(prompt).total_tokens
+
+
+# Lines like: - 'cough' / 'coughs' → English: 'Cough' | Marshallese: 'Pokpok' (similarity: 0.8)
+MATCH_LINE = re.compile(r"^- (?P<keywords>'.*?'(?: / '.*?')*) → English: '(?P<english>.*?)' \| Marshallese: '(?P<marshallese>.*?)'(?P<rest>.*)$")
+QUOTED = re.compile(r"'(.*?)'")
+SPAN_NOTE = re.compile(r"likely translation of the word: '(?P<span>.*?)'")
+ITEM_HEADER = re.compile(r"^=== ITEM (\d+) ===$", re.MULTILINE)
+
+
+class FakeProvider(LLMProvider):
+    """Deterministic offline stand-in for Gemini.
+
+    Answers with schema-valid JSON built from the glossary hits listed in the
+    prompt: exact and fuzzy keywords become their glossary translation,
+    phrase keywords their aligned span, anything else is echoed back.
+    Batch prompts get one item per ITEM section. Latency and error rate are
+    configurable so load tests can reproduce slow or failing upstreams.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _draw(self):
+        """Latency and injected failure for one call (seeded, so runs are reproducible)"""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+        return delay, fail
+
+    def generate(self, prompt: str, timeout: Optional[float] = None, system: Optional[str] = None) -> str:
+        delay, fail = self._draw()
+        if timeout and delay > timeout:
+            time.sleep(timeout)
+            raise LLMTimeoutError(f"no response within {timeout}s")
+        time.sleep(delay)
+        if fail:
+            raise LLMProviderError("Injected fake LLM error")
+        return self.answer(prompt)
+
+    async def agenerate(self, prompt: str, timeout: Optional[float] = None, system: Optional[str] = None) -> str:
+        delay, fail = self._draw()
+        if timeout and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise LLMTimeoutError(f"no response within {timeout}s")
+        await asyncio.sleep(delay)
+        if fail:
+            raise LLMProviderError("Injected fake LLM error")
+        return self.answer(prompt)
+
+    def generate_stream(self, prompt: str, timeout: Optional[float] = None, system: Optional[str] = None) -> Iterator[str]:
+        delay, fail = self._draw()
+        if timeout and delay > timeout:
+            time.sleep(timeout)
+            raise LLMTimeoutError(f"no response within {timeout}s")
+        if fail:
+            time.sleep(delay)
+            raise LLMProviderError("Injected fake LLM error")
+        text = self.answer(prompt)
+        pieces = [text[i:i + 16] for i in range(0, len(text), 16)]
+        for piece in pieces:
+            time.sleep(delay / len(pieces))
+            yield piece
+
+    def answer(self, prompt: str) -> str:
+        """JSON answer for a single or batch translation prompt"""
+        headers = list(ITEM_HEADER.finditer(prompt))
+        if not headers:
+            return json.dumps(self.translate_section(prompt), ensure_ascii=False)
+
+        items = []
+        for position, header in enumerate(headers):
+            end = headers[position + 1].start() if position + 1 < len(headers) else len(prompt)
+            item = self.translate_section(prompt[header.end():end])
+            items.append({"id": int(header.group(1)), **item})
+        return json.dumps({"items": items}, ensure_ascii=False)
+
+    def translate_section(self, section: str) -> Dict:
+        target = 'marshallese'
+        target_match = re.search(r"Target Language: (\w+)", section)
+        if target_match:
+            target = target_match.group(1).lower()
+
+        keywords = []
+        keywords_match = re.search(r"^Keywords extracted: (\[.*\])$", section, re.MULTILINE)
+        if keywords_match:
+            try:
+                keywords = ast.literal_eval(keywords_match.group(1))
+            except (ValueError, SyntaxError):
+                keywords = []
+
+        hits = self.glossary_hits(section, target)
+        word_breakdown = {}
+        words = []
+        for keyword in keywords:
+            translation, source = hits.get(keyword, (keyword, 'generated'))
+            words.append(translation)
+            word_breakdown[keyword] = {
+                "translation": translation,
+                "source": source,
+                "confidence": {'exact': 'high', 'phrase': 'high', 'fuzzy': 'medium'}.get(source, 'low')
+            }
+
+        return {
+            "translation": ' '.join(words),
+            "context": "Offline translation (fake LLM provider)",
+            "word_breakdown": word_breakdown
+        }
+
+    def glossary_hits(self, section: str, target: str) -> Dict:
+        """keyword -> (translation, source) from the match lists in the prompt"""
+        hits = {}
+        source = None
+        for line in section.splitlines():
+            if line.startswith('EXACT MATCHES'):
+                source = 'exact'
+            elif line.startswith('PHRASE MATCHES'):
+                source = 'phrase'
+            elif line.startswith('FUZZY MATCHES'):
+                source = 'fuzzy'
+            elif not line.startswith('- '):
+                continue
+
+            match = MATCH_LINE.match(line)
+            if not match or source is None:
+                continue
+            for keyword in QUOTED.findall(match.group('keywords')):
+                translation = match.group(target) if target in ('english', 'marshallese') else match.group('marshallese')
+                if source == 'exact' and keyword.lower() == translation.lower():
+                    # Keyword matched the target side, so the other side is the translation
+                    translation = match.group('english' if target == 'marshallese' else 'marshallese')
+                if source == 'phrase':
+                    span = SPAN_NOTE.search(match.group('rest'))
+                    if not span:
+                        continue
+                    translation = span.group('span')
+                hits.setdefault(keyword, (translation, source))
+        return hits
+
+
+def create_llm_provider(name: Optional[str] = None) -> Optional[LLMProvider]:
+    """
+    Build the provider named in settings.LLM_PROVIDER.
+
+    Returns:
+        LLMProvider, or None when Gemini is selected but no API key is configured
+    """
+    name = (name or getattr(settings, 'LLM_PROVIDER', 'gemini')).lower()
+    if name == 'fake':
+        return FakeProvider(
+            latency=getattr(settings, 'FAKE_LLM_LATENCY', 0.0),
+            jitter=getattr(settings, 'FAKE_LLM_JITTER', 0.0),
+            error_rate=getattr(settings, 'FAKE_LLM_ERROR_RATE', 0.0),
+            seed=getattr(settings, 'FAKE_LLM_SEED', 0),
+        )
+    if name == 'gemini':
+        api_key = getattr(settings, 'GEMINI_API_KEY', '')
+        if not api_key:
+            return None
+        return GeminiProvider(api_key, getattr(settings, 'LLM_MODEL_NAME', 'gemini-flash-latest'))
+    raise ValueError(f"Unknown LLM_PROVIDER '{name}' (expected 'gemini' or 'fake')")
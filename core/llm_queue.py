@@ -0,0 +1,261 @@
+"""
+Priority work queue in front of the LLM
+At most LLM_QUEUE_MAX_CONCURRENCY calls run at once per process. When every
+slot is busy, callers wait in one queue per subscription tier and freed slots
+are handed out by smooth weighted round robin (LLM_QUEUE_WEIGHTS), so premium
+requests go first without starving the others. The lowest tier is shed
+(LoadShedError) when the queue gets too deep or its requests wait too long;
+the translate path then answers from the glossary instead.
+
+Threads wait on a condition (slot/acquire); coroutines await a future
+(aslot/aacquire) and hold no thread while queued. The async translate path
+has its own queue (LLM_ASYNC_QUEUE_MAX_CONCURRENCY slots) since its calls
+don't tie up a thread each.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+from django.conf import settings
+from .subscription_tiers import TIERS
+
+DEFAULT_WEIGHTS = {'premium': 6, 'basic': 3, 'free': 1}
+
+
+class LoadShedError(Exception):
+    """Raised instead of queueing an LLM call when the queue is overloaded"""
+    pass
+
+
+class _Ticket:
+    """One caller waiting for a slot (future is set for a waiting coroutine)"""
+
+    def __init__(self, tier: str, loop=None):
+        self.tier = tier
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(True)
+
+
+class LLMWorkQueue:
+    """Bounded, tier-aware admission to a fixed number of LLM call slots"""
+
+    def __init__(self, max_concurrency: int = 16, weights: Optional[Dict[str, int]] = None, max_depth: int = 200,
+                 shed_depth: int = 50, shed_wait: float = 2, max_wait: float = 20):
+        self.max_concurrency = max(1, max_concurrency)
+        self.weights = {tier: max(1, (weights or DEFAULT_WEIGHTS).get(tier, 1)) for tier in TIERS}
+        self.lowest = TIERS[-1]
+        self.max_depth = max_depth
+        self.shed_depth = shed_depth
+        self.shed_wait = shed_wait
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiting = {tier: deque() for tier in TIERS}
+        self._current = {tier: 0 for tier in TIERS}
+        self._cond = threading.Condition()
+        self._waits = {tier: deque(maxlen=1000) for tier in TIERS}
+        self._admitted = {tier: 0 for tier in TIERS}
+        self._shed = {tier: 0 for tier in TIERS}
+
+    @contextmanager
+    def slot(self, tier: Optional[str] = None, timeout: Optional[float] = None):
+        """Hold one LLM call slot for the duration of the block.
+
+        Args:
+            tier: Caller's subscription tier (None or unknown counts as the lowest)
+            timeout: Longest wait for a slot, on top of the tier's own limit
+
+        Raises:
+            LoadShedError: the request was shed instead of queued
+        """
+        self.acquire(tier, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self, tier: Optional[str] = None, timeout: Optional[float] = None):
+        """Async variant of slot: waits without blocking the event loop or holding a thread"""
+        await self.aacquire(tier, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, tier: Optional[str] = None, timeout: Optional[float] = None):
+        tier = tier if tier in self.weights else self.lowest
+        with self._cond:
+            ticket = self._enqueue(tier)
+            if ticket is None:
+                return
+            deadline = self._deadline(ticket, timeout)
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting[tier].remove(ticket)
+                    self._reject(tier, "waited too long")
+                self._cond.wait(remaining)
+            self._admit(tier, time.monotonic() - ticket.enqueued)
+
+    async def aacquire(self, tier: Optional[str] = None, timeout: Optional[float] = None):
+        """Async variant of acquire. A cancelled or timed-out waiter leaves no slot or ticket behind."""
+        tier = tier if tier in self.weights else self.lowest
+        with self._cond:
+            ticket = self._enqueue(tier, asyncio.get_running_loop())
+            if ticket is None:
+                return
+            remaining = self._deadline(ticket, timeout) - time.monotonic()
+        try:
+            await asyncio.wait_for(ticket.future, max(0.0, remaining))
+        except BaseException as error:
+            with self._cond:
+                if ticket.granted:
+                    # Granted as we gave up: pass the slot on
+                    self.active -= 1
+                    self._grant()
+                else:
+                    self._waiting[tier].remove(ticket)
+                if isinstance(error, asyncio.TimeoutError):
+                    self._reject(tier, "waited too long")
+            raise
+        with self._cond:
+            self._admit(tier, time.monotonic() - ticket.enqueued)
+
+    def _enqueue(self, tier: str, loop=None) -> Optional[_Ticket]:
+        """Take a free slot (returns None) or queue a ticket; sheds instead when overloaded. Holds _cond."""
+        depth = self.depth()
+        if self.active < self.max_concurrency and depth == 0:
+            self.active += 1
+            self._admit(tier, 0.0)
+            return None
+
+        if depth >= self.max_depth:
+            self._reject(tier, "queue full")
+        if tier == self.lowest and (depth >= self.shed_depth or self._oldest_wait(tier) >= self.shed_wait):
+            self._reject(tier, "queue saturated")
+
+        ticket = _Ticket(tier, loop)
+        self._waiting[tier].append(ticket)
+        return ticket
+
+    def _deadline(self, ticket: _Ticket, timeout: Optional[float]) -> float:
+        deadline = ticket.enqueued + (self.shed_wait if ticket.tier == self.lowest else self.max_wait)
+        if timeout is not None:
+            deadline = min(deadline, ticket.enqueued + timeout)
+        return deadline
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._grant()
+
+    def _grant(self):
+        """Hand free slots to waiting tickets, picking tiers by smooth weighted round robin"""
+        granted = False
+        while self.active < self.max_concurrency:
+            tiers = [tier for tier in TIERS if self._waiting[tier]]
+            if not tiers:
+                break
+            total = 0
+            for tier in tiers:
+                self._current[tier] += self.weights[tier]
+                total += self.weights[tier]
+            chosen = max(tiers, key=lambda tier: self._current[tier])
+            self._current[chosen] -= total
+            ticket = self._waiting[chosen].popleft()
+            ticket.granted = True
+            if ticket.future is not None:
+                ticket.loop.call_soon_threadsafe(_wake, ticket.future)
+            self.active += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _admit(self, tier, waited):
+        self._admitted[tier] += 1
+        self._waits[tier].append(waited)
+
+    def _reject(self, tier, reason):
+        self._shed[tier] += 1
+        raise LoadShedError(f"{reason}, {tier} request shed")
+
+    def _oldest_wait(self, tier) -> float:
+        waiting = self._waiting[tier]
+        return time.monotonic() - waiting[0].enqueued if waiting else 0.0
+
+    def depth(self) -> int:
+        return sum(len(waiting) for waiting in self._waiting.values())
+
+    def stats(self) -> Dict:
+        """Slots in use plus depth, wait percentiles and shed count per tier"""
+        with self._cond:
+            tiers = {}
+            for tier in TIERS:
+                waits = sorted(self._waits[tier])
+
+                def percentile(p):
+                    if not waits:
+                        return None
+                    return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 1)
+
+                tiers[tier] = {
+                    "weight": self.weights[tier],
+                    "depth": len(self._waiting[tier]),
+                    "oldest_wait_ms": round(self._oldest_wait(tier) * 1000, 1),
+                    "admitted": self._admitted[tier],
+                    "shed": self._shed[tier],
+                    "wait_ms_p50": percentile(0.50),
+                    "wait_ms_p95": percentile(0.95),
+                }
+            return {
+                "active": self.active,
+                "max_concurrency": self.max_concurrency,
+                "depth": self.depth(),
+                "max_depth": self.max_depth,
+                "tiers": tiers,
+            }
+
+
+_llm_queue = None
+_async_llm_queue = None
+_llm_queue_lock = threading.Lock()
+
+
+def _create_llm_queue(max_concurrency: int) -> LLMWorkQueue:
+    return LLMWorkQueue(
+        max_concurrency=max_concurrency,
+        weights=getattr(settings, 'LLM_QUEUE_WEIGHTS', DEFAULT_WEIGHTS),
+        max_depth=getattr(settings, 'LLM_QUEUE_MAX_DEPTH', 200),
+        shed_depth=getattr(settings, 'LLM_QUEUE_SHED_DEPTH', 50),
+        shed_wait=getattr(settings, 'LLM_QUEUE_SHED_WAIT_SECONDS', 2),
+        max_wait=getattr(settings, 'LLM_QUEUE_MAX_WAIT_SECONDS', 20),
+    )
+
+
+def get_llm_queue() -> LLMWorkQueue:
+    """Process-wide LLM work queue of the sync (thread per call) paths, configured from settings on first use"""
+    global _llm_queue
+    if _llm_queue is None:
+        with _llm_queue_lock:
+            if _llm_queue is None:
+                _llm_queue = _create_llm_queue(getattr(settings, 'LLM_QUEUE_MAX_CONCURRENCY', 16))
+    return _llm_queue
+
+
+def get_async_llm_queue() -> LLMWorkQueue:
+    """Process-wide LLM work queue of the async translate path (use aslot/aacquire)"""
+    global _async_llm_queue
+    if _async_llm_queue is None:
+        with _llm_queue_lock:
+            if _async_llm_queue is None:
+                _async_llm_queue = _create_llm_queue(getattr(settings, 'LLM_ASYNC_QUEUE_MAX_CONCURRENCY', 256))
+    return _async_llm_queue
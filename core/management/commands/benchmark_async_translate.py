@@ -0,0 +1,118 @@
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from core import ai_service
+from core.glossary_index import get_glossary_index
+from core.llm_providers import FakeProvider
+
+SYNC_URL = '/api/core/translation/'
+ASYNC_URL = '/api/core/translation/async/'
+
+
+class Command(BaseCommand):
+    help = ('Compare concurrent throughput of the sync (WSGI) and async (ASGI) translate views '
+            'end to end (auth, quota, pipeline, history row) with a fake LLM')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Translations per run')
+        parser.add_argument('--latency', type=float, default=0.5, help='Fake LLM latency in seconds')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Sync threads (gunicorn workers x threads serving the WSGI path)')
+        parser.add_argument('--concurrency', type=int, default=200, help='Translations in flight on the async path')
+
+    def handle(self, *args, **options):
+        from authentications.models import CustomUser
+
+        # Distinct texts per path so neither run is answered from the other's cache
+        def texts(path):
+            return [
+                f"my patient number {path}{i} has a cough and a fever since yesterday"
+                for i in range(options['requests'])
+            ]
+
+        get_glossary_index()
+        user = CustomUser.objects.create_user(
+            email=f"benchmark-{uuid.uuid4().hex[:12]}@example.com", password=uuid.uuid4().hex
+        )
+        token = str(RefreshToken.for_user(user).access_token)
+        unlimited = {tier: {'per_minute': 10 ** 9, 'per_day': 10 ** 9} for tier in settings.TRANSLATION_RATE_LIMITS}
+        original_llm = ai_service.llm
+        ai_service.llm = FakeProvider(latency=options['latency'])
+
+        try:
+            # Pipeline logs would dominate the timings; results stay out of the
+            # shared store and no admin gets a push notification
+            with contextlib.redirect_stdout(io.StringIO()), \
+                    override_settings(TRANSLATION_STORE_ENABLED=False, TRANSLATION_RATE_LIMITS=unlimited,
+                                      ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), \
+                    mock.patch('core.notification_service.notify_admins'):
+                sync_seconds, sync_latencies = self.run_sync(texts('s'), token, options['threads'])
+                async_seconds, async_latencies = asyncio.run(
+                    self.run_async(texts('a'), token, options['concurrency'])
+                )
+        finally:
+            ai_service.llm = original_llm
+            user.delete()
+
+        self.stdout.write(self.style.WARNING(
+            f"{options['requests']} translations per view, fake LLM latency {options['latency']}s"
+        ))
+        self.stdout.write(f"{'view':<24} {'total s':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        self.report(f"sync, {options['threads']} threads", sync_seconds, sync_latencies)
+        self.report(f"async, {options['concurrency']} in flight", async_seconds, async_latencies)
+        self.stdout.write(self.style.SUCCESS('Benchmark completed'))
+
+    def run_sync(self, texts, token, threads):
+        def timed(text):
+            start = time.perf_counter()
+            response = Client().post(
+                SYNC_URL, json.dumps({'text': text}), content_type='application/json',
+                headers={'Authorization': f'Bearer {token}'}
+            )
+            self.check_response(response)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = list(executor.map(timed, texts))
+        return time.perf_counter() - start, latencies
+
+    async def run_async(self, texts, token, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        client = AsyncClient()
+
+        async def timed(text):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    ASYNC_URL, json.dumps({'text': text}), content_type='application/json',
+                    headers={'Authorization': f'Bearer {token}'}
+                )
+                self.check_response(response)
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(timed(text) for text in texts))
+        return time.perf_counter() - start, latencies
+
+    def check_response(self, response):
+        if response.status_code != 200:
+            raise RuntimeError(f"Translate view answered {response.status_code}: {response.content[:200]!r}")
+
+    def report(self, label, seconds, latencies):
+        latencies = sorted(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(
+            f"{label:<24} {seconds:>8.2f} {len(latencies) / seconds:>8.1f} "
+            f"{statistics.median(latencies) * 1000:>8.0f} {p95 * 1000:>8.0f}"
+        )
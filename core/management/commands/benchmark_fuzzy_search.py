@@ -0,0 +1,130 @@
+import csv
+import random
+import time
+from django.core.management.base import BaseCommand
+from core.ai_service import fuzzy_match, FUZZY_MATCH_THRESHOLD
+from core.glossary_index import GlossaryIndex
+from core.normalization import normalize_text
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the n-gram fuzzy index against the old full-table scan at several glossary sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000', help='Comma separated glossary sizes')
+        parser.add_argument('--queries', type=int, default=50, help='Number of misspelled keywords to search')
+        parser.add_argument('--scan-queries', type=int, default=10, help='Queries timed with the full scan (it is slow)')
+        parser.add_argument('--csv', default='Translation_data.csv', help='Glossary CSV used as seed data')
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        seed_rows = self.load_seed_rows(options['csv'])
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+
+        self.stdout.write(self.style.WARNING(
+            f'Seed glossary: {len(seed_rows)} rows, threshold {FUZZY_MATCH_THRESHOLD}'
+        ))
+        self.stdout.write(f"{'size':>8} {'build s':>9} {'scan ms/q':>10} {'index ms/q':>11} {'speedup':>8} {'agree':>7}")
+
+        for size in sizes:
+            entries = self.synthesize_entries(seed_rows, size, rng)
+            queries = self.make_queries(seed_rows, options['queries'], rng)
+
+            start = time.perf_counter()
+            index = GlossaryIndex(entries, version='benchmark')
+            build_seconds = time.perf_counter() - start
+
+            scan_queries = queries[:options['scan_queries']]
+            start = time.perf_counter()
+            scan_results = [self.full_scan(entries, query) for query in scan_queries]
+            scan_ms = (time.perf_counter() - start) * 1000 / max(len(scan_queries), 1)
+
+            start = time.perf_counter()
+            index_results = [self.indexed_search(index, query) for query in queries]
+            index_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+            # Same best similarity as the full scan counts as agreement
+            agree = sum(
+                1 for scan, indexed in zip(scan_results, index_results)
+                if scan == indexed
+            )
+
+            self.stdout.write(
+                f"{size:>8} {build_seconds:>9.2f} {scan_ms:>10.2f} {index_ms:>11.3f} "
+                f"{scan_ms / index_ms if index_ms else 0:>7.0f}x {agree:>3}/{len(scan_results)}"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed'))
+
+    def load_seed_rows(self, csv_file):
+        with open(csv_file, 'r', encoding='utf-8') as file:
+            return [
+                (row['english_text'], row['marshallese_text'])
+                for row in csv.DictReader(file)
+                if row.get('english_text') and row.get('marshallese_text')
+            ]
+
+    def synthesize_entries(self, seed_rows, size, rng):
+        """Real glossary rows first, then pseudo phrases recombined from their words"""
+        english_words = [w for english, _ in seed_rows for w in english.split()]
+        marshallese_words = [w for _, marshallese in seed_rows for w in marshallese.split()]
+
+        entries = []
+        for i in range(size):
+            if i < len(seed_rows):
+                english, marshallese = seed_rows[i]
+            else:
+                length = rng.randint(1, 5)
+                english = ' '.join(rng.choice(english_words) for _ in range(length))
+                marshallese = ' '.join(rng.choice(marshallese_words) for _ in range(length))
+            entries.append({
+                'id': i + 1,
+                'english_text': english,
+                'marshallese_text': marshallese,
+                'category': None,
+                'usage_count': rng.randint(0, 20),
+            })
+        return entries
+
+    def make_queries(self, seed_rows, count, rng):
+        """Single keywords from the seed glossary with one typo each"""
+        words = sorted({
+            normalize_text(w)
+            for english, marshallese in seed_rows
+            for w in (english + ' ' + marshallese).split()
+            if len(normalize_text(w)) > 3
+        })
+        queries = []
+        for word in rng.sample(words, min(count, len(words))):
+            pos = rng.randrange(len(word))
+            edit = rng.choice(('drop', 'swap', 'replace'))
+            if edit == 'drop':
+                word = word[:pos] + word[pos + 1:]
+            elif edit == 'swap' and pos < len(word) - 1:
+                word = word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:]
+            else:
+                word = word[:pos] + rng.choice('abcdeijklmnoprstuw') + word[pos + 1:]
+            queries.append(word)
+        return queries
+
+    def full_scan(self, entries, keyword):
+        """Best similarity using the pre-index algorithm (every row, both sides)"""
+        best = None
+        for entry in entries:
+            _, similarity_eng = fuzzy_match(keyword, entry['english_text'], threshold=FUZZY_MATCH_THRESHOLD)
+            _, similarity_mar = fuzzy_match(keyword, entry['marshallese_text'], threshold=FUZZY_MATCH_THRESHOLD)
+            similarity = round(max(similarity_eng, similarity_mar), 2)
+            if similarity >= FUZZY_MATCH_THRESHOLD and (best is None or similarity > best):
+                best = similarity
+        return best
+
+    def indexed_search(self, index, keyword):
+        """Best similarity using candidates from the n-gram index"""
+        best = None
+        for entry in index.fuzzy_candidates(keyword, threshold=FUZZY_MATCH_THRESHOLD):
+            _, similarity_eng = fuzzy_match(keyword, entry['english_text'], threshold=FUZZY_MATCH_THRESHOLD)
+            _, similarity_mar = fuzzy_match(keyword, entry['marshallese_text'], threshold=FUZZY_MATCH_THRESHOLD)
+            similarity = round(max(similarity_eng, similarity_mar), 2)
+            if similarity >= FUZZY_MATCH_THRESHOLD and (best is None or similarity > best):
+                best = similarity
+        return best
@@ -0,0 +1,100 @@
+import csv
+import random
+import time
+from django.core.management.base import BaseCommand
+from core.language_detector import LanguageDetector
+from core.normalization import fold_diacritics
+
+# Inputs the old heuristic got wrong
+TRICKY_CASES = [
+    ('emergency room', 'english'),
+    ('I need an ambulance', 'english'),
+    ('employee', 'english'),
+    ('embarrassed', 'english'),
+    ('ak', 'marshallese'),
+    ('kommol tata', 'marshallese'),
+    ('ewi jin emetak', 'marshallese'),
+    ('ij lomnak ke ebwilok diin paiu', 'marshallese'),
+]
+
+
+def legacy_detect_language(text: str) -> str:
+    """The character set / word list / prefix heuristic the translate path used before"""
+    marshallese_chars = set('ṃṇḷōāūņļọạẹịụ')
+    text_lower = text.lower()
+    if any(char in text_lower for char in marshallese_chars):
+        return 'marshallese'
+    marshallese_words = {
+        'iakwe', 'yokwe', 'iọkwe', 'iokkwe', 'kommol', 'kommōl', 'kom̧m̧ōl', 'jinoin', 'emoj', 'emōj',
+        'ejja', 'ejjab', 'ejjelok', 'ewor', 'ewōr', 'eok', 'ij', 'kwe', 'kwoj', 'kwōj', 'rainin', 'ilju',
+        'inne', 'bōk', 'bok', 'mōṇā', 'mona', 'kajjitōk', 'bar', 'wōt', 'ak', 'ri-',
+    }
+    words = set(text_lower.split())
+    if words & marshallese_words:
+        return 'marshallese'
+    for word in words:
+        if word.startswith(('ri-', 'ij', 'kwō', 'em')):
+            return 'marshallese'
+    return 'english'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the n-gram language detector against the old heuristic (accuracy and latency)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--csv', default='Translation_data.csv', help='Glossary CSV used as labelled data')
+        parser.add_argument('--holdout', type=float, default=0.2, help='Share of glossary rows kept out of training')
+        parser.add_argument('--repeat', type=int, default=20, help='Passes over the test set when timing')
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        rows = self.load_rows(options['csv'])
+        rng.shuffle(rows)
+        split = int(len(rows) * (1 - options['holdout']))
+        train, held_out = rows[:split], rows[split:]
+
+        start = time.perf_counter()
+        detector = LanguageDetector.train([english for english, _ in train], [marshallese for _, marshallese in train])
+        build_ms = (time.perf_counter() - start) * 1000
+        self.stdout.write(self.style.WARNING(
+            f'Trained on {len(train)} rows in {build_ms:.1f} ms ({len(detector.weights)} n-grams), '
+            f'testing on {len(held_out)} held-out rows'
+        ))
+
+        test_sets = {
+            'english': [(english, 'english') for english, _ in held_out],
+            'marshallese': [(marshallese, 'marshallese') for _, marshallese in held_out],
+            'marshallese, no diacritics': [(fold_diacritics(marshallese), 'marshallese') for _, marshallese in held_out],
+            'tricky cases': TRICKY_CASES,
+        }
+        detectors = {
+            'legacy': legacy_detect_language,
+            'n-gram': lambda text: detector.detect(text)[0],
+        }
+
+        self.stdout.write(f"{'test set':<28} {'legacy':>8} {'n-gram':>8}")
+        for name, cases in test_sets.items():
+            scores = [
+                sum(1 for text, language in cases if detect(text) == language) / max(len(cases), 1)
+                for detect in detectors.values()
+            ]
+            self.stdout.write(f"{name:<28} " + ' '.join(f"{score:>7.1%}" for score in scores))
+
+        texts = [text for cases in test_sets.values() for text, _ in cases]
+        for name, detect in detectors.items():
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                for text in texts:
+                    detect(text)
+            micros = (time.perf_counter() - start) * 1e6 / max(len(texts) * options['repeat'], 1)
+            self.stdout.write(f"{name:<8} {micros:.1f} µs/call")
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed'))
+
+    def load_rows(self, csv_file):
+        with open(csv_file, 'r', encoding='utf-8') as file:
+            return [
+                (row['english_text'], row['marshallese_text'])
+                for row in csv.DictReader(file)
+                if row.get('english_text') and row.get('marshallese_text')
+            ]
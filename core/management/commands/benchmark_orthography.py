@@ -0,0 +1,100 @@
+import csv
+import random
+import time
+from django.core.management.base import BaseCommand
+from core.glossary_index import GlossaryIndex
+from core.normalization import fold_diacritics, normalize_text
+
+# Ways the same Marshallese letter gets typed
+LETTER_VARIANTS = {
+    'ṃ': ('m̧', 'm'),
+    'm̧': ('ṃ', 'm'),
+    'ņ': ('n̄', 'ñ', 'n'),
+    'n̄': ('ņ', 'ñ', 'n'),
+    'ñ': ('n̄', 'ņ', 'n'),
+    'ļ': ('ḷ', 'l'),
+    'ḷ': ('ļ', 'l'),
+    'ō': ('ọ', 'o'),
+    'ā': ('a',),
+    'ū': ('u',),
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark glossary exact-hit rates for Marshallese spelling variants, before and after orthography normalization'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--csv', default='Translation_data.csv', help='Glossary CSV used as seed data')
+        parser.add_argument('--queries', type=int, default=500, help='Number of respelled Marshallese queries')
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        entries = self.load_entries(options['csv'])
+        index = GlossaryIndex(entries, version='benchmark')
+
+        # The pre-normalization lookup: lowercase/whitespace keys only
+        plain = {}
+        for entry in entries:
+            for text in (entry['english_text'], entry['marshallese_text']):
+                plain.setdefault(normalize_text(text), entry)
+
+        query_sets = {
+            'stored spelling': [(entry['marshallese_text'], entry) for entry in entries],
+            'no diacritics': [(fold_diacritics(entry['marshallese_text']), entry) for entry in entries],
+            'mixed spellings': self.respell(entries, options['queries'], rng),
+            'real queries': self.real_queries(),
+        }
+
+        self.stdout.write(f"{'queries':<18} {'count':>6} {'before':>8} {'after':>8} {'after µs/q':>11}")
+        for name, queries in query_sets.items():
+            if not queries:
+                continue
+            before = sum(1 for text, _ in queries if normalize_text(text) in plain)
+            start = time.perf_counter()
+            after = sum(1 for text, _ in queries if index.lookup_exact(text) is not None)
+            micros = (time.perf_counter() - start) * 1e6 / len(queries)
+            self.stdout.write(
+                f"{name:<18} {len(queries):>6} {before / len(queries):>8.1%} {after / len(queries):>8.1%} {micros:>11.1f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed'))
+
+    def load_entries(self, csv_file):
+        with open(csv_file, 'r', encoding='utf-8') as file:
+            rows = [
+                row for row in csv.DictReader(file)
+                if row.get('english_text') and row.get('marshallese_text')
+            ]
+        return [
+            {
+                'id': position + 1,
+                'english_text': row['english_text'],
+                'marshallese_text': row['marshallese_text'],
+                'category': None,
+                'usage_count': 0,
+            }
+            for position, row in enumerate(rows)
+        ]
+
+    def respell(self, entries, count, rng):
+        """Marshallese entries with their special letters swapped for other spellings"""
+        candidates = [entry for entry in entries if any(letter in entry['marshallese_text'] for letter in LETTER_VARIANTS)]
+        queries = []
+        for entry in rng.sample(candidates, min(count, len(candidates))):
+            text = entry['marshallese_text']
+            for letter, variants in LETTER_VARIANTS.items():
+                if letter in text:
+                    text = text.replace(letter, rng.choice(variants))
+            queries.append((text, entry))
+        return queries
+
+    def real_queries(self):
+        """Words of texts users actually submitted (UserTranslationHistory)"""
+        from core.models import UserTranslationHistory
+
+        return [
+            (word, None)
+            for source_text in UserTranslationHistory.objects.values_list('source_text', flat=True)[:5000]
+            for word in source_text.split()
+            if len(normalize_text(word)) > 2
+        ]
@@ -0,0 +1,26 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.glossary_index import get_glossary_version
+from core.models import TranslationCacheEntry
+
+
+class Command(BaseCommand):
+    help = 'Delete stored translation results that have not been used for a number of days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Delete entries not used in this many days')
+        parser.add_argument('--stale-glossary', action='store_true',
+                            help='Also delete entries built from an older glossary version')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = TranslationCacheEntry.objects.filter(last_used_date__lt=cutoff).delete()
+        self.stdout.write(f"Deleted {deleted} entries unused since {cutoff:%Y-%m-%d %H:%M}")
+
+        if options['stale_glossary']:
+            stale, _ = TranslationCacheEntry.objects.exclude(glossary_version=get_glossary_version()).delete()
+            self.stdout.write(f"Deleted {stale} entries from older glossary versions")
+            deleted += stale
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully purged {deleted} translation cache entries'))
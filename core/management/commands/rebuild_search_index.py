@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+from core.full_text_search import FTS_TABLES, install_full_text_search
+
+
+class Command(BaseCommand):
+    help = 'Recreate the FTS5 search tables and triggers and reindex every row (SQLite only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        with connection.schema_editor() as schema_editor:
+            installed = install_full_text_search(schema_editor)
+
+        if not installed:
+            self.stdout.write(self.style.WARNING('FTS5 is not available on this database, search uses icontains'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(FTS_TABLES)} search indexes'))
@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from core.models import TranslationJob
+from core.translation_jobs import requeue_stale_jobs, run_translation_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued translation jobs (picks up jobs left behind by restarted web workers)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-minutes', type=int, default=10,
+                            help='Re-queue jobs that have been running longer than this')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            requeued = requeue_stale_jobs(options['stale_minutes'])
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Re-queued {requeued} stale job(s)'))
+
+            job_ids = list(
+                TranslationJob.objects.filter(status='queued').order_by('created_date').values_list('id', flat=True)
+            )
+            for job_id in job_ids:
+                if run_translation_job(job_id):
+                    total += 1
+                    self.stdout.write(f'Ran job {job_id}')
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully ran {total} translation job(s)'))
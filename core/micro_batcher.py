@@ -0,0 +1,155 @@
+"""
+Micro-batching of concurrent LLM translations
+Distinct texts that reach the LLM step at about the same time are collected
+for a short window (or until the batch is full) and sent as one multi-item
+prompt through ai_service.translate_pending_batch, which maps the answers
+back by item id and retries any item missing from the answer.
+The first request of a batch (the leader) waits out the window and makes the
+call; the others wait for their own result, and translate alone if the
+leader takes longer than the timeout.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+from typing import Dict
+from django.conf import settings
+
+
+class _Batch:
+    """Requests collected for one LLM call"""
+
+    def __init__(self):
+        self.items = []
+        self.futures = []
+        self.enqueued = []
+        self.full = threading.Event()
+
+
+class MicroBatcher:
+    """Merge concurrent prepared translations into shared LLM calls"""
+
+    def __init__(self, window_ms: float = 20, max_items: int = 8, timeout: float = 30):
+        self.window = window_ms / 1000
+        self.max_items = max(1, max_items)
+        self.timeout = timeout
+        self._open = None
+        self._lock = threading.Lock()
+        self._delays = deque(maxlen=1000)
+        self.batches = 0
+        self.items = 0
+        self.single_item_batches = 0
+        self.full_batches = 0
+        self.timeouts = 0
+
+    def submit(self, item: Dict) -> Dict:
+        """Translate one prepared item (see ai_service.prepare_translation), batched with others.
+
+        Args:
+            item: {"text", "detected_lang", "target_lang", "search_results"}
+
+        Returns:
+            Translation result dict for this item
+        """
+        future = Future()
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.items.append(item)
+            batch.futures.append(future)
+            batch.enqueued.append(time.monotonic())
+            if len(batch.items) >= self.max_items:
+                # Full: close it so the next request starts a new batch
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._dispatch(batch)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Leader is stuck, don't make this caller wait any longer
+            from .ai_service import translate_prepared
+
+            with self._lock:
+                self.timeouts += 1
+            return translate_prepared(item["text"], item, item.get("tier"))
+
+    def _dispatch(self, batch: _Batch):
+        from .ai_service import translate_pending_batch, translate_prepared
+
+        started = time.monotonic()
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch.items)
+            if len(batch.items) == 1:
+                self.single_item_batches += 1
+            if len(batch.items) >= self.max_items:
+                self.full_batches += 1
+            self._delays.extend(started - enqueued for enqueued in batch.enqueued)
+
+        print(f"[DEBUG] Micro-batch: {len(batch.items)} item(s) in one LLM call")
+        try:
+            if len(batch.items) == 1:
+                item = batch.items[0]
+                results = [translate_prepared(item["text"], item, item.get("tier"))]
+            else:
+                results = translate_pending_batch(batch.items)
+        except BaseException as e:
+            # Also on cancellation, or every follower would wait out its timeout
+            for future in batch.futures:
+                future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for future, result in zip(batch.futures, results):
+            future.set_result(result)
+
+    def stats(self) -> Dict:
+        """Batch fill rate and the queueing delay added by the window"""
+        with self._lock:
+            delays = sorted(self._delays)
+
+            def percentile(p):
+                if not delays:
+                    return None
+                return round(delays[min(len(delays) - 1, int(p * len(delays)))] * 1000, 1)
+
+            return {
+                "window_ms": round(self.window * 1000, 1),
+                "max_items": self.max_items,
+                "batches": self.batches,
+                "items": self.items,
+                "llm_calls_saved": self.items - self.batches,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "fill_rate": round(self.items / (self.batches * self.max_items), 3) if self.batches else 0.0,
+                "single_item_batches": self.single_item_batches,
+                "full_batches": self.full_batches,
+                "timeouts": self.timeouts,
+                "queue_delay_ms_p50": percentile(0.50),
+                "queue_delay_ms_p95": percentile(0.95),
+            }
+
+
+_micro_batcher = None
+_micro_batcher_lock = threading.Lock()
+
+
+def get_micro_batcher() -> MicroBatcher:
+    """Process-wide micro-batcher, configured from settings on first use"""
+    global _micro_batcher
+    if _micro_batcher is None:
+        with _micro_batcher_lock:
+            if _micro_batcher is None:
+                _micro_batcher = MicroBatcher(
+                    window_ms=getattr(settings, 'TRANSLATION_MICRO_BATCH_WINDOW_MS', 20),
+                    max_items=getattr(settings, 'TRANSLATION_MICRO_BATCH_MAX_ITEMS', 8),
+                    timeout=getattr(settings, 'TRANSLATION_MICRO_BATCH_TIMEOUT', 30),
+                )
+    return _micro_batcher
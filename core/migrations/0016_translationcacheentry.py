@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-17 03:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_usertranslationhistory_is_favorite'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=64, unique=True)),
+                ('source_text', models.TextField()),
+                ('direction', models.CharField(max_length=30)),
+                ('glossary_version', models.CharField(max_length=100)),
+                ('result', models.JSONField()),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('last_used_date', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Translation Cache Entry',
+                'verbose_name_plural': 'Translation Cache Entries',
+                'ordering': ['-last_used_date'],
+                'indexes': [models.Index(fields=['created_date'], name='core_transl_created_b93d15_idx'), models.Index(fields=['glossary_version', '-last_used_date'], name='core_transl_glossar_f81ea3_idx')],
+            },
+        ),
+    ]
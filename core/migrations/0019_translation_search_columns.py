@@ -0,0 +1,62 @@
+# Generated by Django 6.0 on 2026-10-17 03:37
+
+import unicodedata
+
+from django.conf import settings
+from django.db import migrations, models
+
+EDGE_PUNCTUATION = '.,!?;:—-"\'()[]'
+
+
+def search_key(text):
+    """Frozen copy of the search key at this migration: normalize_text, then diacritics folded"""
+    if not text:
+        return ''
+    key = ' '.join(text.lower().split()).strip(EDGE_PUNCTUATION).strip()
+    return ''.join(char for char in unicodedata.normalize('NFD', key) if not unicodedata.combining(char))
+
+
+def fill_search_columns(apps, schema_editor):
+    """Compute the search columns for existing translations"""
+    Translation = apps.get_model('core', 'Translation')
+    
+    batch = []
+    for translation in Translation.objects.only('id', 'english_text', 'marshallese_text').iterator(chunk_size=1000):
+        translation.english_search = search_key(translation.english_text)
+        translation.marshallese_search = search_key(translation.marshallese_text)
+        batch.append(translation)
+        if len(batch) >= 1000:
+            Translation.objects.bulk_update(batch, ['english_search', 'marshallese_search'])
+            batch = []
+    if batch:
+        Translation.objects.bulk_update(batch, ['english_search', 'marshallese_search'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_translationquotausage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='translation',
+            name='english_search',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='translation',
+            name='marshallese_search',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='translation',
+            index=models.Index(fields=['english_search'], name='core_transl_english_a3e0fd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='translation',
+            index=models.Index(fields=['marshallese_search'], name='core_transl_marshal_812632_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-17 07:10
+
+from django.db import migrations, models
+
+
+def mark_automatic_results(apps, schema_editor):
+    """'updated' rows no admin ever reviewed were automatic results"""
+    UserTranslationHistory = apps.get_model('core', 'UserTranslationHistory')
+    UserTranslationHistory.objects.filter(status='updated', reviewed_date__isnull=True).update(status='automatic')
+
+
+def unmark_automatic_results(apps, schema_editor):
+    UserTranslationHistory = apps.get_model('core', 'UserTranslationHistory')
+    UserTranslationHistory.objects.filter(status='automatic').update(status='updated')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_full_text_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usertranslationhistory',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('updated', 'Updated'), ('automatic', 'Automatic')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(mark_automatic_results, unmark_automatic_results),
+    ]
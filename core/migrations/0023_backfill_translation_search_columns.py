@@ -0,0 +1,65 @@
+# Generated by Django 6.0 on 2026-10-17 07:40
+
+import unicodedata
+
+from django.db import migrations
+
+EDGE_PUNCTUATION = '.,!?;:—-"\'()[]'
+
+# Frozen copy of normalization.MARSHALLESE_SPELLINGS at this migration
+MARSHALLESE_SPELLINGS = {
+    'yokwe': 'iakwe',
+    'iokwe': 'iakwe',
+    'iokkwe': 'iakwe',
+    'iakkwe': 'iakwe',
+    'kommool': 'kommol',
+    'ejab': 'ejjab',
+    'ejelok': 'ejjelok',
+}
+
+
+def canonical_key(text):
+    """Frozen copy of normalization.canonical_key at this migration"""
+    if not text:
+        return ''
+    key = ' '.join(text.lower().split()).strip(EDGE_PUNCTUATION).strip()
+    key = ''.join(char for char in unicodedata.normalize('NFD', key) if not unicodedata.combining(char))
+    return ' '.join(MARSHALLESE_SPELLINGS.get(word, word) for word in key.split())
+
+
+def backfill_search_columns(apps, schema_editor):
+    """
+    Recompute the search columns with the frozen key (changed rows only).
+    
+    Databases that ran 0019/0020 while they still imported the live
+    normalization helpers may hold keys from whatever that code computed
+    then; this brings every database to the same keys.
+    """
+    Translation = apps.get_model('core', 'Translation')
+    
+    batch = []
+    rows = Translation.objects.only('id', 'english_text', 'marshallese_text', 'english_search', 'marshallese_search')
+    for translation in rows.iterator(chunk_size=1000):
+        english_search = canonical_key(translation.english_text)
+        marshallese_search = canonical_key(translation.marshallese_text)
+        if (english_search, marshallese_search) == (translation.english_search, translation.marshallese_search):
+            continue
+        translation.english_search = english_search
+        translation.marshallese_search = marshallese_search
+        batch.append(translation)
+        if len(batch) >= 1000:
+            Translation.objects.bulk_update(batch, ['english_search', 'marshallese_search'])
+            batch = []
+    if batch:
+        Translation.objects.bulk_update(batch, ['english_search', 'marshallese_search'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_translation_history_automatic_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_columns, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,31 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .normalization import canonical_key
 
 # Create your models here.
 
+class TranslationQuerySet(models.QuerySet):
+    """Keeps the normalized search columns filled on bulk inserts"""
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """bulk_create skips save(), so fill the search columns here"""
+        objs = list(objs)
+        for obj in objs:
+            obj.update_search_columns()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class Translation(models.Model):
     """Model for English-Marshallese translations"""
     
     # Translation fields
     english_text = models.TextField()
     marshallese_text = models.TextField()
+    # canonical_key() of the texts, kept in sync on save; indexed for exact and prefix lookups
+    english_search = models.TextField(default='', editable=False)
+    marshallese_search = models.TextField(default='', editable=False)
     category = models.ForeignKey('Category', on_delete=models.PROTECT, related_name='translations')
     context = models.TextField(blank=True, null=True)
     
@@ -34,11 +51,26 @@ class Translation(models.Model):
             models.Index(fields=['is_favorite']),
             models.Index(fields=['english_text']),
             models.Index(fields=['marshallese_text']),
+            models.Index(fields=['english_search']),
+            models.Index(fields=['marshallese_search']),
         ]
     
+    objects = TranslationQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.english_text[:50]} - {self.marshallese_text[:50]}"
     
+    def update_search_columns(self):
+        self.english_search = canonical_key(self.english_text)
+        self.marshallese_search = canonical_key(self.marshallese_text)
+    
+    def save(self, *args, **kwargs):
+        self.update_search_columns()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'english_text', 'marshallese_text'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'english_search', 'marshallese_search'}
+        super().save(*args, **kwargs)
+    
     def increment_usage(self):
         """Increment usage count"""
         self.usage_count += 1
@@ -51,6 +83,7 @@ class UserTranslationHistory(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('updated', 'Updated'),
+        ('automatic', 'Automatic'),  # No review needed, never reviewed by an admin
     )
     
     # User reference
@@ -161,3 +194,185 @@ class Category(models.Model):
     
     def __str__(self):
         return self.name
+
+
+
+class TranslationCacheEntry(models.Model):
+    """Persisted translate_with_ai result shared by all worker processes"""
+    
+    # sha256 of normalized input + direction + glossary version
+    cache_key = models.CharField(max_length=64, unique=True)
+    source_text = models.TextField()
+    direction = models.CharField(max_length=30)  # e.g. 'english_to_marshallese'
+    glossary_version = models.CharField(max_length=100)
+    result = models.JSONField()
+    
+    # Usage tracking
+    hit_count = models.IntegerField(default=0)
+    created_date = models.DateTimeField(auto_now_add=True)
+    last_used_date = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-last_used_date']
+        indexes = [
+            models.Index(fields=['created_date']),
+            models.Index(fields=['glossary_version', '-last_used_date']),
+        ]
+        verbose_name = 'Translation Cache Entry'
+        verbose_name_plural = 'Translation Cache Entries'
+    
+    def __str__(self):
+        return f"{self.source_text[:50]} ({self.direction})"
+
+
+class TranslationJob(models.Model):
+    """Translation request processed in the background (POST returns immediately)"""
+    
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='translation_jobs'
+    )
+    source_text = models.TextField()
+    category = models.CharField(max_length=100, blank=True)  # Category ID or name as sent by the user
+    
+    # Status
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    result = models.JSONField(null=True, blank=True)  # Same data as POST /api/core/translation/
+    error = models.TextField(blank=True, null=True)
+    history = models.ForeignKey(
+        'UserTranslationHistory',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    
+    # Metadata
+    created_date = models.DateTimeField(auto_now_add=True)
+    started_date = models.DateTimeField(null=True, blank=True)
+    finished_date = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_date']
+        indexes = [
+            models.Index(fields=['status', 'created_date']),
+            models.Index(fields=['user', '-created_date']),
+        ]
+        verbose_name = 'Translation Job'
+        verbose_name_plural = 'Translation Jobs'
+    
+    def __str__(self):
+        return f"Job {self.id}: {self.source_text[:30]} ({self.status})"
+
+
+class TranslationQuotaUsage(models.Model):
+    """Translations a user requested on a given day (daily quota, flushed by core.rate_limits)"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='translation_quota_usage'
+    )
+    date = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('user', 'date')
+        ordering = ['-date']
+        verbose_name = 'Translation Quota Usage'
+        verbose_name_plural = 'Translation Quota Usage'
+    
+    def __str__(self):
+        return f"{self.user} {self.date}: {self.count}"
+
+
+# Signals to keep the in-memory glossary index (core.glossary_index) fresh
+@receiver(post_save, sender=Translation)
+@receiver(post_delete, sender=Translation)
+def invalidate_glossary_on_change(sender, instance, update_fields=None, **kwargs):
+    """Rebuild the glossary index once the translation change is committed"""
+    # Usage counter bumps don't change what the glossary matches
+    if update_fields and set(update_fields) <= {'usage_count'}:
+        return
+    from .glossary_index import invalidate_glossary_index
+    transaction.on_commit(invalidate_glossary_index)
+
+
+# Signals to keep the autocomplete index (core.autocomplete) fresh
+@receiver(post_save, sender=Translation)
+def update_autocomplete_on_save(sender, instance, update_fields=None, **kwargs):
+    """Insert, replace or re-rank the translation once the change is committed"""
+    from .autocomplete import autocomplete_entry, autocomplete_saved, autocomplete_usage
+
+    if update_fields and set(update_fields) <= {'usage_count'}:
+        translation_id, usage_count = instance.id, instance.usage_count
+        transaction.on_commit(lambda: autocomplete_usage(translation_id, usage_count))
+        return
+    entry = autocomplete_entry(instance)
+    transaction.on_commit(lambda: autocomplete_saved(entry))
+
+
+@receiver(post_delete, sender=Translation)
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    from .autocomplete import autocomplete_deleted
+    translation_id = instance.id
+    transaction.on_commit(lambda: autocomplete_deleted(translation_id))
+
+
+@receiver(post_save, sender=Category)
+def invalidate_autocomplete_on_category_change(sender, instance, created, **kwargs):
+    """Suggestions carry the category name, reload them after a rename"""
+    if not created:
+        from .autocomplete import invalidate_autocomplete_index
+        transaction.on_commit(invalidate_autocomplete_index)
+
+
+# Signals to keep the translation memory (core.translation_memory) fresh
+@receiver(post_save, sender=UserTranslationHistory)
+def remember_reviewed_translation(sender, instance, created, **kwargs):
+    """Add admin-reviewed sentences to the translation memory once committed"""
+    from .translation_memory import forget_translation, remember_translation
+
+    if instance.status == 'updated' and instance.reviewed_date and instance.known_translation:
+        entry = {
+            'id': instance.id,
+            'source_text': instance.source_text,
+            'known_translation': instance.known_translation,
+            'category': instance.category_id,
+            'notes': instance.notes,
+        }
+        transaction.on_commit(lambda: remember_translation(entry))
+    elif not created:
+        history_id = instance.id
+        transaction.on_commit(lambda: forget_translation(history_id))
+
+
+@receiver(post_delete, sender=UserTranslationHistory)
+def forget_deleted_translation(sender, instance, **kwargs):
+    """Rebuild the translation memory if the deleted row was part of it"""
+    from .translation_memory import forget_translation
+    history_id = instance.id
+    transaction.on_commit(lambda: forget_translation(history_id))
+
+
+# Signal to keep the cached subscription tiers (core.subscription_tiers) fresh
+@receiver(post_save, sender='authentications.UserSubscription')
+@receiver(post_delete, sender='authentications.UserSubscription')
+def forget_subscription_tier(sender, instance, **kwargs):
+    """Re-read the user's tier on the next LLM request after a subscription change"""
+    from .subscription_tiers import forget_user_tier
+    forget_user_tier(instance.user_id)
+
+
+@receiver(post_save, sender='authentications.SubscriptionPlan')
+def forget_plan_tiers(sender, instance, **kwargs):
+    """Plan type or translate limits may have changed for every subscriber"""
+    from .subscription_tiers import forget_all_tiers
+    forget_all_tiers()
@@ -0,0 +1,96 @@
+"""
+Text normalization helpers shared by the glossary index, search and caches
+Marshallese is written in competing orthographies (older missionary
+spellings, the current standard with macrons and cedillas, and phone
+keyboards with no diacritics at all), so lookup keys go through
+canonical_key, which maps the variants of a word to one spelling.
+"""
+import unicodedata
+from functools import lru_cache
+
+# Punctuation trimmed from both ends of keywords and glossary phrases
+EDGE_PUNCTUATION = '.,!?;:—-"\'()[]'
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text into a lookup key.
+
+    Lowercases, collapses runs of whitespace and trims surrounding punctuation
+    so "Where does it hurt?" and "where does  it hurt" share the same key.
+
+    Args:
+        text: Raw English or Marshallese text
+
+    Returns:
+        Normalized key (empty string for empty input)
+    """
+    if not text:
+        return ''
+    return ' '.join(text.lower().split()).strip(EDGE_PUNCTUATION).strip()
+
+
+def tokenize(text: str) -> list:
+    """Split text into normalized word tokens.
+
+    Args:
+        text: Raw English or Marshallese text
+
+    Returns:
+        List of non-empty normalized tokens
+    """
+    if not text:
+        return []
+    tokens = (normalize_text(word) for word in text.split())
+    return [token for token in tokens if token]
+
+
+def fold_diacritics(text: str) -> str:
+    """Drop diacritics ('kom̧m̧ōl' -> 'kommol'), the way Marshallese is often typed"""
+    return ''.join(char for char in unicodedata.normalize('NFD', text) if not unicodedata.combining(char))
+
+
+# Whole-word spelling variants (after diacritics are folded) -> canonical spelling.
+# Letter variants need no entries: ṃ / m̧, ņ / n̄ / ñ, ļ / ḷ, ō / ọ and friends
+# all decompose to a base letter plus combining marks, which fold_diacritics drops.
+MARSHALLESE_SPELLINGS = {
+    'yokwe': 'iakwe',
+    'iokwe': 'iakwe',
+    'iokkwe': 'iakwe',
+    'iakkwe': 'iakwe',
+    'kommool': 'kommol',
+    'ejab': 'ejjab',
+    'ejelok': 'ejjelok',
+}
+
+
+@lru_cache(maxsize=100000)
+def canonical_key(text: str) -> str:
+    """Orthography-independent lookup key.
+
+    normalize_text, then diacritics folded and whole-word spelling variants
+    mapped through MARSHALLESE_SPELLINGS, so "Yokwe", "iọkwe" and "iakwe"
+    share the key "iakwe". Used for glossary, search and cache keys; never
+    shown to users.
+
+    Args:
+        text: Raw English or Marshallese text
+
+    Returns:
+        Canonical key (empty string for empty input)
+    """
+    key = fold_diacritics(normalize_text(text))
+    return ' '.join(MARSHALLESE_SPELLINGS.get(word, word) for word in key.split())
+
+
+def canonical_tokens(tokens: list) -> list:
+    """canonical_key of each token from tokenize(), aligned one to one"""
+    return [canonical_key(token) or token for token in tokens]
+
+
+def prefix_upper_bound(key: str) -> str:
+    """Smallest string greater than every string starting with key (key must not be empty).
+
+    Turns a prefix match into the range key <= value < prefix_upper_bound(key),
+    which a plain B-tree index can answer.
+    """
+    return key[:-1] + chr(ord(key[-1]) + 1)
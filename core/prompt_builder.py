@@ -0,0 +1,227 @@
+"""
+Compact, token-budgeted Gemini prompts for the translation pipeline
+The instruction block is static text passed as the provider's system
+instruction (reused across requests instead of repeated in every prompt).
+The per-request prompt lists each glossary hint once (keywords that hit the
+same entry share one line), ranked by relevance (exact, phrase, then fuzzy
+by similarity) and capped at PROMPT_MAX_HINTS. Hints are dropped from the
+least relevant end until the prompt fits PROMPT_MAX_INPUT_TOKENS.
+"""
+import threading
+from typing import Callable, Dict, List, Optional
+from django.conf import settings
+
+TRANSLATION_INSTRUCTIONS = """You translate between English and Marshallese.
+Translate the Input Text from the Input Language to the Target Language, using the glossary hints given with it:
+1. Use exact matches as-is (highest priority)
+2. Use phrase matches to pick the word's translation from the glossary phrase (high priority)
+3. Use fuzzy matches for typos (medium priority)
+4. Generate missing translations (lowest priority)
+5. If a TRANSLATION MEMORY entry is given, reuse its wording and only change what differs between the two sentences
+6. Combine all into one natural sentence in the Target Language
+
+Return in this EXACT JSON format:
+{
+  "translation": "the final clean translation in the target language",
+  "context": "brief description of what this translation is about (topic/category)",
+  "word_breakdown": {
+    "word1": {"translation": "...", "source": "exact|phrase|fuzzy|generated", "confidence": "high|medium|low"}
+  }
+}"""
+
+BATCH_INSTRUCTIONS = """You translate between English and Marshallese.
+The prompt holds several independent ITEMs. Translate each ITEM from its Input Language to its Target Language, using only the glossary hints listed under that item:
+1. Use exact matches as-is (highest priority)
+2. Use phrase matches to pick the word's translation from the glossary phrase (high priority)
+3. Use fuzzy matches for typos (medium priority)
+4. Generate missing translations (lowest priority)
+5. If a TRANSLATION MEMORY entry is given, reuse its wording and only change what differs between the two sentences
+6. Combine all into one natural sentence in the item's Target Language
+
+Return in this EXACT JSON format, with one entry per item:
+{
+  "items": [
+    {
+      "id": 1,
+      "translation": "the final clean translation",
+      "context": "brief description of what this translation is about (topic/category)",
+      "word_breakdown": {
+        "word1": {"translation": "...", "source": "exact|phrase|fuzzy|generated", "confidence": "high|medium|low"}
+      }
+    }
+  ]
+}"""
+
+# Section headers, in relevance order
+SECTIONS = (
+    ('exact_matches', 'EXACT MATCHES'),
+    ('phrase_matches', 'PHRASE MATCHES [keyword appears inside a glossary phrase]'),
+    ('fuzzy_matches', 'FUZZY MATCHES [for typos/similar words]'),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count without a network call (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def rank_hints(search_results: Dict) -> List[Dict]:
+    """Glossary hints, one per distinct glossary entry, most relevant first.
+
+    Returns:
+        List of {"section", "keywords", "match"}; keywords that matched the
+        same entry in the same way are merged into one hint
+    """
+    hints = []
+    by_entry = {}
+    for section, _ in SECTIONS:
+        matches = search_results.get(section, [])
+        if section == 'fuzzy_matches':
+            matches = sorted(matches, key=lambda match: match.get('similarity', 0), reverse=True)
+        for match in matches:
+            key = (section, match['english'].lower(), match['marshallese'].lower(), match.get('span'))
+            hint = by_entry.get(key)
+            if hint is None:
+                hint = by_entry[key] = {"section": section, "keywords": [], "match": match}
+                hints.append(hint)
+            if match['keyword'] not in hint["keywords"]:
+                hint["keywords"].append(match['keyword'])
+    return hints
+
+
+def format_hint(hint: Dict) -> str:
+    match = hint["match"]
+    keywords = ' / '.join(f"'{keyword}'" for keyword in hint["keywords"])
+    line = f"- {keywords} → English: '{match['english']}' | Marshallese: '{match['marshallese']}'"
+    if hint["section"] == 'phrase_matches' and match.get('span'):
+        line += f" (likely translation of the word: '{match['span']}')"
+    elif hint["section"] == 'fuzzy_matches':
+        line += f" (similarity: {match['similarity']})"
+    return line
+
+
+def format_findings(search_results: Dict, max_hints: int) -> str:
+    """Glossary hints (at most max_hints), missing keyword count and translation memory"""
+    hints = rank_hints(search_results)[:max_hints]
+    lines = []
+    for section, title in SECTIONS:
+        section_hints = [hint for hint in hints if hint["section"] == section]
+        if section_hints:
+            lines.append(f"{title}:")
+            lines.extend(format_hint(hint) for hint in section_hints)
+
+    not_found_count = search_results.get("not_found_count", 0)
+    if not_found_count > 0:
+        lines.append(f"KEYWORDS NOT FOUND: {not_found_count} (generate these using your knowledge)")
+
+    memory_match = search_results.get("memory_match")
+    if memory_match:
+        entry = memory_match["entry"]
+        lines.append(f"TRANSLATION MEMORY [admin-reviewed translation of a very similar sentence, similarity: {memory_match['similarity']}]:")
+        lines.append(f"- Source: \"{entry['source_text']}\"")
+        lines.append(f"- Reviewed translation: \"{entry['known_translation']}\"")
+    return '\n'.join(lines)
+
+
+def format_request(text: str, detected_lang: str, target_lang: str, search_results: Dict, max_hints: int) -> str:
+    """Per-text part of a prompt: languages, input, keywords and findings"""
+    keywords = list(dict.fromkeys(search_results.get("keywords", [text])))
+    findings = format_findings(search_results, max_hints)
+    return f"""Input Language: {detected_lang.upper()}
+Target Language: {target_lang.upper()}
+Input Text: "{text}"
+Keywords extracted: {keywords}
+{findings}
+"""
+
+
+class PromptBuilder:
+    """Builds prompts within a hint cap and an input token budget"""
+
+    def __init__(self, max_hints: int = 30, max_input_tokens: int = 2000, count_tokens: Optional[Callable[[str], int]] = None):
+        self.max_hints = max_hints
+        self.max_input_tokens = max_input_tokens
+        self.count_tokens = count_tokens or estimate_tokens
+        self._lock = threading.Lock()
+        self.prompts = 0
+        self.tokens = 0
+        self.trimmed = 0
+        self.over_budget = 0
+
+    def translation_prompt(self, user_text: str, detected_lang: str, target_lang: str, search_results: Dict) -> str:
+        """Prompt for one text (send with system instruction TRANSLATION_INSTRUCTIONS)"""
+        return self._fit(
+            lambda max_hints: format_request(user_text, detected_lang, target_lang, search_results, max_hints),
+            TRANSLATION_INSTRUCTIONS
+        )
+
+    def batch_prompt(self, items: List[Dict]) -> str:
+        """Prompt for several prepared items (send with system instruction BATCH_INSTRUCTIONS)"""
+        def build(max_hints):
+            sections = [f"BATCH TRANSLATION: {len(items)} independent texts.\n"]
+            for item_id, item in enumerate(items, start=1):
+                sections.append(f"=== ITEM {item_id} ===\n" + format_request(
+                    item['text'], item['detected_lang'], item['target_lang'], item['search_results'], max_hints
+                ))
+            return '\n'.join(sections)
+
+        return self._fit(build, BATCH_INSTRUCTIONS)
+
+    def _fit(self, build: Callable[[int], str], instructions: str) -> str:
+        """Build with the hint cap, halving it until prompt + instructions fit the token budget"""
+        budget = self.max_input_tokens - self.count_tokens(instructions) if self.max_input_tokens else 0
+        max_hints = self.max_hints
+        prompt = build(max_hints)
+        tokens = self.count_tokens(prompt)
+        trimmed = False
+        while budget and tokens > budget and max_hints > 0:
+            max_hints //= 2
+            prompt = build(max_hints)
+            tokens = self.count_tokens(prompt)
+            trimmed = True
+
+        with self._lock:
+            self.prompts += 1
+            self.tokens += tokens
+            self.trimmed += trimmed
+            # Input text alone is over budget: send it anyway, chunking keeps this rare
+            self.over_budget += bool(budget and tokens > budget)
+        return prompt
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "prompts": self.prompts,
+                "avg_prompt_tokens": round(self.tokens / self.prompts, 1) if self.prompts else 0.0,
+                "trimmed_to_budget": self.trimmed,
+                "over_budget": self.over_budget,
+                "max_hints": self.max_hints,
+                "max_input_tokens": self.max_input_tokens,
+            }
+
+
+_prompt_builder = None
+_prompt_builder_lock = threading.Lock()
+
+
+def get_prompt_builder() -> PromptBuilder:
+    """Process-wide prompt builder, configured from settings on first use.
+
+    PROMPT_TOKEN_COUNTER 'provider' counts with the LLM provider (one extra
+    API call per prompt for Gemini); the default 'estimate' counts locally.
+    """
+    global _prompt_builder
+    if _prompt_builder is None:
+        with _prompt_builder_lock:
+            if _prompt_builder is None:
+                count_tokens = None
+                if getattr(settings, 'PROMPT_TOKEN_COUNTER', 'estimate') == 'provider':
+                    from . import ai_service
+                    if ai_service.llm is not None:
+                        count_tokens = ai_service.llm.count_tokens
+                _prompt_builder = PromptBuilder(
+                    max_hints=getattr(settings, 'PROMPT_MAX_HINTS', 30),
+                    max_input_tokens=getattr(settings, 'PROMPT_MAX_INPUT_TOKENS', 2000),
+                    count_tokens=count_tokens,
+                )
+    return _prompt_builder
@@ -0,0 +1,264 @@
+"""
+Per-user rate limits and daily quotas for the translate endpoints
+Every user gets a token bucket (translations_per_minute requests, refilled
+continuously) and a daily translation cap, both from their SubscriptionPlan
+or, when the plan leaves them empty, TRANSLATION_RATE_LIMITS for the tier.
+Counters live in process memory so the check needs no database round trip;
+daily usage is flushed to TranslationQuotaUsage every
+TRANSLATION_QUOTA_FLUSH_SECONDS and read back, so the cap holds across
+workers and restarts (give or take one flush interval).
+"""
+import atexit
+import math
+import threading
+import time
+from datetime import datetime, time as day_start, timedelta
+from typing import Dict, Tuple
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from .subscription_tiers import get_user_plan
+
+DEFAULT_LIMITS = {
+    'free': {'per_minute': 10, 'per_day': 100},
+    'basic': {'per_minute': 30, 'per_day': 1000},
+    'premium': {'per_minute': 60, 'per_day': 10000},
+}
+
+
+class TokenBucket:
+    """capacity tokens, refilled at rate tokens per second"""
+
+    def __init__(self, capacity: int, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> float:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        return self.tokens
+
+
+class _DailyCounter:
+    """Today's usage for one user: best known total and the part not yet flushed"""
+
+    def __init__(self, used: int):
+        self.used = used
+        self.pending = 0
+
+
+class QuotaDecision:
+    """Outcome of a rate limit check, with the numbers for the response headers"""
+
+    def __init__(self, allowed: bool, per_minute: int = 0, remaining: int = 0, per_day: int = 0,
+                 daily_remaining: int = 0, retry_after: int = 0, reason: str = ''):
+        self.allowed = allowed
+        self.per_minute = per_minute
+        self.remaining = remaining
+        self.per_day = per_day
+        self.daily_remaining = daily_remaining
+        self.retry_after = retry_after
+        self.reason = reason
+
+    def headers(self) -> Dict[str, str]:
+        """Remaining-quota headers (limits set to 0 are unlimited and omitted)"""
+        headers = {}
+        if self.per_minute:
+            headers['X-RateLimit-Limit'] = str(self.per_minute)
+            headers['X-RateLimit-Remaining'] = str(self.remaining)
+        if self.per_day:
+            headers['X-Daily-Quota-Limit'] = str(self.per_day)
+            headers['X-Daily-Quota-Remaining'] = str(self.daily_remaining)
+        if not self.allowed:
+            headers['Retry-After'] = str(self.retry_after)
+        return headers
+
+
+def plan_limits(plan: Dict) -> Tuple[int, int]:
+    """(per_minute, per_day) for a plan from get_user_plan; 0 means unlimited"""
+    limits = getattr(settings, 'TRANSLATION_RATE_LIMITS', DEFAULT_LIMITS)
+    defaults = limits.get(plan["tier"], DEFAULT_LIMITS.get(plan["tier"], {}))
+    per_minute = plan.get("translations_per_minute")
+    per_day = plan.get("translations_per_day")
+    return (
+        defaults.get('per_minute', 0) if per_minute is None else per_minute,
+        defaults.get('per_day', 0) if per_day is None else per_day,
+    )
+
+
+def seconds_until_tomorrow() -> int:
+    now = timezone.localtime()
+    tomorrow = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), day_start.min), now.tzinfo)
+    return max(1, math.ceil((tomorrow - now).total_seconds()))
+
+
+class TranslationRateLimiter:
+    """In-memory token buckets and daily counters, flushed to the database in the background"""
+
+    def __init__(self, flush_seconds: float = 10):
+        self.flush_seconds = flush_seconds
+        self._buckets = {}
+        self._daily = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self.allowed = 0
+        self.limited = 0
+        self.over_quota = 0
+        self.flushes = 0
+        self.errors = 0
+
+    def check(self, user, translations: int = 1) -> QuotaDecision:
+        """
+        Take one request from the user's bucket and `translations` from today's quota.
+
+        Nothing is consumed when the request is refused.
+
+        Args:
+            user: Authenticated user
+            translations: Number of texts in the request (counts against the daily cap)
+
+        Returns:
+            QuotaDecision
+        """
+        per_minute, per_day = plan_limits(get_user_plan(user))
+        counter = self._daily_counter(user.id, timezone.localdate()) if per_day else None
+
+        with self._lock:
+            now = time.monotonic()
+            tokens = 0.0
+            bucket = None
+            if per_minute:
+                bucket = self._buckets.get(user.id)
+                if bucket is None or bucket.capacity != per_minute:
+                    bucket = self._buckets[user.id] = TokenBucket(per_minute, per_minute / 60)
+                tokens = bucket.refill(now)
+            daily_remaining = max(0, per_day - counter.used) if counter else 0
+
+            if bucket is not None and tokens < 1:
+                self.limited += 1
+                return QuotaDecision(
+                    False, per_minute, 0, per_day, daily_remaining,
+                    retry_after=math.ceil((1 - tokens) / bucket.rate),
+                    reason=f"Rate limit exceeded: {per_minute} translation requests per minute"
+                )
+            if counter is not None and translations > daily_remaining:
+                self.over_quota += 1
+                return QuotaDecision(
+                    False, per_minute, int(tokens), per_day, daily_remaining,
+                    retry_after=seconds_until_tomorrow(),
+                    reason=f"Daily quota exceeded: {per_day} translations per day"
+                )
+
+            if bucket is not None:
+                bucket.tokens -= 1
+            if counter is not None:
+                counter.used += translations
+                counter.pending += translations
+                daily_remaining -= translations
+            self.allowed += 1
+            decision = QuotaDecision(True, per_minute, int(tokens - 1) if bucket else 0, per_day, daily_remaining)
+
+        if counter is not None:
+            self._ensure_flusher()
+        return decision
+
+    def _daily_counter(self, user_id: int, day) -> _DailyCounter:
+        """Today's counter, loaded from the database the first time this process sees the user today"""
+        key = (user_id, day)
+        counter = self._daily.get(key)
+        if counter is not None:
+            return counter
+
+        from .models import TranslationQuotaUsage
+
+        used = TranslationQuotaUsage.objects.filter(user_id=user_id, date=day).values_list('count', flat=True).first()
+        with self._lock:
+            return self._daily.setdefault(key, _DailyCounter(used or 0))
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name='translation-quota-flush', daemon=True)
+                self._flusher.start()
+                # Don't lose the last interval's usage on a clean shutdown
+                atexit.register(self.flush)
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+    def flush(self):
+        """Add unflushed usage to TranslationQuotaUsage and pick up other workers' usage"""
+        from .models import TranslationQuotaUsage
+
+        with self._lock:
+            batch = [(key, counter, counter.pending) for key, counter in self._daily.items() if counter.pending]
+            for _, counter, _ in batch:
+                counter.pending = 0
+
+        for (user_id, day), counter, delta in batch:
+            try:
+                usage, _ = TranslationQuotaUsage.objects.get_or_create(user_id=user_id, date=day)
+                TranslationQuotaUsage.objects.filter(id=usage.id).update(count=F('count') + delta)
+                total = TranslationQuotaUsage.objects.filter(id=usage.id).values_list('count', flat=True).first()
+            except Exception as e:
+                print(f"[DEBUG] Translation quota flush failed: {e}")
+                with self._lock:
+                    counter.pending += delta
+                    self.errors += 1
+                continue
+            with self._lock:
+                counter.used = max(counter.used, total + counter.pending)
+
+        self._prune()
+        with self._lock:
+            self.flushes += 1
+
+    def _prune(self):
+        """Forget finished days and buckets that have refilled completely"""
+        today = timezone.localdate()
+        now = time.monotonic()
+        with self._lock:
+            for key in [key for key, counter in self._daily.items() if key[1] < today and not counter.pending]:
+                del self._daily[key]
+            for user_id in [user_id for user_id, bucket in self._buckets.items() if bucket.refill(now) >= bucket.capacity]:
+                del self._buckets[user_id]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "rate_limited": self.limited,
+                "over_daily_quota": self.over_quota,
+                "tracked_users": len(self._daily),
+                "active_buckets": len(self._buckets),
+                "unflushed": sum(counter.pending for counter in self._daily.values()),
+                "flushes": self.flushes,
+                "flush_errors": self.errors,
+            }
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TranslationRateLimiter:
+    """Process-wide rate limiter, configured from settings on first use"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = TranslationRateLimiter(
+                    flush_seconds=getattr(settings, 'TRANSLATION_QUOTA_FLUSH_SECONDS', 10)
+                )
+    return _rate_limiter
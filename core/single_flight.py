@@ -0,0 +1,228 @@
+"""
+Single-flight coalescing for translate_with_ai
+Concurrent requests for the same key share one upstream call: the first
+caller (leader) runs it and every caller waiting on the same key gets a copy
+of its result. Optionally a striped file lock extends this across workers.
+Coroutines on the async path coalesce the same way through ado, waiting on
+futures instead of threads.
+"""
+import asyncio
+import copy
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Optional
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: only coalesce inside one worker
+    fcntl = None
+
+# Number of lock files shared by all keys in cross-worker mode
+LOCK_STRIPES = 256
+
+
+class _Call:
+    """One in-flight upstream call"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key"""
+
+    def __init__(self, timeout: float = 30, cross_worker: bool = False, lock_dir: Optional[str] = None):
+        self.timeout = timeout
+        self.cross_worker = cross_worker and fcntl is not None
+        self.lock_dir = lock_dir or os.path.join(tempfile.gettempdir(), 'translation-single-flight')
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.cross_worker_saved = 0
+        self.timeouts = 0
+
+    def do(self, key: str, fn: Callable[[], Dict], recheck: Optional[Callable[[], Optional[Dict]]] = None) -> Dict:
+        """Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Coalescing key (normalized text, direction, glossary version,
+                and anything else that changes the result, like the tier)
+            fn: Upstream call producing the result
+            recheck: Cross-worker mode only; looks up a result another worker
+                stored while this one waited for the lock
+
+        Returns:
+            The result (followers get their own copy)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+
+        if not leader:
+            if call.event.wait(self.timeout):
+                with self._lock:
+                    self.coalesced += 1
+                if call.error is not None:
+                    raise call.error
+                return copy.deepcopy(call.result)
+            # Leader is stuck, don't make this caller wait any longer
+            with self._lock:
+                self.timeouts += 1
+            return fn()
+
+        try:
+            call.result = self._run_leader(key, fn, recheck)
+            return call.result
+        except BaseException as e:
+            # Followers must not read the missing result as a None answer
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Dict]]) -> Dict:
+        """Async variant of do (in-process only): followers await the leader's
+        result without holding a thread.
+
+        A follower whose leader was cancelled (its client went away) runs fn
+        itself instead of failing with the leader's cancellation.
+
+        Args:
+            key: Coalescing key, as for do
+            fn: Coroutine function producing the result
+
+        Returns:
+            The result (followers get their own copy)
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            waiters = self._async_calls.get(key)
+            leader = waiters is None
+            if leader:
+                waiters = self._async_calls[key] = []
+                self.leaders += 1
+            else:
+                future = loop.create_future()
+                waiters.append(future)
+
+        if not leader:
+            try:
+                result = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                # Leader is stuck, don't make this caller wait any longer
+                with self._lock:
+                    self.timeouts += 1
+                return await fn()
+            except _LeaderCancelled:
+                return await fn()
+            with self._lock:
+                self.coalesced += 1
+            return copy.deepcopy(result)
+
+        result, error = None, None
+        try:
+            result = await fn()
+            return result
+        except BaseException as e:
+            error = _LeaderCancelled() if isinstance(e, asyncio.CancelledError) else e
+            raise
+        finally:
+            with self._lock:
+                del self._async_calls[key]
+            for future in waiters:
+                # Followers may wait on another thread's event loop
+                future.get_loop().call_soon_threadsafe(_settle, future, result, error)
+
+    def _run_leader(self, key, fn, recheck):
+        if not self.cross_worker:
+            return fn()
+        with self._worker_lock(key) as acquired:
+            if acquired and recheck is not None:
+                result = recheck()
+                if result is not None:
+                    with self._lock:
+                        self.cross_worker_saved += 1
+                    return result
+            return fn()
+
+    @contextmanager
+    def _worker_lock(self, key):
+        """Exclusive flock on the lock file for key's stripe (gives up after timeout)"""
+        stripe = int(hashlib.sha256(key.encode('utf-8')).hexdigest()[:8], 16) % LOCK_STRIPES
+        os.makedirs(self.lock_dir, exist_ok=True)
+        with open(os.path.join(self.lock_dir, f"{stripe:03d}.lock"), 'a') as lock_file:
+            deadline = time.monotonic() + self.timeout
+            acquired = False
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    acquired = True
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        with self._lock:
+                            self.timeouts += 1
+                        break
+                    time.sleep(0.05)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "upstream_calls": self.leaders - self.cross_worker_saved,
+                "coalesced_calls": self.coalesced,
+                "cross_worker_saved": self.cross_worker_saved,
+                "calls_saved": self.coalesced + self.cross_worker_saved,
+                "timeouts": self.timeouts,
+                "cross_worker": self.cross_worker,
+            }
+
+
+class _LeaderCancelled(Exception):
+    """Raised in async followers whose leader was cancelled"""
+
+
+def _settle(future: asyncio.Future, result, error):
+    if not future.done():
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide single-flight group, configured from settings on first use"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight(
+                    timeout=getattr(settings, 'TRANSLATION_SINGLE_FLIGHT_TIMEOUT', 30),
+                    cross_worker=getattr(settings, 'TRANSLATION_SINGLE_FLIGHT_CROSS_WORKER', False),
+                    lock_dir=getattr(settings, 'TRANSLATION_SINGLE_FLIGHT_LOCK_DIR', '') or None,
+                )
+    return _single_flight
@@ -0,0 +1,87 @@
+"""
+Subscription tier of a user, used to prioritise and rate limit LLM work
+Tiers come from the user's UserSubscription: 'premium' or 'basic' for an
+active subscription with that plan type, 'free' otherwise. Lookups (tier plus
+the plan's translate limits) are cached per process for
+SUBSCRIPTION_TIER_CACHE_SECONDS and dropped when the subscription row changes.
+"""
+import threading
+from typing import Dict
+from cachetools import TTLCache
+from django.conf import settings
+
+PREMIUM = 'premium'
+BASIC = 'basic'
+FREE = 'free'
+
+# Highest priority first
+TIERS = (PREMIUM, BASIC, FREE)
+
+FREE_PLAN = {"tier": FREE, "translations_per_minute": None, "translations_per_day": None}
+
+_tiers = None
+_tiers_lock = threading.Lock()
+
+
+def _tier_cache() -> TTLCache:
+    global _tiers
+    if _tiers is None:
+        with _tiers_lock:
+            if _tiers is None:
+                _tiers = TTLCache(maxsize=10000, ttl=getattr(settings, 'SUBSCRIPTION_TIER_CACHE_SECONDS', 60))
+    return _tiers
+
+
+def get_user_plan(user) -> Dict:
+    """
+    Tier and translate limits of a user's current plan.
+
+    Args:
+        user: User instance (anonymous or None counts as free)
+
+    Returns:
+        {"tier", "translations_per_minute", "translations_per_day"}; the limits
+        are the plan's own values (None = use the default for the tier)
+    """
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return dict(FREE_PLAN)
+
+    cache = _tier_cache()
+    with _tiers_lock:
+        plan = cache.get(user.id)
+    if plan is not None:
+        return dict(plan)
+
+    from authentications.models import UserSubscription
+
+    plan = dict(FREE_PLAN)
+    subscription = UserSubscription.objects.select_related('plan').filter(user_id=user.id).first()
+    if subscription and subscription.plan and subscription.is_active():
+        plan = {
+            "tier": PREMIUM if subscription.plan.plan_type == 'premium' else BASIC,
+            "translations_per_minute": subscription.plan.translations_per_minute,
+            "translations_per_day": subscription.plan.translations_per_day,
+        }
+
+    with _tiers_lock:
+        cache[user.id] = plan
+    return dict(plan)
+
+
+def get_user_tier(user) -> str:
+    """Priority tier of a user ('premium', 'basic' or 'free')"""
+    return get_user_plan(user)["tier"]
+
+
+def forget_user_tier(user_id: int):
+    """Drop the cached tier so the next lookup reads the subscription again"""
+    cache = _tier_cache()
+    with _tiers_lock:
+        cache.pop(user_id, None)
+
+
+def forget_all_tiers():
+    """Drop every cached tier (a plan's limits changed)"""
+    cache = _tier_cache()
+    with _tiers_lock:
+        cache.clear()
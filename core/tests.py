@@ -1,3 +1,839 @@
-from django.test import TestCase
+import asyncio
+import threading
+import time
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from . import ai_service, async_translation, circuit_breaker, glossary_index, llm_queue, rate_limits, subscription_tiers
+from .async_translation import acall_llm
+from .circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from .glossary_index import GlossaryIndex, PhraseAutomaton
+from .llm_providers import FakeProvider, LLMProviderError
+from .llm_queue import LLMWorkQueue, LoadShedError
+from .micro_batcher import MicroBatcher
+from .single_flight import SingleFlight
 
-# Create your tests here.
+
+def finishes(target, *args, timeout=5) -> bool:
+    """Run target in a thread; False when it is still running after timeout (deadlock)"""
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+class SubscriptionTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        # A fresh process: the tier cache is created on first use
+        self._saved = subscription_tiers._tiers
+        subscription_tiers._tiers = None
+
+    def tearDown(self):
+        subscription_tiers._tiers = self._saved
+
+    def test_forget_user_tier_in_cold_process(self):
+        self.assertTrue(finishes(subscription_tiers.forget_user_tier, 1))
+        self.assertIsNotNone(subscription_tiers._tiers)
+
+    def test_forget_all_tiers_in_cold_process(self):
+        self.assertTrue(finishes(subscription_tiers.forget_all_tiers))
+        self.assertIsNotNone(subscription_tiers._tiers)
+
+
+class FakeLLM:
+    """Provider stand-in whose calls block until released"""
+
+    def __init__(self):
+        self.timeouts = []
+
+    def generate(self, prompt, timeout=None, system=None):
+        self.timeouts.append(timeout)
+        return '{}'
+
+    def generate_stream(self, prompt, timeout=None, system=None):
+        self.timeouts.append(timeout)
+        yield 'first'
+        yield 'second'
+
+    async def agenerate(self, prompt, timeout=None, system=None):
+        self.timeouts.append(timeout)
+        await asyncio.sleep(60)
+
+
+class FakeClock:
+    """Stand-in for a module's `time`: monotonic() only moves when advanced"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class LLMCallTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(open_seconds=0)
+        # Cool-down over: the next allowed call is the half-open probe
+        self.breaker.state = OPEN
+        self.queue = LLMWorkQueue(max_concurrency=1)
+        self.llm = FakeLLM()
+        for patcher in (
+            mock.patch.object(circuit_breaker, '_circuit_breaker', self.breaker),
+            mock.patch.object(llm_queue, '_llm_queue', self.queue),
+            mock.patch.object(llm_queue, '_async_llm_queue', self.queue),
+            mock.patch.object(ai_service, 'llm', self.llm),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_abandoned_stream_releases_half_open_probe(self):
+        stream = ai_service.stream_llm('prompt')
+        self.assertEqual(next(stream), 'first')
+        stream.close()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.queue.active, 0)
+
+    def test_cancelled_probe_releases_half_open_probe(self):
+        async def cancel_probe():
+            task = asyncio.ensure_future(acall_llm('prompt'))
+            while not self.llm.timeouts:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_probe())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.queue.active, 0)
+
+    @override_settings(TRANSLATION_LLM_DEADLINE_SECONDS=1)
+    def test_queue_wait_counts_against_deadline(self):
+        self.queue.acquire()
+        releaser = threading.Timer(0.3, self.queue.release)
+        releaser.start()
+        ai_service.call_llm('prompt')
+        releaser.join()
+        self.assertLess(self.llm.timeouts[0], 0.8)
+
+    @override_settings(TRANSLATION_LLM_DEADLINE_SECONDS=0.2)
+    def test_queue_wait_is_capped_by_deadline(self):
+        self.queue.acquire()
+        started = time.monotonic()
+        with self.assertRaises(LoadShedError):
+            ai_service.call_llm('prompt', tier='premium')
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.llm.timeouts, [])
+
+
+class TranslationMemorySourceTests(TestCase):
+    def setUp(self):
+        from authentications.models import CustomUser
+        from .models import Category
+
+        self.user = CustomUser.objects.create_user(email='memory@example.com', password='unused-password')
+        self.category = Category.objects.create(name='Memory test')
+
+    def history(self, text, result):
+        from .models import UserTranslationHistory
+        from .views import translation_history_fields
+
+        return UserTranslationHistory.objects.create(**translation_history_fields(self.user, text, result, self.category))
+
+    def test_only_admin_reviewed_rows_are_remembered(self):
+        from django.utils import timezone
+        from .translation_memory import build_translation_memory
+
+        automatic = self.history('Good morning friend', {'translation': 'Iakwe', 'admin_review_needed': False})
+        reviewed = self.history('Where is the clinic', {'translation': 'Ewi aujpitōļ', 'admin_review_needed': True})
+        self.assertEqual(automatic.status, 'automatic')
+
+        reviewed.status = 'updated'
+        reviewed.reviewed_by = self.user
+        reviewed.reviewed_date = timezone.now()
+        reviewed.save()
+
+        memory = build_translation_memory()
+        self.assertEqual(memory.ids, {reviewed.id})
+
+
+class AdminReviewGlossaryTests(TestCase):
+    def test_review_updates_entry_with_same_search_key(self):
+        from django.contrib import admin
+        from django.test import RequestFactory
+        from authentications.models import CustomUser
+        from .models import Category, Translation, UserTranslationHistory
+
+        reviewer = CustomUser.objects.create_user(email='reviewer@example.com', password='unused-password')
+        category = Category.objects.create(name='Review test')
+        existing = Translation.objects.create(english_text='Good morning', marshallese_text='Iọkwe', category=category)
+        history = UserTranslationHistory.objects.create(
+            user=reviewer, source_text='good  MORNING', known_translation='Iakwe in jibboñ', category=category
+        )
+
+        history.status = 'updated'
+        request = RequestFactory().post('/admin/')
+        request.user = reviewer
+        with mock.patch('core.notification_service.send_push_notification'):
+            admin.site._registry[UserTranslationHistory].save_model(request, history, None, True)
+
+        self.assertEqual(Translation.objects.filter(category=category).count(), 1)
+        existing.refresh_from_db()
+        self.assertEqual(existing.marshallese_text, 'Iakwe in jibboñ')
+        self.assertEqual(existing.english_text, 'Good morning')
+
+
+class SearchColumnBackfillTests(TestCase):
+    def test_backfill_fixes_stale_keys(self):
+        from importlib import import_module
+        from django.apps import apps
+        from .models import Category, Translation
+
+        migration = import_module('core.migrations.0023_backfill_translation_search_columns')
+        category = Category.objects.create(name='Backfill test')
+        stale = Translation.objects.create(english_text='Hello', marshallese_text='Yokwe', category=category)
+        fresh = Translation.objects.create(english_text='Thank you', marshallese_text='Kom̧m̧ool', category=category)
+        Translation.objects.filter(pk=stale.pk).update(marshallese_search='yokwe')
+
+        migration.backfill_search_columns(apps, None)
+
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(stale.marshallese_search, 'iakwe')
+        self.assertEqual(fresh.marshallese_search, 'kommol')
+
+
+class AsyncAdmissionTests(SimpleTestCase):
+    def test_waiting_coroutines_hold_no_thread(self):
+        queue = LLMWorkQueue(max_concurrency=1)
+
+        async def run():
+            await queue.aacquire('premium')
+            threads = threading.active_count()
+            waiters = [asyncio.ensure_future(queue.aacquire('premium')) for _ in range(100)]
+            await asyncio.sleep(0.05)
+            self.assertEqual(queue.depth(), 100)
+            self.assertEqual(threading.active_count(), threads)
+            for waiter in waiters:
+                queue.release()
+                await waiter
+            queue.release()
+
+        asyncio.run(run())
+        self.assertEqual((queue.active, queue.depth()), (0, 0))
+
+    def test_cancelled_waiter_leaves_no_ticket(self):
+        queue = LLMWorkQueue(max_concurrency=1)
+
+        async def run():
+            async with queue.aslot('premium'):
+                waiter = asyncio.ensure_future(queue.aacquire('premium'))
+                await asyncio.sleep(0.01)
+                waiter.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await waiter
+                self.assertEqual(queue.depth(), 0)
+
+        asyncio.run(run())
+        self.assertEqual(queue.active, 0)
+
+    def test_waiter_times_out_as_shed(self):
+        queue = LLMWorkQueue(max_concurrency=1)
+
+        async def run():
+            async with queue.aslot('premium'):
+                with self.assertRaises(LoadShedError):
+                    await queue.aacquire('premium', timeout=0.05)
+
+        asyncio.run(run())
+        self.assertEqual((queue.active, queue.depth()), (0, 0))
+
+    def test_hundreds_of_llm_calls_in_flight(self):
+        in_flight = peak = 0
+
+        async def agenerate(prompt, timeout=None, system=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return '{}'
+
+        async def run():
+            return await asyncio.gather(*(acall_llm('prompt', 'premium') for _ in range(300)))
+
+        with mock.patch.object(circuit_breaker, '_circuit_breaker', CircuitBreaker()), \
+                mock.patch.object(llm_queue, '_async_llm_queue', None), \
+                mock.patch.object(ai_service, 'llm', mock.Mock(agenerate=agenerate)):
+            results = asyncio.run(run())
+        self.assertEqual(len(results), 300)
+        self.assertEqual(peak, 256)
+
+
+class AsyncTranslatePathTests(SimpleTestCase):
+    def test_concurrent_stale_checks_rebuild_the_index_once(self):
+        def build(version=''):
+            time.sleep(0.05)
+            return GlossaryIndex(glossary_entries(('hello', 'iakwe')), version)
+
+        async def run():
+            return await asyncio.gather(*(glossary_index.aget_glossary_index() for _ in range(20)))
+
+        with mock.patch.object(glossary_index, '_index', None), \
+                mock.patch.object(glossary_index, '_dirty', True), \
+                mock.patch.object(glossary_index, 'database_stamp', return_value='v1'), \
+                mock.patch.object(glossary_index, 'build_glossary_index', side_effect=build) as builder:
+            indexes = asyncio.run(run())
+        builder.assert_called_once()
+        self.assertEqual(len({id(index) for index in indexes}), 1)
+
+    def translate_concurrently(self, upstream, count=5, cancel_first=False):
+        memory = mock.Mock(lookup=mock.Mock(return_value=None))
+        cache = mock.Mock(get=mock.Mock(return_value=None))
+
+        async def run():
+            tasks = [asyncio.ensure_future(async_translation.atranslate_with_ai('Hello', 'free')) for _ in range(count)]
+            await asyncio.sleep(0.01)
+            if cancel_first:
+                tasks[0].cancel()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        with mock.patch.object(async_translation, 'aget_glossary_index', mock.AsyncMock(return_value=mock.Mock(version='v1'))), \
+                mock.patch.object(async_translation, 'aget_translation_memory', mock.AsyncMock(return_value=memory)), \
+                mock.patch.object(async_translation, 'get_translation_cache', return_value=cache), \
+                mock.patch.object(async_translation, 'get_translation_store', return_value=None), \
+                mock.patch.object(async_translation, 'get_single_flight', return_value=SingleFlight(timeout=5)), \
+                mock.patch.object(async_translation, 'atranslate_uncached', side_effect=upstream):
+            return asyncio.run(run())
+
+    def test_concurrent_requests_share_one_upstream_call(self):
+        calls = 0
+
+        async def upstream(*args):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {'translation': 'Iakwe'}
+
+        results = self.translate_concurrently(upstream)
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, [{'translation': 'Iakwe'}] * 5)
+
+    def test_followers_of_a_cancelled_leader_translate_themselves(self):
+        calls = 0
+
+        async def upstream(*args):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {'translation': 'Iakwe'}
+
+        results = self.translate_concurrently(upstream, count=3, cancel_first=True)
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertEqual(results[1:], [{'translation': 'Iakwe'}] * 2)
+        self.assertEqual(calls, 3)
+
+
+class FullTextSearchRepairTests(TransactionTestCase):
+    def test_missing_trigger_falls_back_then_is_repaired(self):
+        from django.db import connection
+        from .full_text_search import forget_availability, full_text_available, repair_full_text_search, search
+        from .models import Category, Translation
+
+        if not full_text_available(Translation):
+            self.skipTest('FTS5 not available')
+        category = Category.objects.create(name='Search test')
+        # What a migration that rebuilds core_translation leaves behind
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER core_translation_fts_ai")
+        forget_availability('default')
+        self.assertFalse(full_text_available(Translation))
+
+        Translation.objects.create(english_text='Thermometer', marshallese_text='Kein jonoñ an bwil', category=category)
+        self.assertEqual([t.english_text for t in search(Translation.objects.all(), 'thermo')], ['Thermometer'])
+
+        self.assertEqual(repair_full_text_search(), ['core.translation'])
+        self.assertTrue(full_text_available(Translation))
+        found = list(search(Translation.objects.all(), 'thermo'))
+        self.assertEqual([t.english_text for t in found], ['Thermometer'])
+        self.assertTrue(hasattr(found[0], 'search_rank'))
+
+
+def glossary_entries(*pairs):
+    return [
+        {'id': position, 'english_text': english, 'marshallese_text': marshallese, 'category': None, 'usage_count': 0}
+        for position, (english, marshallese) in enumerate(pairs, start=1)
+    ]
+
+
+class PhraseAutomatonTests(SimpleTestCase):
+    def automaton(self, *phrases):
+        automaton = PhraseAutomaton()
+        for phrase in phrases:
+            automaton.add(phrase.split(), phrase)
+        return automaton
+
+    def test_longest_phrase_at_each_start(self):
+        automaton = self.automaton('chest', 'chest pain', 'chest pain medicine', 'pain', 'pain medicine')
+        longest = automaton.longest_matches('severe chest pain medicine'.split())
+        self.assertEqual(longest, [None, (3, 'chest pain medicine'), (2, 'pain medicine'), None])
+
+    def test_overlapping_phrases_found_through_failure_links(self):
+        automaton = self.automaton('a b c', 'b c d', 'c')
+        self.assertEqual(automaton.longest_matches('a b c d'.split()), [(3, 'a b c'), (3, 'b c d'), (1, 'c'), None])
+
+    def test_partial_phrase_is_not_a_match(self):
+        automaton = self.automaton('a b c', 'b x')
+        self.assertEqual(automaton.longest_matches('a b x'.split()), [None, (2, 'b x'), None])
+
+    def test_first_entry_for_a_phrase_wins(self):
+        automaton = PhraseAutomaton()
+        automaton.add(['pain'], 'first')
+        automaton.add(['pain'], 'second')
+        self.assertEqual(automaton.longest_matches(['pain']), [(1, 'first')])
+
+
+class GlossarySegmentTests(SimpleTestCase):
+    def setUp(self):
+        self.index = GlossaryIndex(glossary_entries(
+            ('Chest pain', 'Metak ilo ṃōttan'),
+            ('Chest', 'Ṃōttan'),
+            ('Where does it hurt', 'Ia eo ej metak'),
+        ), version='test')
+
+    def segments(self, text):
+        return [(segment['text'], segment['entry']['english_text'] if segment['entry'] else None)
+                for segment in self.index.segment(text)]
+
+    def test_longest_phrases_and_gaps(self):
+        self.assertEqual(self.segments('I have chest pain today'), [
+            ('I have', None), ('chest pain', 'Chest pain'), ('today', None),
+        ])
+
+    def test_punctuation_at_word_edges(self):
+        self.assertEqual(self.segments('Where does it hurt? "Chest pain!"'), [
+            ('Where does it hurt', 'Where does it hurt'), ('Chest pain', 'Chest pain'),
+        ])
+
+    def test_punctuation_only_words_are_skipped(self):
+        self.assertEqual(self.segments('chest - pain'), [('chest pain', 'Chest pain')])
+
+
+@override_settings(GLOSSARY_FAST_PATH='always')
+class GlossaryFastPathTests(SimpleTestCase):
+    def setUp(self):
+        self.index = GlossaryIndex(glossary_entries(
+            ('Arm', 'Ba'),
+            ('Chest pain', 'Metak ilo ṃōttan'),
+            ('Fever', 'Piva'),
+        ), version='test')
+
+    def answers_from_glossary(self, text):
+        return ai_service.use_glossary_only(text, ai_service.search_translation_db(text, self.index))
+
+    def test_every_word_covered(self):
+        self.assertTrue(self.answers_from_glossary('Chest pain, fever!'))
+
+    def test_stop_words_are_not_covered(self):
+        self.assertFalse(self.answers_from_glossary('Where is my arm?'))
+        self.assertFalse(self.answers_from_glossary('the fever'))
+
+
+def memory_entries(*pairs):
+    return [
+        {'id': index, 'source_text': source, 'known_translation': translation, 'notes': None}
+        for index, (source, translation) in enumerate(pairs, start=1)
+    ]
+
+
+class TranslationMemoryLookupTests(SimpleTestCase):
+    def setUp(self):
+        from .translation_memory import TranslationMemory
+
+        self.memory = TranslationMemory(memory_entries(
+            ('I have a headache', 'Ej metak bōra'),
+            ('My headache is worse', 'Metak in bōra eļap nana'),
+            ('She has a fever', 'Ej bwil ānbwinnin'),
+            ('I have a cough', 'Ij kwōtkōt'),
+            ('Take two tablets every morning', 'Idaak ruo pil aolep jibboñ'),
+        ), 'test')
+
+    def test_typo_in_the_rarest_word_still_finds_the_sentence(self):
+        match = self.memory.lookup('I have a headahce', 0.8)
+        self.assertEqual(match['entry']['source_text'], 'I have a headache')
+
+    def test_changed_word_known_elsewhere_still_finds_the_sentence(self):
+        # "has" is the rarest query word but only appears in another sentence
+        match = self.memory.lookup('I has a headache', 0.8)
+        self.assertEqual(match['entry']['source_text'], 'I have a headache')
+
+    def test_only_exact_matches_are_marked_exact(self):
+        self.assertTrue(self.memory.lookup('i have a HEADACHE!', 0.8)['exact'])
+        self.assertNotIn('exact', self.memory.lookup('I have a headahce', 0.8))
+
+    def test_different_numbers_are_never_reused(self):
+        match = self.memory.lookup('Take ten tablets every morning', 0.8)
+        self.assertEqual(match['entry']['source_text'], 'Take two tablets every morning')
+        # Even a similarity above the reuse threshold must not serve another dose
+        for text in ('Take ten tablets every morning', 'Take 2 tablets every morning'):
+            self.assertFalse(ai_service.reusable_memory_match(text, dict(match, similarity=0.99)))
+
+    def test_near_match_is_served_for_review(self):
+        match = {'entry': memory_entries(('I have a headache.', 'Ej metak bōra'))[0], 'similarity': 0.97}
+        self.assertTrue(ai_service.reusable_memory_match('I have the headache', match))
+        with mock.patch.object(ai_service, 'detect_category', return_value=(None, 'General')):
+            result = ai_service.build_memory_result('I have the headache', match)
+        self.assertTrue(result['admin_review_needed'])
+        self.assertEqual(result['confidence'], 'medium')
+
+    def test_exact_match_is_served_as_reviewed(self):
+        match = self.memory.lookup('I have a headache', 0.8)
+        with mock.patch.object(ai_service, 'detect_category', return_value=(None, 'General')):
+            result = ai_service.build_memory_result('I have a headache', match)
+        self.assertFalse(result['admin_review_needed'])
+        self.assertEqual(result['confidence'], 'high')
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_followers_get_the_leaders_base_exception(self):
+        class Cancelled(BaseException):
+            pass
+
+        flight = SingleFlight(timeout=5)
+        started, release = threading.Event(), threading.Event()
+
+        def cancelled_upstream():
+            started.set()
+            release.wait(5)
+            raise Cancelled()
+
+        def lead():
+            with self.assertRaises(Cancelled):
+                flight.do('key', cancelled_upstream)
+
+        leader = threading.Thread(target=lead, daemon=True)
+        leader.start()
+        self.assertTrue(started.wait(5))
+        threading.Timer(0.2, release.set).start()
+        with self.assertRaises(Cancelled):
+            flight.do('key', lambda: {'translation': 'not the leader'})
+        leader.join(5)
+        self.assertEqual(flight.stats()['coalesced_calls'], 1)
+
+    def test_tiers_do_not_share_a_flight(self):
+        flight = mock.Mock(cross_worker=False)
+        flight.do.return_value = {'translation': 'Iakwe'}
+        with mock.patch.object(ai_service, 'lookup_known_translation', return_value=(None, None)), \
+                mock.patch.object(ai_service, 'get_single_flight', return_value=flight), \
+                mock.patch.object(ai_service, 'get_translation_store', return_value=None), \
+                mock.patch.object(ai_service, 'get_glossary_version', return_value='v1'):
+            ai_service.translate_with_ai('Hello', 'free')
+            ai_service.translate_with_ai('Hello', 'premium')
+            ai_service.translate_with_ai('hello!', 'premium')
+        free, premium, premium_again = [call.args[0] for call in flight.do.call_args_list]
+        self.assertNotEqual(free, premium)
+        self.assertEqual(premium, premium_again)
+
+
+def prepared_item(text, tier=None):
+    return {'text': text, 'tier': tier, 'detected_lang': 'english', 'target_lang': 'marshallese', 'search_results': {}}
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def test_followers_get_the_leaders_base_exception(self):
+        class Cancelled(BaseException):
+            pass
+
+        batcher = MicroBatcher(window_ms=5000, max_items=2)
+        errors = []
+
+        def submit(text):
+            try:
+                batcher.submit(prepared_item(text))
+            except Cancelled as e:
+                errors.append(e)
+
+        with mock.patch.object(ai_service, 'translate_pending_batch', side_effect=Cancelled()):
+            threads = [threading.Thread(target=submit, args=(text,), daemon=True) for text in ('one', 'two')]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(len(errors), 2)
+
+    def test_follower_translates_alone_when_the_leader_is_stuck(self):
+        batcher = MicroBatcher(window_ms=5000, max_items=2, timeout=0.1)
+        release = threading.Event()
+
+        def stuck_batch(items):
+            release.wait(5)
+            return [{'translation': 'batched'} for _ in items]
+
+        with mock.patch.object(ai_service, 'translate_pending_batch', side_effect=stuck_batch), \
+                mock.patch.object(ai_service, 'translate_prepared', return_value={'translation': 'alone'}):
+            leader = threading.Thread(target=batcher.submit, args=(prepared_item('one'),), daemon=True)
+            leader.start()
+            while batcher._open is None:
+                time.sleep(0.001)
+            self.assertEqual(batcher.submit(prepared_item('two')), {'translation': 'alone'})
+            release.set()
+            leader.join(5)
+        self.assertEqual(batcher.stats()['timeouts'], 1)
+
+    def test_missing_items_are_sent_again_as_one_batch(self):
+        import json
+
+        def answer(context, tier, system=None):
+            # The first answer drops every item but the first
+            texts = context if answer.calls else context[:1]
+            answer.calls += 1
+            return json.dumps({'items': [{'id': i, 'translation': text.upper()} for i, text in enumerate(texts, 1)]})
+        answer.calls = 0
+
+        def result(text, detected_lang, target_lang, search_results, translation, *args):
+            return {'translation': translation}
+
+        with mock.patch.object(ai_service, 'build_batch_context', side_effect=lambda items: [item['text'] for item in items]), \
+                mock.patch.object(ai_service, 'call_llm', side_effect=answer), \
+                mock.patch.object(ai_service, 'build_translation_result', side_effect=result), \
+                mock.patch.object(ai_service, 'translate_prepared') as translate_alone:
+            results = ai_service.translate_pending_batch([prepared_item(text) for text in ('one', 'two', 'three')])
+        self.assertEqual([r['translation'] for r in results], ['ONE', 'TWO', 'THREE'])
+        self.assertEqual(answer.calls, 2)
+        translate_alone.assert_not_called()
+
+
+class TranslationFieldExtractorTests(SimpleTestCase):
+    def extract(self, *chunks):
+        extractor = ai_service.TranslationFieldExtractor()
+        return [extractor.feed(chunk) for chunk in chunks]
+
+    def test_key_and_value_split_across_chunks(self):
+        deltas = self.extract('{"transl', 'ation": "Ia', 'kwe', '", "context": "greeting"}')
+        self.assertEqual(deltas, ['', 'Ia', 'kwe', ''])
+
+    def test_escaped_quote_split_from_its_backslash(self):
+        deltas = self.extract('{"translation": "Ej ba \\', '"iakwe\\"', '", "context": "x"}')
+        self.assertEqual(''.join(deltas), 'Ej ba "iakwe"')
+        self.assertEqual(deltas[0], 'Ej ba ')
+
+    def test_unicode_escape_split_mid_sequence(self):
+        deltas = self.extract('{"translation": "Kom\\u01', '2bol"}')
+        self.assertEqual(deltas, ['Kom', '\u012bol'])
+
+    def test_surrogate_pair_is_never_emitted_half_decoded(self):
+        deltas = self.extract('{"translation": "Iakwe \\ud83d', '\\ude00"}')
+        self.assertEqual(deltas, ['Iakwe ', '\U0001f600'])
+
+    def test_character_by_character_matches_the_parsed_field(self):
+        import json
+
+        payload = json.dumps({'translation': 'Kom̧m̧ool "tata" \\ 😀\nEkōņ', 'context': 'ignored "translation": "x"'})
+        deltas = self.extract(*payload)
+        self.assertEqual(''.join(deltas), json.loads(payload)['translation'])
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(circuit_breaker, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, window=4, slow_call_seconds=1, open_seconds=30)
+
+    def test_opens_at_the_failure_rate_once_the_window_has_min_calls(self):
+        self.breaker.record_failure(0.1)
+        self.breaker.record_failure(0.1)
+        self.breaker.record_success(0.1)
+        self.assertEqual(self.breaker.state, CLOSED)  # 2 of 3 bad, below min_calls
+        self.breaker.record_success(0.1)
+        self.assertEqual(self.breaker.state, OPEN)  # 2 of 4 bad
+
+    def test_slow_successes_count_as_bad(self):
+        for latency in (0.1, 0.1, 2, 2):
+            self.breaker.record_success(latency)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_half_open_after_cool_down_lets_one_probe_through(self):
+        self.breaker._open()
+        self.clock.advance(29.9)
+        self.assertTrue(self.breaker.rejects())
+        self.assertFalse(self.breaker.allow())
+        self.clock.advance(0.1)
+        self.assertFalse(self.breaker.rejects())
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_probe_success_closes_with_a_clean_window(self):
+        for _ in range(3):
+            self.breaker.record_failure(0.1)
+        self.breaker._open()
+        self.clock.advance(30)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success(0.1)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.stats()['window_failure_rate'], 0.0)
+
+    def test_probe_failure_reopens_for_a_full_cool_down(self):
+        self.breaker._open()
+        self.clock.advance(30)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure(0.1)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.advance(29)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.stats()['times_opened'], 2)
+
+    def test_failing_provider_stops_being_called_once_open(self):
+        provider = FakeProvider(error_rate=1.0)
+        with mock.patch.object(circuit_breaker, '_circuit_breaker', self.breaker), \
+                mock.patch.object(llm_queue, '_llm_queue', LLMWorkQueue(max_concurrency=1)), \
+                mock.patch.object(ai_service, 'llm', provider):
+            for _ in range(4):
+                with self.assertRaises(LLMProviderError):
+                    ai_service.call_llm('prompt')
+            with self.assertRaises(CircuitOpenError):
+                ai_service.call_llm('prompt')
+        self.assertEqual(provider.calls, 4)
+        self.assertEqual(self.breaker.stats()['rejected'], 1)
+
+
+class LLMWorkQueueTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(llm_queue, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.queue = LLMWorkQueue(max_concurrency=1, max_depth=40, shed_depth=30, shed_wait=2, max_wait=20)
+        self.queue.acquire('premium')  # every later caller has to queue
+
+    def enqueue(self, tier):
+        with self.queue._cond:
+            return self.queue._enqueue(tier)
+
+    def test_freed_slots_follow_smooth_weighted_round_robin(self):
+        tickets = [self.enqueue(tier) for tier in ('premium', 'basic', 'free') for _ in range(10)]
+        order = []
+        for _ in range(10):
+            self.queue.release()
+            granted = [ticket for ticket in tickets if ticket.granted and ticket not in order]
+            self.assertEqual(len(granted), 1)
+            order.extend(granted)
+        self.assertEqual(
+            [ticket.tier[0] for ticket in order],
+            ['p', 'b', 'p', 'p', 'b', 'p', 'f', 'p', 'b', 'p']
+        )
+
+    def test_lowest_tier_is_shed_first_when_the_queue_is_deep(self):
+        for _ in range(30):
+            self.enqueue('premium')
+        with self.assertRaisesMessage(LoadShedError, 'queue saturated, free request shed'):
+            self.enqueue('free')
+        self.enqueue('basic')
+        self.assertEqual(self.queue.stats()['tiers']['free']['shed'], 1)
+
+    def test_lowest_tier_is_shed_once_its_oldest_request_waited_too_long(self):
+        self.enqueue('free')
+        self.clock.advance(1.9)
+        self.enqueue('free')
+        self.clock.advance(0.1)
+        with self.assertRaises(LoadShedError):
+            self.enqueue('free')
+        self.enqueue('premium')
+
+    def test_every_tier_is_shed_when_the_queue_is_full(self):
+        for _ in range(40):
+            self.enqueue('premium')
+        with self.assertRaisesMessage(LoadShedError, 'queue full, premium request shed'):
+            self.enqueue('premium')
+        self.assertEqual(self.queue.depth(), 40)
+
+    def test_waits_are_bounded_per_tier(self):
+        free, premium = self.enqueue('free'), self.enqueue('premium')
+        self.assertEqual(self.queue._deadline(free, None) - free.enqueued, 2)
+        self.assertEqual(self.queue._deadline(premium, None) - premium.enqueued, 20)
+        self.assertEqual(self.queue._deadline(premium, 5) - premium.enqueued, 5)
+
+
+class TranslationRateLimiterTests(TestCase):
+    def setUp(self):
+        from authentications.models import CustomUser
+
+        self.user = CustomUser.objects.create_user(email='quota@example.com', password='unused-password')
+        self.clock = FakeClock()
+        self.plan = {'tier': 'free', 'translations_per_minute': 2, 'translations_per_day': 5}
+        for patcher in (
+            mock.patch.object(rate_limits, 'time', self.clock),
+            mock.patch.object(rate_limits, 'get_user_plan', side_effect=lambda user: self.plan),
+            mock.patch.object(rate_limits.TranslationRateLimiter, '_ensure_flusher'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def usage(self):
+        from .models import TranslationQuotaUsage
+
+        return TranslationQuotaUsage.objects.filter(user=self.user).values_list('count', flat=True).first()
+
+    def test_bucket_refills_at_the_per_minute_rate(self):
+        limiter = rate_limits.TranslationRateLimiter()
+        self.assertTrue(limiter.check(self.user).allowed)
+        self.assertTrue(limiter.check(self.user).allowed)
+        refused = limiter.check(self.user)
+        self.assertFalse(refused.allowed)
+        self.assertEqual(refused.retry_after, 30)
+        self.clock.advance(29)
+        self.assertFalse(limiter.check(self.user).allowed)
+        self.clock.advance(1)
+        self.assertTrue(limiter.check(self.user).allowed)
+        # Refused requests used none of the daily quota
+        self.assertEqual(limiter.stats()['unflushed'], 3)
+
+    def test_daily_quota_refuses_without_consuming(self):
+        self.plan['translations_per_minute'] = 0
+        limiter = rate_limits.TranslationRateLimiter()
+        self.assertEqual(limiter.check(self.user, 4).daily_remaining, 1)
+        refused = limiter.check(self.user, 2)
+        self.assertFalse(refused.allowed)
+        self.assertEqual(refused.daily_remaining, 1)
+        self.assertTrue(limiter.check(self.user, 1).allowed)
+
+    def test_flush_writes_usage_and_another_worker_reads_it(self):
+        self.plan['translations_per_minute'] = 0
+        worker = rate_limits.TranslationRateLimiter()
+        worker.check(self.user, 3)
+        self.assertIsNone(self.usage())
+        worker.flush()
+        self.assertEqual(self.usage(), 3)
+        self.assertEqual(worker.stats()['unflushed'], 0)
+        worker.flush()
+        self.assertEqual(self.usage(), 3)
+
+        other = rate_limits.TranslationRateLimiter()
+        self.assertFalse(other.check(self.user, 3).allowed)
+        self.assertTrue(other.check(self.user, 2).allowed)
+        other.flush()
+        self.assertEqual(self.usage(), 5)
+
+        # The first worker only learns about the other's usage on its next flush
+        self.assertTrue(worker.check(self.user, 1).allowed)
+        worker.flush()
+        self.assertEqual(self.usage(), 6)
+        self.assertFalse(worker.check(self.user, 1).allowed)
+
+    def test_failed_flush_keeps_the_usage_for_the_next_one(self):
+        from .models import TranslationQuotaUsage
+
+        self.plan['translations_per_minute'] = 0
+        limiter = rate_limits.TranslationRateLimiter()
+        limiter.check(self.user, 2)
+        with mock.patch.object(TranslationQuotaUsage.objects, 'get_or_create', side_effect=RuntimeError('db down')):
+            limiter.flush()
+        self.assertEqual(limiter.stats()['unflushed'], 2)
+        self.assertEqual(limiter.stats()['flush_errors'], 1)
+        limiter.flush()
+        self.assertEqual(self.usage(), 2)
@@ -0,0 +1,310 @@
+"""
+Caches for translate_with_ai results
+- TranslationCache: in-process LRU+TTL cache (per worker)
+- TranslationStore: persistent TranslationCacheEntry table shared by all workers
+Both are keyed by normalized input text and the glossary version, so editing a
+Translation row invalidates every result built from the old glossary
+"""
+import copy
+import hashlib
+import queue
+import threading
+from collections import Counter
+from typing import Dict, Optional
+from cachetools import TTLCache
+from django.conf import settings
+from .glossary_index import get_glossary_version
+from .normalization import canonical_key
+
+# Results that must be recomputed next time (upstream failed or was skipped)
+UNCACHED_SOURCES = {"error", "glossary_fallback"}
+
+
+class CountingTTLCache(TTLCache):
+    """TTLCache (LRU + time-to-live) that counts evictions and expirations"""
+
+    def __init__(self, maxsize, ttl):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.evictions = 0
+        self.expirations = 0
+
+    def popitem(self):
+        # Only called when the cache is full (least recently used item goes)
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.expirations += len(expired)
+        return expired
+
+
+class TranslationCache:
+    """Thread-safe, bounded cache of translation results"""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = CountingTTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, glossary_version: Optional[str] = None) -> tuple:
+        """Cache key for a text under the given (or current) glossary version"""
+        if glossary_version is None:
+            glossary_version = get_glossary_version()
+        return (canonical_key(text), glossary_version)
+
+    def get(self, text: str, glossary_version: Optional[str] = None) -> Optional[Dict]:
+        """Return a copy of the cached result for text, or None"""
+        key = self.make_key(text, glossary_version)
+        with self._lock:
+            result = self._cache.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.deepcopy(result)
+
+    def set(self, text: str, result: Dict, glossary_version: Optional[str] = None):
+        """Store a result; errors and fallbacks are never cached so the next request retries"""
+        if not result or result.get("source") in UNCACHED_SOURCES or self._cache.maxsize <= 0:
+            return
+        key = self.make_key(text, glossary_version)
+        with self._lock:
+            self._cache[key] = copy.deepcopy(result)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters for monitoring"""
+        with self._lock:
+            self._cache.expire()
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "max_size": self._cache.maxsize,
+                "ttl_seconds": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._cache.evictions,
+                "expirations": self._cache.expirations,
+            }
+
+
+_translation_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_translation_cache() -> TranslationCache:
+    """Process-wide translation cache, sized from settings on first use"""
+    global _translation_cache
+    if _translation_cache is None:
+        with _cache_lock:
+            if _translation_cache is None:
+                _translation_cache = TranslationCache(
+                    maxsize=getattr(settings, 'TRANSLATION_CACHE_SIZE', 1000),
+                    ttl=getattr(settings, 'TRANSLATION_CACHE_TTL', 3600),
+                )
+    return _translation_cache
+
+
+class TranslationStore:
+    """Database-backed translation results shared across workers and deploys.
+
+    Reads go straight to the TranslationCacheEntry table (read-through).
+    Writes and hit counters are queued and flushed by a background thread
+    (write-behind) so the request never waits on an INSERT.
+    """
+
+    def __init__(self, write_behind: bool = True):
+        self.write_behind = write_behind
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(text: str, direction: str, glossary_version: str) -> str:
+        """sha256 of canonical text, direction and glossary version"""
+        raw = f"{canonical_key(text)}\x1f{direction}\x1f{glossary_version}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, text: str, direction: str, glossary_version: str) -> Optional[Dict]:
+        """Return the stored result for text, or None"""
+        from .models import TranslationCacheEntry
+
+        key = self.make_key(text, direction, glossary_version)
+        try:
+            result = TranslationCacheEntry.objects.filter(cache_key=key).values_list('result', flat=True).first()
+        except Exception as e:
+            print(f"[DEBUG] Translation store read failed: {e}")
+            self.errors += 1
+            return None
+
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._submit(('hit', key, None))
+        return result
+
+    async def aget(self, text: str, direction: str, glossary_version: str) -> Optional[Dict]:
+        """Async variant of get (async ORM)"""
+        from .models import TranslationCacheEntry
+
+        key = self.make_key(text, direction, glossary_version)
+        try:
+            result = await TranslationCacheEntry.objects.filter(cache_key=key).values_list('result', flat=True).afirst()
+        except Exception as e:
+            print(f"[DEBUG] Translation store read failed: {e}")
+            self.errors += 1
+            return None
+
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.write_behind:
+            self._submit(('hit', key, None))
+        return result
+
+    def put(self, text: str, direction: str, glossary_version: str, result: Dict, sync: bool = False):
+        """Persist a result (errors and fallbacks are skipped); sync=True writes before returning"""
+        if not result or result.get("source") in UNCACHED_SOURCES:
+            return
+        key = self.make_key(text, direction, glossary_version)
+        fields = {
+            "source_text": text,
+            "direction": direction,
+            "glossary_version": glossary_version,
+            "result": result,
+        }
+        self._submit(('put', key, fields), sync)
+
+    def _submit(self, item, sync: bool = False):
+        if sync or not self.write_behind:
+            self._flush([item])
+            return
+        self._ensure_writer()
+        self._queue.put(item)
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run_writer, name='translation-store-writer', daemon=True)
+                self._writer.start()
+
+    def _run_writer(self):
+        """Background loop: drain the queue in batches and write them"""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 200:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        from django.db import connection
+        from django.db.models import F
+        from django.utils import timezone
+        from .models import TranslationCacheEntry
+
+        puts = {}
+        hits = Counter()
+        for kind, key, fields in batch:
+            if kind == 'put':
+                puts[key] = fields
+            else:
+                hits[key] += 1
+
+        try:
+            if puts:
+                TranslationCacheEntry.objects.bulk_create(
+                    [TranslationCacheEntry(cache_key=key, **fields) for key, fields in puts.items()],
+                    update_conflicts=True,
+                    unique_fields=['cache_key'],
+                    update_fields=['result', 'source_text'],
+                )
+                self.writes += len(puts)
+            now = timezone.now()
+            for key, count in hits.items():
+                TranslationCacheEntry.objects.filter(cache_key=key).update(
+                    hit_count=F('hit_count') + count,
+                    last_used_date=now
+                )
+        except Exception as e:
+            print(f"[DEBUG] Translation store write failed: {e}")
+            self.errors += 1
+        finally:
+            if threading.current_thread() is self._writer:
+                # Writer thread owns its own connection, don't leave it dangling
+                connection.close()
+
+    def warm(self, cache: TranslationCache, glossary_version: str, limit: int) -> int:
+        """Load the most recently used results for the current glossary into the in-process cache"""
+        from .models import TranslationCacheEntry
+
+        entries = TranslationCacheEntry.objects.filter(
+            glossary_version=glossary_version
+        ).order_by('-last_used_date').values('source_text', 'result')[:limit]
+
+        loaded = 0
+        for entry in entries:
+            cache.set(entry['source_text'], entry['result'], glossary_version)
+            loaded += 1
+        return loaded
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "pending_writes": self._queue.qsize(),
+            "errors": self.errors,
+            "write_behind": self.write_behind,
+        }
+
+
+_translation_store = None
+
+
+def get_translation_store() -> Optional[TranslationStore]:
+    """Process-wide persistent store, or None when TRANSLATION_STORE_ENABLED is off"""
+    global _translation_store
+    if not getattr(settings, 'TRANSLATION_STORE_ENABLED', True):
+        return None
+    if _translation_store is None:
+        with _cache_lock:
+            if _translation_store is None:
+                _translation_store = TranslationStore(
+                    write_behind=getattr(settings, 'TRANSLATION_STORE_WRITE_BEHIND', True)
+                )
+    return _translation_store
+
+
+def warm_translation_cache() -> int:
+    """Fill the in-process cache from the persistent store (used on worker startup)"""
+    store = get_translation_store()
+    if store is None:
+        return 0
+    loaded = store.warm(
+        get_translation_cache(),
+        get_glossary_version(),
+        getattr(settings, 'TRANSLATION_STORE_WARM_LIMIT', 500)
+    )
+    print(f"[DEBUG] Warmed translation cache with {loaded} stored result(s)")
+    return loaded
@@ -0,0 +1,129 @@
+"""
+Background worker for TranslationJob rows
+Jobs are queued in the database and run on a small in-process thread pool,
+so request workers return right away instead of waiting on Gemini.
+The run_translation_jobs command picks up anything left queued (e.g. after a restart).
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_job_executor() -> ThreadPoolExecutor:
+    """Process-wide job thread pool, sized by TRANSLATION_JOB_WORKERS"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'TRANSLATION_JOB_WORKERS', 2),
+                    thread_name_prefix='translation-job'
+                )
+    return _executor
+
+
+def enqueue_translation_job(job_id: int):
+    """Run the job in the background once the creating transaction commits"""
+    transaction.on_commit(lambda: get_job_executor().submit(run_job_in_thread, job_id))
+
+
+def run_job_in_thread(job_id: int):
+    """Thread pool entry point: the thread manages its own DB connection"""
+    close_old_connections()
+    try:
+        run_translation_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def enqueue_review_notification(user, text: str, history_id: int):
+    """Send the admin review notification (a OneSignal HTTP call) from the job pool, off the request path"""
+    get_job_executor().submit(notify_in_thread, user, text, history_id)
+
+
+def notify_in_thread(user, text: str, history_id: int):
+    """Thread pool entry point: the thread manages its own DB connection"""
+    from .views import notify_translation_review
+
+    close_old_connections()
+    try:
+        notify_translation_review(user, text, history_id)
+    except Exception as e:
+        print(f"[DEBUG] Review notification for history {history_id} failed: {e}")
+    finally:
+        close_old_connections()
+
+
+def claim_job(job_id: int) -> bool:
+    """Atomically move a queued job to running (only one worker wins)"""
+    from .models import TranslationJob
+
+    return TranslationJob.objects.filter(id=job_id, status='queued').update(
+        status='running',
+        started_date=timezone.now()
+    ) == 1
+
+
+def run_translation_job(job_id: int) -> bool:
+    """
+    Translate one queued job and save its history row and result.
+
+    Args:
+        job_id: TranslationJob ID
+
+    Returns:
+        True if this call ran the job, False if someone else already claimed it
+    """
+    from .models import TranslationJob, UserTranslationHistory
+    from .ai_service import translate_with_ai
+    from .subscription_tiers import get_user_tier
+    from .views import (
+        notify_translation_review, resolve_translation_category,
+        translation_history_fields, translation_response_data
+    )
+
+    if not claim_job(job_id):
+        return False
+
+    job = TranslationJob.objects.select_related('user').get(id=job_id)
+    try:
+        result = translate_with_ai(job.source_text, tier=get_user_tier(job.user))
+
+        category_obj = resolve_translation_category(result, job.category)
+        if category_obj is None:
+            job.status = 'failed'
+            job.error = f"Category '{job.category}' not found. Use GET /api/core/categories/ to see available categories."
+        else:
+            history = UserTranslationHistory.objects.create(
+                **translation_history_fields(job.user, job.source_text, result, category_obj)
+            )
+            if result.get('admin_review_needed', True):
+                notify_translation_review(job.user, job.source_text, history.id)
+            job.history = history
+            job.result = translation_response_data(result, category_obj, history.id)
+            job.status = 'done'
+    except Exception as e:
+        print(f"[DEBUG] Translation job {job_id} failed: {e}")
+        job.status = 'failed'
+        job.error = str(e)
+
+    job.finished_date = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'history', 'finished_date'])
+    return True
+
+
+def requeue_stale_jobs(minutes: int) -> int:
+    """Put jobs stuck in 'running' (worker died mid-job) back in the queue"""
+    from .models import TranslationJob
+
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return TranslationJob.objects.filter(status='running', started_date__lt=cutoff).update(
+        status='queued',
+        started_date=None
+    )
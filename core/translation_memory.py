@@ -0,0 +1,297 @@
+"""
+Translation memory for the translation pipeline
+Reuses sentences an admin has already reviewed (UserTranslationHistory rows
+with status 'updated' and a review date) when a new input is nearly identical
+to one of them. Automatic results are never part of it, so unreviewed machine
+output can't reinforce itself.
+"""
+import asyncio
+import math
+import threading
+import time
+import weakref
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from .normalization import canonical_key, tokenize
+
+
+class TranslationMemory:
+    """Word-level candidate index over reviewed sentences.
+
+    A sentence can only reach a high similarity if it shares some of the
+    query's rarest words, so only the posting lists of those words are read
+    (prefix filtering). Frequent words like "i" or "a" never get scanned,
+    which keeps lookups fast as the history grows.
+    """
+
+    def __init__(self, entries: List[Dict], version: str):
+        self.version = version
+        self.keys = []
+        self.tokens = []
+        self.entries = []
+        self.by_key = {}
+        self.ids = set()
+        self.postings = defaultdict(list)
+        self._lock = threading.Lock()
+
+        # Entries arrive oldest first so a later review of the same sentence wins
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self):
+        return len(self.by_key)
+
+    def add(self, entry: Dict):
+        """Index one reviewed sentence (replaces an earlier one with the same text)"""
+        key = canonical_key(entry['source_text'])
+        if not key or not entry.get('known_translation'):
+            return
+
+        with self._lock:
+            self.ids.add(entry['id'])
+            previous = self.by_key.get(key)
+            if previous is not None:
+                # Same sentence reviewed again: the newer translation wins
+                self.entries[previous] = entry
+                return
+
+            doc_id = len(self.keys)
+            tokens = set(tokenize(key))
+            self.keys.append(key)
+            self.tokens.append(tokens)
+            self.entries.append(entry)
+            self.by_key[key] = doc_id
+            for token in tokens:
+                self.postings[token].append(doc_id)
+
+    def lookup(self, text: str, threshold: float, max_candidates: int = 200) -> Optional[Dict]:
+        """Find the most similar reviewed sentence.
+
+        Args:
+            text: Raw input text
+            threshold: Minimum similarity (0-1) on normalized text
+            max_candidates: Candidates scored with SequenceMatcher
+
+        Returns:
+            Dict with the history entry and similarity, or None
+        """
+        key = canonical_key(text)
+        if not key:
+            return None
+
+        doc_id = self.by_key.get(key)
+        if doc_id is not None:
+            return {"entry": self.entries[doc_id], "similarity": 1.0, "exact": True}
+
+        query_tokens = set(tokenize(key))
+        if not query_tokens:
+            return None
+
+        # Probe only the rarest query words; a sentence sharing none of them
+        # differs in too many words to reach the threshold. Words that no
+        # sentence contains (typos, new words) can't be probed, and at least
+        # one changed word is always allowed because a single typo barely
+        # moves the character similarity.
+        known = [token for token in query_tokens if token in self.postings]
+        rare_first = sorted(known, key=lambda token: len(self.postings[token]))
+        differing = max(len(known) - math.ceil(threshold * len(known)), 1)
+        candidates = set()
+        for token in rare_first[:differing + 1]:
+            candidates.update(self.postings[token])
+
+        min_len = len(key) * threshold / (2 - threshold)
+        max_len = len(key) * (2 - threshold) / threshold
+        scored = []
+        for candidate in candidates:
+            if min_len <= len(self.keys[candidate]) <= max_len:
+                tokens = self.tokens[candidate]
+                overlap = 2 * len(query_tokens & tokens) / (len(query_tokens) + len(tokens))
+                scored.append((overlap, candidate))
+        scored.sort(reverse=True)
+
+        best = None
+        for _, candidate in scored[:max_candidates]:
+            similarity = SequenceMatcher(None, key, self.keys[candidate]).ratio()
+            if similarity >= threshold and (best is None or similarity > best[0]):
+                best = (similarity, candidate)
+
+        if best is None:
+            return None
+        similarity, candidate = best
+        entry = self.entries[candidate]
+        return {"entry": entry, "similarity": round(similarity, 2)}
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self),
+            "distinct_words": len(self.postings),
+            "version": self.version,
+        }
+
+
+_memory = None
+_dirty = True
+_checked_at = 0.0
+_lock = threading.Lock()
+_async_locks = weakref.WeakKeyDictionary()
+
+
+def _format_stamp(stats: Dict) -> str:
+    latest = stats['latest'].timestamp() if stats['latest'] else 0
+    return f"{stats['count']}-{latest:.6f}"
+
+
+def _reviewed_rows():
+    from .models import UserTranslationHistory
+
+    return UserTranslationHistory.objects.filter(status='updated', reviewed_date__isnull=False).order_by()
+
+
+def _memory_stamp() -> str:
+    """Cheap fingerprint of the reviewed rows in UserTranslationHistory"""
+    return _format_stamp(_reviewed_rows().aggregate(count=Count('id'), latest=Max('updated_date')))
+
+
+def _memory_rows():
+    """Most recent reviewed sentences (up to TRANSLATION_MEMORY_MAX_ENTRIES)"""
+    limit = getattr(settings, 'TRANSLATION_MEMORY_MAX_ENTRIES', 200000)
+    return _reviewed_rows().exclude(
+        known_translation__isnull=True
+    ).exclude(known_translation='').order_by('-updated_date', '-id').values(
+        'id', 'source_text', 'known_translation', 'category', 'notes'
+    )[:limit]
+
+
+def build_translation_memory(version: str = '') -> TranslationMemory:
+    """Load the most recent reviewed sentences (oldest first, so newer reviews win)"""
+    rows = list(_memory_rows())
+    rows.reverse()
+    return TranslationMemory(rows, version or _memory_stamp())
+
+
+def get_translation_memory() -> TranslationMemory:
+    """Return the current translation memory, rebuilding it when stale.
+
+    Local reviews are added incrementally (see the signal handlers in
+    core.models); reviews made by other workers are picked up by comparing
+    a fingerprint at most once every GLOSSARY_INDEX_REFRESH_SECONDS.
+    """
+    global _memory, _dirty, _checked_at
+
+    interval = getattr(settings, 'GLOSSARY_INDEX_REFRESH_SECONDS', 30)
+    memory = _memory
+    if memory is not None and not _dirty and time.monotonic() - _checked_at < interval:
+        return memory
+
+    with _lock:
+        if _memory is None or _dirty or time.monotonic() - _checked_at >= interval:
+            was_dirty = _dirty
+            _dirty = False
+            try:
+                stamp = _memory_stamp()
+                if _memory is None or was_dirty or stamp != _memory.version:
+                    _memory = build_translation_memory(stamp)
+                    print(f"[DEBUG] Translation memory rebuilt: {len(_memory)} sentences (version {stamp})")
+            except Exception:
+                _dirty = _dirty or was_dirty
+                raise
+            _checked_at = time.monotonic()
+        return _memory
+
+
+async def aget_translation_memory() -> TranslationMemory:
+    """Async variant of get_translation_memory.
+
+    The freshness check and any rebuild run in a worker thread through
+    get_translation_memory (sharing its lock with sync callers), and only one
+    coroutine per event loop waits on that thread while the others wait on
+    an asyncio lock and then reuse its result.
+    """
+    memory = _memory
+    if _fresh(memory):
+        return memory
+
+    async with _async_lock():
+        memory = _memory
+        if _fresh(memory):
+            return memory
+        return await sync_to_async(_get_translation_memory_in_thread, thread_sensitive=False)()
+
+
+def _fresh(memory: Optional[TranslationMemory]) -> bool:
+    interval = getattr(settings, 'GLOSSARY_INDEX_REFRESH_SECONDS', 30)
+    return memory is not None and not _dirty and time.monotonic() - _checked_at < interval
+
+
+def _async_lock() -> asyncio.Lock:
+    """Rebuild lock of the running event loop (an asyncio.Lock can't be shared between loops)"""
+    loop = asyncio.get_running_loop()
+    lock = _async_locks.get(loop)
+    if lock is None:
+        lock = _async_locks[loop] = asyncio.Lock()
+    return lock
+
+
+def _get_translation_memory_in_thread() -> TranslationMemory:
+    """Worker thread entry point: the thread closes its own DB connection"""
+    from django.db import connection
+
+    try:
+        return get_translation_memory()
+    finally:
+        connection.close()
+
+
+def remember_translation(entry: Dict):
+    """Add a freshly reviewed sentence without rebuilding the whole memory"""
+    global _checked_at
+
+    memory = _memory
+    if memory is None or _dirty:
+        return
+    with _lock:
+        memory.add(entry)
+        # Our own change is already applied, only a foreign change needs a rebuild
+        memory.version = _memory_stamp()
+        _checked_at = time.monotonic()
+
+
+def forget_translation(history_id: int):
+    """Drop the memory when a remembered sentence is deleted or un-reviewed"""
+    memory = _memory
+    if memory is not None and history_id in memory.ids:
+        invalidate_translation_memory()
+
+
+def invalidate_translation_memory():
+    """Mark the memory stale so the next lookup rebuilds it"""
+    global _dirty
+    _dirty = True
+
+
+def lookup_translation_memory(text: str, threshold: Optional[float] = None) -> Optional[Dict]:
+    """Most similar reviewed sentence at or above the hint threshold.
+
+    Args:
+        text: Raw input text
+        threshold: Minimum similarity (defaults to TRANSLATION_MEMORY_HINT_THRESHOLD)
+
+    Returns:
+        {"entry": {...}, "similarity": float} or None
+    """
+    if threshold is None:
+        threshold = getattr(settings, 'TRANSLATION_MEMORY_HINT_THRESHOLD', 0.8)
+    try:
+        memory = get_translation_memory()
+    except Exception as e:
+        print(f"[DEBUG] Translation memory unavailable: {e}")
+        return None
+    return memory.lookup(
+        text,
+        threshold,
+        getattr(settings, 'TRANSLATION_MEMORY_MAX_CANDIDATES', 200)
+    )
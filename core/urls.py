@@ -1,9 +1,14 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     # AI-Powered Translation (Primary endpoint for all translations) - Requires Auth
     path('translation/', views.ai_translate, name='ai_translate'),
+    path('translation/batch/', views.ai_translate_batch, name='ai_translate_batch'),
+    path('translation/stream/', views.ai_translate_stream, name='ai_translate_stream'),
+    path('translation/jobs/', views.create_translation_job, name='create_translation_job'),
+    path('translation/jobs/<int:job_id>/', views.get_translation_job, name='translation_job'),
+    path('translation/async/', async_views.ai_translate_async, name='ai_translate_async'),  # Async view, serve with ASGI
     
     # User Recent Translations - Requires Auth
     path('recent-translations/', views.get_user_recent_translations, name='user_recent_translations'),
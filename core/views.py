@@ -1,8 +1,9 @@
-from rest_framework.decorators import api_view, permission_classes
+import json
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q
 from .models import Translation, UserTranslationHistory
 from .serializers import (
     TranslationSerializer, 
@@ -10,6 +11,7 @@ from .serializers import (
     RecentTranslationSerializer
 )
 from .ai_service import translate_with_ai
+from .subscription_tiers import get_user_tier
 
 
 def success_response(message, data=None, code=200):
@@ -30,6 +32,21 @@ def error_response(message, errors=None, code=400):
     }, status=code)
 
 
+class EventStreamRenderer(BaseRenderer):
+    """Lets clients send Accept: text/event-stream (errors are still JSON encoded)"""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode('utf-8')
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 # ==================== TRANSLATION DETAIL WITH AI CONTEXT ====================
 
 @api_view(['GET'])
@@ -170,11 +187,17 @@ def get_search_suggestions(request):
     Get search suggestions based on user input
     GET /api/core/suggestions/?q=bo
     GET /api/core/suggestions/?q=f&limit=5
+    GET /api/core/suggestions/?q=kom&lang=marshallese
     
-    Returns up to 5 matching translations from database
+    Returns up to 5 (at most AUTOCOMPLETE_MAX_RESULTS) translations whose English
+    or Marshallese text starts with q, most used first. lang restricts the
+    match to one language. Answered from the in-memory autocomplete index.
     """
+    from .autocomplete import suggest
+    
     query = request.query_params.get('q', '').strip()
     limit = int(request.query_params.get('limit', 5))
+    language = request.query_params.get('lang')
     
     if not query:
         return error_response(
@@ -183,21 +206,19 @@ def get_search_suggestions(request):
             code=400
         )
     
-    # Search only English text (case-insensitive, starts with)
-    suggestions = Translation.objects.filter(
-        Q(english_text__istartswith=query)
-    ).select_related('category').order_by('english_text')[:limit]
+    # Prefix match ignoring case, diacritics and spelling variants
+    suggestions = suggest(query, limit, language)
     
     # Format suggestions
     suggestion_data = [
         {
-            "id": trans.id,
-            "english": trans.english_text,
-            "marshallese": trans.marshallese_text,
-            "category": trans.category.id if trans.category else None,
-            "category_display": trans.category.name if trans.category else None
+            "id": entry["id"],
+            "english": entry["english"],
+            "marshallese": entry["marshallese"],
+            "category": entry["category"],
+            "category_display": entry["category_display"]
         }
-        for trans in suggestions
+        for entry in suggestions
     ]
     
     return success_response(
@@ -269,10 +290,277 @@ def ai_translate(request):
             code=400
         )
     
-    # Call AI service
-    result = translate_with_ai(text)
+    # Rate limit and daily quota, before any search or LLM work
+    quota = check_translation_quota(request.user)
+    if quota and not quota.allowed:
+        return quota_exceeded_response(quota)
+    
+    # Call AI service (the subscription tier sets the LLM queue priority)
+    result = translate_with_ai(text, tier=get_user_tier(request.user))
     
     # Get category - prefer AI detected category, then user-provided, then General
+    category_obj = resolve_translation_category(result, category)
+    if category_obj is None:
+        return invalid_category_response(category)
+    
+    # Save ALL translations to UserTranslationHistory (for recent translations)
+    history = UserTranslationHistory.objects.create(**translation_history_fields(request.user, text, result, category_obj))
+    history_id = history.id
+    
+    # Only notify admins if translation requires review (admin_review=true)
+    if result.get('admin_review_needed', True):
+        notify_translation_review(request.user, text, history_id)
+    
+    return with_quota_headers(success_response(
+        message="Translation completed successfully",
+        data=translation_response_data(result, category_obj, history_id)
+    ), quota)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def ai_translate_batch(request):
+    """
+    Translate many short texts at once (e.g. intake forms)
+    POST /api/core/translation/batch/
+    {
+        "texts": ["I have a headache", "Where does it hurt?"],
+        "category": "symptoms"  // optional: same as POST /api/core/translation/
+    }
+    
+    Glossary hits are resolved per item, the rest go to Gemini in a single call.
+    Requires authentication
+    Returns one translation per text, in the same order
+    """
+    from .ai_service import translate_batch
+    from django.conf import settings
+    
+    texts = request.data.get('texts')
+    category = str(request.data.get('category', '') or '').strip()
+    max_items = getattr(settings, 'TRANSLATION_BATCH_MAX_ITEMS', 50)
+    
+    if not isinstance(texts, list) or not texts:
+        return error_response(
+            message="Texts are required",
+            errors={"texts": ["Provide a non-empty list of texts"]},
+            code=400
+        )
+    if len(texts) > max_items:
+        return error_response(
+            message="Too many texts",
+            errors={"texts": [f"A batch can contain at most {max_items} texts"]},
+            code=400
+        )
+    texts = [str(text or '').strip() for text in texts]
+    empty = [position for position, text in enumerate(texts) if not text]
+    if empty:
+        return error_response(
+            message="Text is required",
+            errors={"texts": [f"Item {position} is empty" for position in empty]},
+            code=400
+        )
+    
+    # Every text counts against the daily quota
+    quota = check_translation_quota(request.user, translations=len(texts))
+    if quota and not quota.allowed:
+        return quota_exceeded_response(quota)
+    
+    results = translate_batch(texts, tier=get_user_tier(request.user))
+    
+    # Resolve categories first so an invalid category fails before anything is saved
+    categories = []
+    for result in results:
+        category_obj = resolve_translation_category(result, category)
+        if category_obj is None:
+            return invalid_category_response(category)
+        categories.append(category_obj)
+    
+    # One INSERT for the whole batch
+    histories = UserTranslationHistory.objects.bulk_create([
+        UserTranslationHistory(**translation_history_fields(request.user, text, result, category_obj))
+        for text, result, category_obj in zip(texts, results, categories)
+    ])
+    
+    review_needed = [
+        history for history, result in zip(histories, results)
+        if result.get('admin_review_needed', True)
+    ]
+    if review_needed:
+        from .notification_service import notify_admins
+        notify_admins(
+            title="New Translations Need Review",
+            message=f"{len(review_needed)} translation(s) from a batch require admin review.",
+            data={
+                "type": "translation_review_needed",
+                "history_ids": [history.id for history in review_needed],
+                "user_email": request.user.email
+            }
+        )
+    
+    return with_quota_headers(success_response(
+        message="Batch translation completed successfully",
+        data={
+            "count": len(results),
+            "results": [
+                translation_response_data(result, category_obj, history.id)
+                for result, category_obj, history in zip(results, categories, histories)
+            ]
+        }
+    ), quota)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def ai_translate_stream(request):
+    """
+    Streaming AI translation (Server-Sent Events)
+    POST /api/core/translation/stream/
+    {
+        "text": "I have a headache",
+        "category": "symptoms"  // optional: same as POST /api/core/translation/
+    }
+    
+    Events:
+    - draft: glossary-resolved draft right after the database lookup
+    - translation: {"delta": "..."} pieces of the LLM translation as they arrive
+    - result: final payload, same data as POST /api/core/translation/ (with history_id)
+    - error: {"message": ..., "errors": ...}
+    
+    Requires authentication
+    """
+    from django.http import StreamingHttpResponse
+    from .ai_service import translate_with_ai_stream
+    
+    text = request.data.get('text', '').strip()
+    category = request.data.get('category', '').strip()  # Can be ID or name
+    user = request.user
+    
+    if not text:
+        return error_response(
+            message="Text is required",
+            errors={"text": ["This field is required"]},
+            code=400
+        )
+    quota = check_translation_quota(user)
+    if quota and not quota.allowed:
+        return quota_exceeded_response(quota)
+    tier = get_user_tier(user)
+    
+    def events():
+        for event, data in translate_with_ai_stream(text, tier=tier):
+            if event != "final":
+                yield sse_event(event, data)
+                continue
+            
+            category_obj = resolve_translation_category(data, category)
+            if category_obj is None:
+                yield sse_event("error", {
+                    "message": "Invalid category",
+                    "errors": {"category": [f"Category '{category}' not found. Use GET /api/core/categories/ to see available categories."]}
+                })
+                return
+            
+            history = UserTranslationHistory.objects.create(**translation_history_fields(user, text, data, category_obj))
+            if data.get('admin_review_needed', True):
+                notify_translation_review(user, text, history.id)
+            yield sse_event("result", translation_response_data(data, category_obj, history.id))
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return with_quota_headers(response, quota)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_translation_job(request):
+    """
+    Queue a translation to run in the background
+    POST /api/core/translation/jobs/
+    {
+        "text": "I have a headache",
+        "category": "symptoms"  // optional: same as POST /api/core/translation/
+    }
+    
+    Requires authentication
+    Returns the job id right away (202); poll GET /api/core/translation/jobs/<id>/ for the result
+    """
+    from .models import TranslationJob
+    from .translation_jobs import enqueue_translation_job
+    
+    text = request.data.get('text', '').strip()
+    category = str(request.data.get('category', '') or '').strip()
+    
+    if not text:
+        return error_response(
+            message="Text is required",
+            errors={"text": ["This field is required"]},
+            code=400
+        )
+    
+    quota = check_translation_quota(request.user)
+    if quota and not quota.allowed:
+        return quota_exceeded_response(quota)
+    
+    job = TranslationJob.objects.create(user=request.user, source_text=text, category=category)
+    enqueue_translation_job(job.id)
+    
+    return with_quota_headers(success_response(
+        message="Translation job queued",
+        data=translation_job_data(job),
+        code=202
+    ), quota)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_translation_job(request, job_id):
+    """
+    Get the status of a translation job (and its result once done)
+    GET /api/core/translation/jobs/<job_id>/
+    
+    Status: queued, running, done, failed
+    Requires authentication (users only see their own jobs)
+    """
+    from .models import TranslationJob
+    
+    try:
+        job = TranslationJob.objects.get(id=job_id, user=request.user)
+    except TranslationJob.DoesNotExist:
+        return error_response(
+            message="Translation job not found",
+            code=404
+        )
+    
+    return success_response(
+        message="Translation job retrieved successfully",
+        data=translation_job_data(job)
+    )
+
+
+def translation_job_data(job):
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'source_text': job.source_text,
+        'result': job.result,
+        'error': job.error,
+        'created_date': job.created_date,
+        'started_date': job.started_date,
+        'finished_date': job.finished_date
+    }
+
+
+def resolve_translation_category(result, category):
+    """
+    Category for a translation: AI detected category, then the user-provided
+    one (ID or case-insensitive name), then General.
+    
+    Returns:
+        Category object, or None when the user-provided category doesn't exist
+    """
     from .models import Category
     category_obj = None
     
@@ -294,50 +582,90 @@ def ai_translate(request):
             # Not an ID, search by name (case-insensitive)
             category_obj = Category.objects.filter(name__iexact=category).first()
         
-        # If still not found, return error for invalid category
+        # If still not found, the caller reports the invalid category
         if not category_obj:
-            return error_response(
-                message="Invalid category",
-                errors={"category": [f"Category '{category}' not found. Use GET /api/core/categories/ to see available categories."]},
-                code=400
-            )
+            return None
     
     # Fallback to General
     if not category_obj:
         category_obj, _ = Category.objects.get_or_create(name='General')
-    
-    # Determine status based on admin_review_needed
-    admin_review_needed = result.get('admin_review_needed', True)
-    
-    # Save ALL translations to UserTranslationHistory (for recent translations)
-    # Status: 'pending' if needs admin review, 'updated' if exact match (no review needed)
-    translation_status = 'pending' if admin_review_needed else 'updated'
-    history = UserTranslationHistory.objects.create(
-        user=request.user,
-        source_text=text,
-        known_translation=result.get('translation', ''),
-        category=category_obj,
-        notes=result.get('notes', ''),
-        status=translation_status
+    return category_obj
+
+
+def invalid_category_response(category):
+    return error_response(
+        message="Invalid category",
+        errors={"category": [f"Category '{category}' not found. Use GET /api/core/categories/ to see available categories."]},
+        code=400
     )
-    history_id = history.id
+
+
+def check_translation_quota(user, translations=1):
+    """
+    Take one request from the user's rate limit and `translations` from their daily quota.
     
-    # Only notify admins if translation requires review (admin_review=true)
-    if admin_review_needed:
-        from .notification_service import notify_admins
-        notify_admins(
-            title="New Translation Needs Review",
-            message=f"'{text[:50]}...' requires admin review.",
-            data={
-                "type": "translation_review_needed",
-                "history_id": history_id,
-                "source_text": text[:100],
-                "user_email": request.user.email
-            }
-        )
+    In-memory check (core.rate_limits), no database round trip on the hot path.
+    
+    Returns:
+        QuotaDecision, or None when TRANSLATION_RATE_LIMIT_ENABLED is off
+    """
+    from django.conf import settings
+    from .rate_limits import get_rate_limiter
     
-    # Build clean response data
-    response_data = {
+    if not getattr(settings, 'TRANSLATION_RATE_LIMIT_ENABLED', True):
+        return None
+    return get_rate_limiter().check(user, translations)
+
+
+def quota_exceeded_response(quota):
+    """429 with Retry-After and the remaining-quota headers"""
+    return with_quota_headers(error_response(
+        message=quota.reason,
+        errors={"quota": [quota.reason]},
+        code=429
+    ), quota)
+
+
+def with_quota_headers(response, quota):
+    """Add X-RateLimit-* / X-Daily-Quota-* headers (no-op when rate limiting is off)"""
+    if quota is not None:
+        for header, value in quota.headers().items():
+            response[header] = value
+    return response
+
+
+def notify_translation_review(user, text, history_id):
+    """Tell admins a translation needs review"""
+    from .notification_service import notify_admins
+    notify_admins(
+        title="New Translation Needs Review",
+        message=f"'{text[:50]}...' requires admin review.",
+        data={
+            "type": "translation_review_needed",
+            "history_id": history_id,
+            "source_text": text[:100],
+            "user_email": user.email
+        }
+    )
+
+
+def translation_history_fields(user, text, result, category_obj):
+    """UserTranslationHistory fields for a translation result"""
+    # Status: 'pending' if needs admin review, 'automatic' otherwise ('updated' is set by an admin review)
+    admin_review_needed = result.get('admin_review_needed', True)
+    return {
+        "user": user,
+        "source_text": text,
+        "known_translation": result.get('translation', ''),
+        "category": category_obj,
+        "notes": result.get('notes', ''),
+        "status": 'pending' if admin_review_needed else 'automatic'
+    }
+
+
+def translation_response_data(result, category_obj, history_id):
+    """Clean response data for a translation result"""
+    return {
         'translation': result.get('translation', ''),
         'source': result.get('source', 'unknown'),
         'confidence': result.get('confidence', 'medium'),
@@ -346,16 +674,11 @@ def ai_translate(request):
         'target_language': result.get('target_language', 'marshallese'),
         'category': category_obj.id,
         'category_name': category_obj.name,
-        'admin_review_needed': admin_review_needed,
+        'admin_review_needed': result.get('admin_review_needed', True),
         'details': result.get('details', {}),
         'notes': result.get('notes', ''),
         'history_id': history_id
     }
-    
-    return success_response(
-        message="Translation completed successfully",
-        data=response_data
-    )
 
 
 
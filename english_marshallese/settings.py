@@ -163,6 +163,109 @@ APPLE_APP_ID = os.getenv('APPLE_APP_ID', '')  # Your app's bundle ID (e.g., com.
 
 # Gemini AI Configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+# LLM backend: 'gemini' or 'fake' (deterministic offline stand-in for load tests and benchmarks)
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'gemini')
+LLM_MODEL_NAME = os.getenv('LLM_MODEL_NAME', 'gemini-flash-latest')
+FAKE_LLM_LATENCY = float(os.getenv('FAKE_LLM_LATENCY', 0.0))
+FAKE_LLM_JITTER = float(os.getenv('FAKE_LLM_JITTER', 0.0))
+FAKE_LLM_ERROR_RATE = float(os.getenv('FAKE_LLM_ERROR_RATE', 0.0))
+FAKE_LLM_SEED = int(os.getenv('FAKE_LLM_SEED', 0))
+
+# Translation pipeline tuning
+# How often (seconds) each worker checks whether another process changed the glossary
+GLOSSARY_INDEX_REFRESH_SECONDS = int(os.getenv('GLOSSARY_INDEX_REFRESH_SECONDS', 30))
+# Upper bound on the limit parameter of GET /api/core/suggestions/
+AUTOCOMPLETE_MAX_RESULTS = int(os.getenv('AUTOCOMPLETE_MAX_RESULTS', 20))
+# Max glossary strings scored with SequenceMatcher per fuzzy keyword
+FUZZY_MAX_CANDIDATES = int(os.getenv('FUZZY_MAX_CANDIDATES', 100))
+# Skip Gemini when the glossary has exact matches: 'always' (every segment matched),
+# 'single_phrase' (whole input is one glossary entry) or 'never'
+GLOSSARY_FAST_PATH = os.getenv('GLOSSARY_FAST_PATH', 'single_phrase')
+# In-process LRU+TTL cache of translation results (0 disables it)
+TRANSLATION_CACHE_SIZE = int(os.getenv('TRANSLATION_CACHE_SIZE', 1000))
+TRANSLATION_CACHE_TTL = int(os.getenv('TRANSLATION_CACHE_TTL', 3600))
+# Persistent translation store shared by all workers (TranslationCacheEntry table)
+TRANSLATION_STORE_ENABLED = os.getenv('TRANSLATION_STORE_ENABLED', 'True') == 'True'
+TRANSLATION_STORE_WRITE_BEHIND = os.getenv('TRANSLATION_STORE_WRITE_BEHIND', 'True') == 'True'
+TRANSLATION_STORE_WARM_ON_STARTUP = os.getenv('TRANSLATION_STORE_WARM_ON_STARTUP', 'False') == 'True'
+TRANSLATION_STORE_WARM_LIMIT = int(os.getenv('TRANSLATION_STORE_WARM_LIMIT', 500))
+# Translation memory of admin-reviewed sentences: reuse as-is above REUSE, hint the LLM above HINT
+TRANSLATION_MEMORY_REUSE_THRESHOLD = float(os.getenv('TRANSLATION_MEMORY_REUSE_THRESHOLD', 0.95))
+TRANSLATION_MEMORY_HINT_THRESHOLD = float(os.getenv('TRANSLATION_MEMORY_HINT_THRESHOLD', 0.8))
+TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv('TRANSLATION_MEMORY_MAX_ENTRIES', 200000))
+TRANSLATION_MEMORY_MAX_CANDIDATES = int(os.getenv('TRANSLATION_MEMORY_MAX_CANDIDATES', 200))
+# Coalesce concurrent identical translate requests (CROSS_WORKER adds a file lock shared by all workers)
+TRANSLATION_SINGLE_FLIGHT_TIMEOUT = int(os.getenv('TRANSLATION_SINGLE_FLIGHT_TIMEOUT', 30))
+TRANSLATION_SINGLE_FLIGHT_CROSS_WORKER = os.getenv('TRANSLATION_SINGLE_FLIGHT_CROSS_WORKER', 'False') == 'True'
+TRANSLATION_SINGLE_FLIGHT_LOCK_DIR = os.getenv('TRANSLATION_SINGLE_FLIGHT_LOCK_DIR', '')
+# Long input is split at sentence ends into chunks of up to CHUNK_MAX_CHARS (0 disables),
+# translated with at most CHUNK_PARALLELISM chunks in flight per request
+TRANSLATION_CHUNK_MAX_CHARS = int(os.getenv('TRANSLATION_CHUNK_MAX_CHARS', 300))
+TRANSLATION_CHUNK_PARALLELISM = int(os.getenv('TRANSLATION_CHUNK_PARALLELISM', 4))
+# Gemini prompt size: at most PROMPT_MAX_HINTS glossary hints (most relevant first), trimmed
+# further to fit PROMPT_MAX_INPUT_TOKENS (0 = no budget). PROMPT_TOKEN_COUNTER: 'estimate'
+# (local, ~4 chars per token) or 'provider' (exact, one extra API call per prompt)
+PROMPT_MAX_HINTS = int(os.getenv('PROMPT_MAX_HINTS', 30))
+PROMPT_MAX_INPUT_TOKENS = int(os.getenv('PROMPT_MAX_INPUT_TOKENS', 2000))
+PROMPT_TOKEN_COUNTER = os.getenv('PROMPT_TOKEN_COUNTER', 'estimate')
+# Maximum number of texts accepted by POST /api/core/translation/batch/
+TRANSLATION_BATCH_MAX_ITEMS = int(os.getenv('TRANSLATION_BATCH_MAX_ITEMS', 50))
+# LLM work queue: at most MAX_CONCURRENCY Gemini calls per process; waiting requests are
+# served by subscription tier with these weights. Free-tier requests are shed (answered
+# from the glossary) past SHED_DEPTH waiting requests or SHED_WAIT_SECONDS in the queue
+LLM_QUEUE_MAX_CONCURRENCY = int(os.getenv('LLM_QUEUE_MAX_CONCURRENCY', 16))
+# Gemini calls in flight per process on the async (ASGI) path, which holds no thread per call
+LLM_ASYNC_QUEUE_MAX_CONCURRENCY = int(os.getenv('LLM_ASYNC_QUEUE_MAX_CONCURRENCY', 256))
+LLM_QUEUE_WEIGHTS = {
+    'premium': int(os.getenv('LLM_QUEUE_WEIGHT_PREMIUM', 6)),
+    'basic': int(os.getenv('LLM_QUEUE_WEIGHT_BASIC', 3)),
+    'free': int(os.getenv('LLM_QUEUE_WEIGHT_FREE', 1)),
+}
+LLM_QUEUE_MAX_DEPTH = int(os.getenv('LLM_QUEUE_MAX_DEPTH', 200))
+LLM_QUEUE_SHED_DEPTH = int(os.getenv('LLM_QUEUE_SHED_DEPTH', 50))
+LLM_QUEUE_SHED_WAIT_SECONDS = float(os.getenv('LLM_QUEUE_SHED_WAIT_SECONDS', 2))
+LLM_QUEUE_MAX_WAIT_SECONDS = float(os.getenv('LLM_QUEUE_MAX_WAIT_SECONDS', 20))
+# Per-user limits on the translate endpoints, by subscription tier (0 = unlimited).
+# A SubscriptionPlan's translations_per_minute / translations_per_day override these
+TRANSLATION_RATE_LIMIT_ENABLED = os.getenv('TRANSLATION_RATE_LIMIT_ENABLED', 'True') == 'True'
+TRANSLATION_RATE_LIMITS = {
+    'free': {
+        'per_minute': int(os.getenv('TRANSLATION_RATE_FREE_PER_MINUTE', 10)),
+        'per_day': int(os.getenv('TRANSLATION_RATE_FREE_PER_DAY', 100)),
+    },
+    'basic': {
+        'per_minute': int(os.getenv('TRANSLATION_RATE_BASIC_PER_MINUTE', 30)),
+        'per_day': int(os.getenv('TRANSLATION_RATE_BASIC_PER_DAY', 1000)),
+    },
+    'premium': {
+        'per_minute': int(os.getenv('TRANSLATION_RATE_PREMIUM_PER_MINUTE', 60)),
+        'per_day': int(os.getenv('TRANSLATION_RATE_PREMIUM_PER_DAY', 10000)),
+    },
+}
+# How often (seconds) each worker writes its daily usage counters to the database
+TRANSLATION_QUOTA_FLUSH_SECONDS = int(os.getenv('TRANSLATION_QUOTA_FLUSH_SECONDS', 10))
+# Seconds a user's subscription tier is cached per process
+SUBSCRIPTION_TIER_CACHE_SECONDS = int(os.getenv('SUBSCRIPTION_TIER_CACHE_SECONDS', 60))
+# Micro-batching: LLM-bound translations arriving within WINDOW_MS of each other
+# (up to MAX_ITEMS) share one multi-item Gemini call
+TRANSLATION_MICRO_BATCH_ENABLED = os.getenv('TRANSLATION_MICRO_BATCH_ENABLED', 'False') == 'True'
+TRANSLATION_MICRO_BATCH_WINDOW_MS = int(os.getenv('TRANSLATION_MICRO_BATCH_WINDOW_MS', 20))
+TRANSLATION_MICRO_BATCH_MAX_ITEMS = int(os.getenv('TRANSLATION_MICRO_BATCH_MAX_ITEMS', 8))
+# Seconds a batched request waits for the batch's call before translating alone
+TRANSLATION_MICRO_BATCH_TIMEOUT = int(os.getenv('TRANSLATION_MICRO_BATCH_TIMEOUT', 30))
+# Background threads per process running queued TranslationJob rows
+TRANSLATION_JOB_WORKERS = int(os.getenv('TRANSLATION_JOB_WORKERS', 2))
+# Seconds a translate request waits for Gemini before answering from the glossary
+TRANSLATION_LLM_DEADLINE_SECONDS = int(os.getenv('TRANSLATION_LLM_DEADLINE_SECONDS', 20))
+# LLM circuit breaker: opens when FAILURE_RATE of the last WINDOW calls (at least MIN_CALLS)
+# failed or took longer than SLOW_CALL_SECONDS; stays open OPEN_SECONDS, then lets
+# HALF_OPEN_PROBES calls through to test the provider. While open, translations come from the glossary
+LLM_CIRCUIT_FAILURE_RATE = float(os.getenv('LLM_CIRCUIT_FAILURE_RATE', 0.5))
+LLM_CIRCUIT_MIN_CALLS = int(os.getenv('LLM_CIRCUIT_MIN_CALLS', 10))
+LLM_CIRCUIT_WINDOW = int(os.getenv('LLM_CIRCUIT_WINDOW', 50))
+LLM_CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv('LLM_CIRCUIT_SLOW_CALL_SECONDS', 10))
+LLM_CIRCUIT_OPEN_SECONDS = int(os.getenv('LLM_CIRCUIT_OPEN_SECONDS', 30))
+LLM_CIRCUIT_HALF_OPEN_PROBES = int(os.getenv('LLM_CIRCUIT_HALF_OPEN_PROBES', 1))
 
 # OneSignal Push Notification Configuration
 ONESIGNAL_APP_ID = os.getenv('ONESIGNAL_APP_ID', '')